@@ -0,0 +1,292 @@
+"""Benchmarks del pipeline con datos sintéticos (1x = volumen actual: ~612 días x 25 juegos).
+
+Etapas:
+    reader     reader.limpiar_hoja + agregar_contexto sobre hojas tipo XLS (612 x escala hojas)
+    prep_data  prep_data.consolidar sobre CSV limpios en un directorio temporal
+    betas      betas.build_long sobre una tabla tipo all_data
+    mm1        by_game.mm1_perhour por juego
+    predecir   pipe.predict con DataFrame de una fila (como scripts/<juego>.py) y
+               fast_predict.predecir_fila (250 x escala filas = un día de 25 juegos x 10 horas;
+               con RandomForest va por la ruta compilada de scripts/compilado.py)
+    predecir_enteros / predecir_fila_enteros
+               lo mismo con un bundle de categóricas como códigos enteros (scripts/vocabulario.py)
+
+Uso:
+    python benchmarks/bench.py                          # 1x y 10x, compara contra baseline.json
+    python benchmarks/bench.py --escalas 1 10 100       # 100x tarda varios minutos
+    python benchmarks/bench.py --etapas betas mm1 --guardar-baseline
+
+Devuelve código 1 si alguna etapa queda más lenta (o usa más memoria) que la
+línea base por encima de `--tolerancia`.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(RAIZ), str(RAIZ / "scripts"), str(RAIZ / "betas"), str(RAIZ / "data_analysis"),
+                str(Path(__file__).resolve().parent)]
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import synthetic  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DIAS_BASE = 612
+JUEGOS_BASE = 25
+FILAS_PRED_BASE = 250
+
+# Perfil de synthetic.ajustar_perfil; si es None se usa la heurística simple
+PERFIL = None
+
+
+def tabla_sintetica(n_dias, n_juegos=JUEGOS_BASE):
+    """all_data sintético con el generador elegido en la línea de comandos."""
+    if PERFIL is not None:
+        return synthetic.generar_desde_perfil(PERFIL, n_dias, n_juegos)
+    return synthetic.all_data_sintetico(n_dias, n_juegos)
+
+
+# =========================
+# ETAPAS
+# =========================
+# Cada etapa recibe la escala y devuelve (preparar, correr): `preparar()` arma
+# los datos fuera de la medición y `correr(datos)` es lo que se mide.
+def etapa_reader(escala):
+    import reader
+
+    def preparar():
+        ad = tabla_sintetica(DIAS_BASE * escala)
+        return [(synthetic.hoja_cruda(df, df["fecha"].iloc[0]), pd.Timestamp(df["fecha"].iloc[0]))
+                for _, df in synthetic.limpios_por_dia(ad)]
+
+    def correr(hojas):
+        clima = {"temperatura_max": 26.0, "temperatura_min": 14.0, "condiciones_cielo": "Overcast", "prob_precipitacion": 0}
+        for hoja, fecha in hojas:
+            reader.agregar_contexto(reader.limpiar_hoja(hoja), fecha.to_pydatetime(), clima)
+    return preparar, correr
+
+
+def etapa_prep_data(escala):
+    import prep_data
+
+    def preparar():
+        tmp = tempfile.mkdtemp(prefix="bench_prep_")
+        ad = tabla_sintetica(DIAS_BASE * escala)
+        files = []
+        for nombre, df in synthetic.limpios_por_dia(ad):
+            files.append(os.path.join(tmp, nombre))
+            df.to_csv(files[-1], index=False)
+        return files
+
+    def correr(files):
+        prep_data.consolidar(files)
+    return preparar, correr
+
+
+def etapa_betas(escala):
+    import betas
+
+    def preparar():
+        return tabla_sintetica(DIAS_BASE * escala)
+
+    def correr(ad):
+        betas.build_long(ad, betas.CAPACIDADES_JUEGOS)
+    return preparar, correr
+
+
+def etapa_mm1(escala):
+    import by_game
+    from juegos import JUEGOS
+
+    def preparar():
+        return tabla_sintetica(DIAS_BASE * escala)
+
+    def correr(ad):
+        for j in JUEGOS.values():
+            df = ad[ad["juego"] == j.nombre_datos].drop(columns=["juego"])
+            by_game.mm1_perhour(df, j.capacidad, j.max_espera, j.id)
+    return preparar, correr
+
+
+def bundle_sintetico(n_arboles=100, enteros=False):
+    """Entrena un bundle con la misma estructura que los notebooks, sobre datos sintéticos.
+
+    Con `enteros=True` las categóricas van como códigos y el bundle lleva sus
+    vocabularios, igual que `data_analysis/entrenar.py --codificacion enteros`.
+    """
+    import cielo
+    import entrenar
+    import vocabulario
+
+    rng = np.random.default_rng(0)
+    ad = synthetic.all_data_sintetico(200, 1)
+    horas = [c.split()[0] for c in ad.columns if c.endswith(" ciclos")]
+    X = pd.DataFrame({
+        "day_of_week": np.repeat(ad["day_of_week"].to_numpy(), len(horas)),
+        "hora": np.tile(horas, len(ad)),
+        "es_festivo": np.repeat(ad["es_festivo"].to_numpy(), len(horas)),
+        "condiciones_cielo": np.repeat(ad["condiciones_cielo"].to_numpy(), len(horas)),
+        "nombre_festivo": np.repeat(ad["nombre_festivo"].to_numpy(), len(horas)),
+        "month": np.repeat(ad["month"].to_numpy(), len(horas)),
+        "day": np.repeat(ad["day"].to_numpy(), len(horas)),
+        "temperatura_max": np.repeat(ad["temperatura_max"].to_numpy(), len(horas)),
+        "temporada_alta": np.repeat(ad["temporada_alta"].to_numpy(), len(horas)),
+        "asistencia_h": ad[[f"{h} asistencia" for h in horas]].to_numpy().ravel(),
+        "ciclos_h": ad[[f"{h} ciclos" for h in horas]].to_numpy().ravel(),
+    })
+    X = cielo.agregar(X)
+    y = rng.gamma(2.0, 3.0, len(X))
+    cat_cols = [c for c in entrenar.CAT_COLS if c in X.columns]
+    num_cols = [c for c in entrenar.NUM_COLS if c in X.columns]
+    vocabularios = vocabulario.ajustar_vocabularios(X, cat_cols) if enteros else None
+    X_fit = vocabulario.codificar_df(X, vocabularios) if enteros else X
+    pipe = entrenar.construir_pipeline(cat_cols, num_cols, vocabularios, n_arboles, n_jobs=1)
+    pipe.fit(X_fit[cat_cols + num_cols], y)
+    bundle = {"pipeline": pipe, "cat_cols": cat_cols, "num_cols": num_cols}
+    if enteros:
+        bundle["vocabularios"] = vocabulario.a_bundle(vocabularios)
+    return bundle, X
+
+
+def _filas_prediccion(escala, n_arboles, enteros=False):
+    bundle, X = bundle_sintetico(n_arboles, enteros)
+    filas = X.sample(FILAS_PRED_BASE * escala, replace=True, random_state=0).to_dict(orient="records")
+    return bundle, filas
+
+
+def etapa_predecir(escala, n_arboles=100, enteros=False):
+    import vocabulario
+
+    def preparar():
+        return _filas_prediccion(escala, n_arboles, enteros)
+
+    def correr(datos):
+        bundle, filas = datos
+        cols = bundle["cat_cols"] + bundle["num_cols"]
+        for fila in filas:
+            X = pd.DataFrame({k: [v] for k, v in fila.items()})[cols]
+            bundle["pipeline"].predict(vocabulario.preparar_entrada(bundle, X))
+    return preparar, correr
+
+
+def etapa_predecir_fila(escala, n_arboles=100, enteros=False):
+    import fast_predict
+
+    def preparar():
+        return _filas_prediccion(escala, n_arboles, enteros)
+
+    def correr(datos):
+        bundle, filas = datos
+        for fila in filas:
+            fast_predict.predecir_fila(bundle, fila)
+    return preparar, correr
+
+
+ETAPAS = {
+    "reader": etapa_reader,
+    "prep_data": etapa_prep_data,
+    "betas": etapa_betas,
+    "mm1": etapa_mm1,
+    "predecir": etapa_predecir,
+    "predecir_fila": etapa_predecir_fila,
+    "predecir_enteros": lambda escala: etapa_predecir(escala, enteros=True),
+    "predecir_fila_enteros": lambda escala: etapa_predecir_fila(escala, enteros=True),
+}
+
+
+# =========================
+# MEDICIÓN
+# =========================
+def medir(fabrica, escala, repeticiones=1, memoria=True):
+    """Devuelve {'seg': mejor tiempo, 'mb': pico de memoria (tracemalloc)} de una etapa."""
+    preparar, correr = fabrica(escala)
+    datos = preparar()
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        correr(datos)
+        tiempos.append(time.perf_counter() - t0)
+    res = {"seg": round(min(tiempos), 4)}
+    if memoria:
+        # Corrida aparte: tracemalloc agrega overhead y no debe contaminar el tiempo
+        tracemalloc.start()
+        correr(datos)
+        res["mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        tracemalloc.stop()
+    return res
+
+
+def comparar(resultados, baseline, tolerancia):
+    """Imprime la tabla contra la línea base y devuelve la lista de regresiones."""
+    regresiones = []
+    print(f"\n{'etapa@escala':<26}{'seg':>10}{'base':>10}{'Δ%':>8}{'MB':>10}{'base':>10}{'Δ%':>8}")
+    for clave, r in resultados.items():
+        b = baseline.get(clave, {})
+        fila = f"{clave:<26}"
+        for met in ("seg", "mb"):
+            fila += f"{r[met]:>10.3f}" if met in r else f"{'-':>10}"
+            if met in r and b.get(met):
+                delta = (r[met] - b[met]) / b[met]
+                fila += f"{b[met]:>10.3f}{delta * 100:>7.0f}%"
+                if delta > tolerancia:
+                    regresiones.append(f"{clave} {met}: {b[met]} -> {r[met]} (+{delta * 100:.0f}%)")
+            else:
+                fila += f"{'-':>10}{'-':>8}"
+        print(fila)
+    return regresiones
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmarks de ingesta, consolidación, betas, colas y predicción.")
+    ap.add_argument("--etapas", nargs="+", default=list(ETAPAS), choices=list(ETAPAS))
+    ap.add_argument("--escalas", nargs="+", type=int, default=[1, 10], help="Múltiplos del volumen actual (1 10 100)")
+    ap.add_argument("--repeticiones", type=int, default=1)
+    ap.add_argument("--sin-memoria", action="store_true", help="No medir el pico de memoria (más rápido)")
+    ap.add_argument("--baseline", default=str(BASELINE))
+    ap.add_argument("--guardar-baseline", action="store_true", help="Escribe/actualiza la línea base con esta corrida")
+    ap.add_argument("--tolerancia", type=float, default=0.25, help="Regresión permitida (0.25 = 25%%)")
+    ap.add_argument("--json", dest="salida_json", help="Guarda los resultados crudos en este archivo")
+    ap.add_argument("--perfil-real", nargs="?", const=str(RAIZ / "all_data.csv"), metavar="CSV",
+                    help="Genera los datos con el perfil ajustado sobre all_data.csv en vez de la heurística")
+    args = ap.parse_args()
+
+    if args.perfil_real:
+        global PERFIL
+        PERFIL = synthetic.ajustar_perfil(pd.read_csv(args.perfil_real))
+
+    resultados = {}
+    for etapa in args.etapas:
+        for escala in args.escalas:
+            clave = f"{etapa}@{escala}x"
+            print(f"⏱️ {clave} ...", flush=True)
+            resultados[clave] = medir(ETAPAS[etapa], escala, args.repeticiones, not args.sin_memoria)
+
+    ruta_base = Path(args.baseline)
+    baseline = json.loads(ruta_base.read_text()) if ruta_base.exists() else {}
+    regresiones = comparar(resultados, baseline.get("resultados", {}), args.tolerancia)
+
+    if args.salida_json:
+        Path(args.salida_json).write_text(json.dumps(resultados, indent=2))
+    if args.guardar_baseline:
+        baseline.setdefault("resultados", {}).update(resultados)
+        baseline["maquina"] = {"python": platform.python_version(), "sistema": platform.platform(),
+                               "cpus": os.cpu_count(), "numpy": np.__version__, "pandas": pd.__version__}
+        ruta_base.write_text(json.dumps(baseline, indent=2, ensure_ascii=False) + "\n")
+        print(f"\nLínea base guardada en {ruta_base}")
+    elif regresiones:
+        print("\n❌ Regresiones:")
+        for r in regresiones:
+            print("  ", r)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
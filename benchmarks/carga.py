@@ -0,0 +1,120 @@
+"""Prueba de carga del servicio de predicciones (scripts/servicio.py).
+
+Lanza `--concurrencia` clientes asíncronos (httpx) contra cada endpoint durante
+`--segundos` y reporta por endpoint p50/p90/p99 de latencia (ms), req/s y
+errores. Sin `--url` levanta el servicio en un subproceso, espera a `/salud` y
+lo apaga al final.
+
+Uso:
+    python benchmarks/carga.py                                  # levanta el servicio local
+    python benchmarks/carga.py --url http://127.0.0.1:8000 --segundos 20 --concurrencia 16
+    python benchmarks/carga.py --juegos dragon tifon --json carga.json
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+
+def casos(juego):
+    """(nombre, método, ruta, cuerpo) de cada endpoint a medir."""
+    return [
+        ("ahora", "GET", "/ahora", None),
+        ("juego_dia", "GET", f"/juegos/{juego}?desde=9&hasta=18", None),
+        ("que_pasa_si", "POST", "/que-pasa-si",
+         {"clima": {"condiciones_cielo": "Moderate rain", "temperatura_max": 19}, "hora": 15}),
+    ]
+
+
+async def _cliente(cliente, metodo, ruta, cuerpo, hasta, latencias, errores):
+    while time.perf_counter() < hasta:
+        t0 = time.perf_counter()
+        try:
+            r = await cliente.request(metodo, ruta, json=cuerpo)
+            r.raise_for_status()
+            latencias.append(time.perf_counter() - t0)
+        except Exception:
+            errores.append(1)
+
+
+async def medir(url, metodo, ruta, cuerpo, segundos, concurrencia):
+    import httpx
+
+    latencias, errores = [], []
+    async with httpx.AsyncClient(base_url=url, timeout=30) as cliente:
+        await cliente.request(metodo, ruta, json=cuerpo)  # calentamiento (clima, caches)
+        hasta = time.perf_counter() + segundos
+        t0 = time.perf_counter()
+        await asyncio.gather(*[_cliente(cliente, metodo, ruta, cuerpo, hasta, latencias, errores)
+                               for _ in range(concurrencia)])
+        duracion = time.perf_counter() - t0
+    ms = np.array(latencias) * 1000
+    return {
+        "requests": len(latencias),
+        "errores": len(errores),
+        "req_s": round(len(latencias) / duracion, 1),
+        **{f"p{q}_ms": round(float(np.percentile(ms, q)), 2) if len(ms) else None for q in (50, 90, 99)},
+    }
+
+
+def levantar_servicio(puerto, juegos):
+    import httpx
+
+    proc = subprocess.Popen([sys.executable, str(RAIZ / "scripts" / "servicio.py"), *juegos, "--puerto", str(puerto)],
+                            cwd=RAIZ)
+    url = f"http://127.0.0.1:{puerto}"
+    for _ in range(600):
+        try:
+            if httpx.get(f"{url}/salud", timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        if proc.poll() is not None:
+            raise SystemExit("❌ El servicio terminó al arrancar")
+        time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit("❌ El servicio no respondió /salud en 60 s")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Prueba de carga del servicio de predicciones.")
+    ap.add_argument("--url", help="Servicio ya levantado (si no, se levanta uno local)")
+    ap.add_argument("--puerto", type=int, default=8765)
+    ap.add_argument("--juegos", nargs="*", default=[], help="Juegos a cargar en el servicio local")
+    ap.add_argument("--juego", help="Juego para /juegos/{juego} (por defecto, el primero cargado)")
+    ap.add_argument("--segundos", type=float, default=10)
+    ap.add_argument("--concurrencia", type=int, default=8)
+    ap.add_argument("--json", dest="salida_json", help="Guarda los resultados en este archivo")
+    args = ap.parse_args()
+
+    proc = None
+    url = args.url
+    if url is None:
+        proc, url = levantar_servicio(args.puerto, args.juegos)
+    try:
+        import httpx
+        juego = args.juego or httpx.get(f"{url}/salud").json()["juegos"][0]
+        resultados = {}
+        print(f"{'endpoint':<14}{'req':>8}{'err':>6}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}")
+        for nombre, metodo, ruta, cuerpo in casos(juego):
+            r = asyncio.run(medir(url, metodo, ruta, cuerpo, args.segundos, args.concurrencia))
+            resultados[nombre] = r
+            print(f"{nombre:<14}{r['requests']:>8}{r['errores']:>6}{r['req_s']:>9}"
+                  f"{r['p50_ms']:>9}{r['p90_ms']:>9}{r['p99_ms']:>9}")
+        if args.salida_json:
+            Path(args.salida_json).write_text(json.dumps(resultados, indent=2) + "\n")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""Datos sintéticos con la forma de los reportes reales, para benchmarks y pruebas de carga.
+
+- `all_data_sintetico`: tabla con las mismas columnas que all_data.csv (heurística simple).
+- `ajustar_perfil` + `generar_desde_perfil`: lo mismo, pero muestreando de las
+  distribuciones por juego y hora ajustadas sobre all_data.csv, con estacionalidad.
+- `limpios_por_dia`: la tabla partida como data/<año>/limpio/<ddmmyyyy>_limpio.csv.
+- `hoja_cruda`: hoja tipo XLS (header=None) que `reader.limpiar_hoja` sabe leer.
+
+Uso:
+    python benchmarks/synthetic.py --dias 3000 --juegos 50 --salida /tmp/sintetico --formato parquet
+    python benchmarks/synthetic.py --filas 1000000 --horas 12 --salida /tmp/sintetico --limpios --xls 30
+    python benchmarks/synthetic.py --dias 612 --franja 15 --salida /tmp/sintetico_15min
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(RAIZ), str(RAIZ / "scripts")]
+
+from franjas import etiquetas  # noqa: E402
+from juegos import JUEGOS  # noqa: E402
+from prep_data import es_temporada_alta  # noqa: E402
+from reader import FERIADOS_GT  # noqa: E402
+
+# Nombre en all_data.csv -> capacidad por ciclo
+CAPACIDAD_POR_JUEGO = {j.nombre_datos: j.capacidad for j in JUEGOS.values()}
+
+CONDICIONES = ["Moderate or heavy rain shower", "Patchy rain possible", "Overcast", "Moderate rain at times",
+               "Cloudy", "Partly cloudy", "Heavy rain at times", "Sunny"]
+
+COLUMNAS_LIMPIO_EXTRA = ["fecha", "es_festivo", "nombre_festivo", "temperatura_max", "temperatura_min",
+                         "condiciones_cielo", "prob_precipitacion", "promedio_asistencia_por_hora",
+                         "promedio_ciclos_por_hora"]
+
+
+def nombres_juegos(n_juegos):
+    """Los juegos reales y, si se piden más, copias numeradas (`Dragon #2`)."""
+    base = list(CAPACIDAD_POR_JUEGO)
+    return [base[i % len(base)] + (f" #{i // len(base) + 1}" if i >= len(base) else "") for i in range(n_juegos)]
+
+
+def all_data_sintetico(n_dias, n_juegos=25, n_horas=10, inicio="2022-01-01", seed=0):
+    """Genera `n_dias x n_juegos` filas con las columnas de all_data.csv.
+
+    Los ciclos por hora siguen una Poisson alrededor de 8 y la asistencia es
+    ciclos x capacidad x ocupación (Beta(4, 2)); los fines de semana y la
+    temporada alta suben la demanda.
+    """
+    rng = np.random.default_rng(seed)
+    juegos = nombres_juegos(n_juegos)
+    caps = np.array([CAPACIDAD_POR_JUEGO[j.split(" #")[0]] for j in juegos], dtype=float)
+    fechas = pd.date_range(inicio, periods=n_dias, freq="D")
+    horas = [f"{h}:00" for h in range(9, 9 + n_horas)]
+
+    n = n_dias * n_juegos
+    date = np.repeat(fechas.values, n_juegos)
+    fechas_rep = pd.DatetimeIndex(date)
+    factor = 1.0 + 0.4 * (fechas_rep.dayofweek >= 5) + 0.3 * np.array([es_temporada_alta(f) for f in fechas])[
+        np.repeat(np.arange(n_dias), n_juegos)]
+
+    ciclos = rng.poisson(8 * factor[:, None], size=(n, n_horas)).astype(float)
+    ciclos[:, 0] = 0  # la primera hora casi siempre está cerrada en los reportes
+    ocupacion = rng.beta(4, 2, size=(n, n_horas))
+    asistencia = np.round(ciclos * np.tile(caps, n_dias)[:, None] * ocupacion)
+
+    df = pd.DataFrame({"date": fechas_rep.strftime("%Y-%m-%d"), "juego": np.tile(juegos, n_dias)})
+    for i, h in enumerate(horas):
+        df[f"{h} ciclos"] = ciclos[:, i]
+        df[f"{h} asistencia"] = asistencia[:, i]
+    df["ciclos total"] = ciclos.sum(axis=1)
+    df["asistencia total"] = asistencia.sum(axis=1)
+
+    mes_dia = fechas_rep.strftime("%m-%d")
+    festivo = pd.Series(mes_dia).map(FERIADOS_GT)
+    df["es_festivo"] = festivo.notna().to_numpy()
+    df["nombre_festivo"] = festivo.fillna("Ninguno").to_numpy()
+    dia = np.repeat(np.arange(n_dias), n_juegos)
+    df["temperatura_max"] = np.round(rng.normal(26, 2, n_dias))[dia]
+    df["temperatura_min"] = np.round(rng.normal(14, 2, n_dias))[dia]
+    df["condiciones_cielo"] = rng.choice(CONDICIONES, n_dias)[dia]
+    df["prob_precipitacion"] = rng.integers(0, 100, n_dias)[dia]
+    return _completar_columnas(df)
+
+
+def _completar_columnas(df):
+    """Promedios, archivo de origen y columnas de fecha/temporada como prep_data.py."""
+    fechas = pd.DatetimeIndex(pd.to_datetime(df["date"]))
+    df["promedio_asistencia_por_hora"] = df.filter(like="asistencia").mean(axis=1)
+    df["promedio_ciclos_por_hora"] = df.filter(like="ciclos").mean(axis=1)
+    df["source_file"] = fechas.strftime("%d%m%Y") + "_limpio.csv"
+    df["day"] = fechas.day
+    df["month"] = fechas.month
+    df["year"] = fechas.year
+    df["day_of_week"] = fechas.day_name()
+    unicas = fechas.unique()
+    temporada = dict(zip(unicas, (es_temporada_alta(f) for f in unicas)))
+    df["temporada_alta"] = fechas.map(temporada).to_numpy()
+    return df
+
+
+def limpios_por_dia(all_data):
+    """Itera `(nombre_archivo, df)` con el formato de los CSV limpios de reader.py."""
+    horas_cols = [c for c in all_data.columns if c.endswith(" ciclos") or c.endswith(" asistencia")]
+    cols = ["juego"] + horas_cols + ["ciclos total", "asistencia total"]
+    for fecha, df in all_data.groupby("date", sort=True):
+        out = df[cols].copy()
+        out["fecha"] = fecha
+        for c in COLUMNAS_LIMPIO_EXTRA[1:]:
+            out[c] = df[c].to_numpy()
+        yield df["source_file"].iloc[0], out
+
+
+def hoja_cruda(df_limpio, fecha):
+    """Arma una hoja con el layout del XLS del parque (título, horas, 'Ciclos', 'Prem/Asist', totales)."""
+    horas_cols = [c for c in df_limpio.columns if c.endswith(" ciclos") or c.endswith(" asistencia")]
+    horas = [c.split()[0] for c in horas_cols if c.endswith(" ciclos")]
+    n_cols = 2 + len(horas_cols) + 2
+    vacia = [np.nan] * n_cols
+
+    def fila(**pos):
+        r = list(vacia)
+        for i, v in pos.items():
+            r[int(i[1:])] = v
+        return r
+
+    filas = [
+        fila(c7="REPORTE x HORA"), list(vacia), fila(c7=f"Del {pd.Timestamp(fecha):%d/%m/%Y} al {pd.Timestamp(fecha):%d/%m/%Y}"),
+        list(vacia), [np.nan, np.nan] + horas + [np.nan] * (n_cols - 2 - len(horas)), list(vacia),
+        [np.nan, np.nan] + ["Ciclos"] * len(horas) + [np.nan] * (n_cols - 2 - len(horas)),
+        [np.nan, np.nan] + ["Prem", "Asist"] * len(horas) + [np.nan, np.nan],
+        fila(c0="Mecánico"),
+    ]
+    valores = df_limpio[["juego"] + horas_cols + ["ciclos total", "asistencia total"]].to_numpy()
+    for v in valores:
+        filas.append([v[0], np.nan, *v[1:]])
+    totales = valores[:, 1:].astype(float).sum(axis=0)
+    filas.append(["Total:", np.nan, *totales])
+    filas.append(fila(c0="Mecánico"))
+    filas.append(fila(c0="Arcada"))
+    filas.append(["Water Game", np.nan] + [0] * (n_cols - 2))
+    filas.append(fila(c0="Total General"))
+    return pd.DataFrame(filas)
+
+
+# =========================
+# PERFIL AJUSTADO SOBRE all_data.csv
+# =========================
+def ajustar_perfil(all_data):
+    """Ajusta distribuciones por juego y hora sobre all_data.csv.
+
+    Por (juego, hora) guarda la probabilidad de estar cerrado (ciclos == 0), la
+    media/varianza de ciclos cuando opera (binomial negativa, o Poisson si no hay
+    sobre-dispersión) y la ocupación `asistencia / (ciclos x capacidad)` como
+    Gamma por momentos. La estacionalidad (día de semana, temporada alta,
+    feriado) son factores multiplicativos sobre la asistencia total diaria, y el
+    clima se muestrea de las frecuencias observadas por mes.
+
+    Args:
+        all_data (DataFrame): Tabla con el formato de all_data.csv.
+
+    Returns:
+        dict: Perfil serializable a JSON.
+    """
+    horas = [c.split()[0] for c in all_data.columns if c.endswith(" ciclos") and c[0].isdigit()]
+    juegos = {}
+    for juego, df in all_data.groupby("juego", sort=False):
+        cap = CAPACIDAD_POR_JUEGO.get(juego)
+        if cap is None:
+            continue
+        por_hora = []
+        for h in horas:
+            c = df[f"{h} ciclos"].astype(float).to_numpy()
+            a = df[f"{h} asistencia"].astype(float).to_numpy()
+            abierto = c > 0
+            if abierto.sum() < 2:
+                por_hora.append({"p_cerrado": 1.0, "media": 0.0, "var": 0.0, "occ_k": 1.0, "occ_theta": 0.0})
+                continue
+            occ = a[abierto] / (c[abierto] * cap)
+            occ = np.clip(occ, 0, np.quantile(occ, 0.99))
+            occ_m, occ_v = float(occ.mean()), float(occ.var()) or 1e-6
+            por_hora.append({
+                "p_cerrado": float(1 - abierto.mean()),
+                "media": float(c[abierto].mean()),
+                "var": float(c[abierto].var()),
+                "occ_k": occ_m ** 2 / occ_v,
+                "occ_theta": occ_v / occ_m,
+            })
+        juegos[juego] = {"capacidad": cap, "horas": por_hora}
+
+    fechas = pd.to_datetime(all_data["date"])
+    total = all_data["asistencia total"].astype(float)
+    media = total.mean()
+    dias = all_data.drop_duplicates("date")
+    dias_fecha = pd.to_datetime(dias["date"])
+    abiertos_dow = dias_fecha.dt.dayofweek.value_counts().reindex(range(7), fill_value=0)
+
+    clima = {}
+    for mes, d in dias.groupby(dias_fecha.dt.month):
+        cond = d["condiciones_cielo"].value_counts(normalize=True)
+        clima[str(mes)] = {
+            "condiciones": cond.index.tolist(), "p": cond.to_numpy().tolist(),
+            "tmax": [float(d["temperatura_max"].mean()), float(d["temperatura_max"].std() or 1.0)],
+            "tmin": [float(d["temperatura_min"].mean()), float(d["temperatura_min"].std() or 1.0)],
+            "lluvia": d["prob_precipitacion"].astype(int).tolist(),
+        }
+
+    return {
+        "horas": horas,
+        "juegos": juegos,
+        "factor_dow": (total.groupby(fechas.dt.dayofweek).mean() / media).reindex(range(7), fill_value=1.0).tolist(),
+        "factor_temporada": (total.groupby(all_data["temporada_alta"]).mean() / media).reindex([0, 1], fill_value=1.0).tolist(),
+        "factor_festivo": (total.groupby(all_data["es_festivo"].astype(bool)).mean() / media).reindex([False, True], fill_value=1.0).tolist(),
+        "p_abierto_dow": (abiertos_dow / abiertos_dow.max()).tolist(),
+        "clima_mes": clima,
+    }
+
+
+def fechas_operacion(n_dias, inicio, p_abierto_dow, rng):
+    """Recorre el calendario desde `inicio` y abre cada día con P(abierto | día de semana)."""
+    fechas = []
+    dia = pd.Timestamp(inicio)
+    p = np.asarray(p_abierto_dow, dtype=float)
+    while len(fechas) < n_dias:
+        bloque = pd.date_range(dia, periods=max(2 * (n_dias - len(fechas)), 7), freq="D")
+        abiertos = bloque[rng.random(len(bloque)) < p[bloque.dayofweek]]
+        fechas.extend(abiertos[: n_dias - len(fechas)])
+        dia = bloque[-1] + pd.Timedelta(days=1)
+    return pd.DatetimeIndex(fechas)
+
+
+def _muestrear_ciclos(rng, media, var, n):
+    """Binomial negativa por momentos (o Poisson si var <= media)."""
+    media = np.maximum(media, 1e-9)
+    if var <= np.mean(media):
+        return rng.poisson(media)
+    r = np.mean(media) ** 2 / (var - np.mean(media))
+    return rng.negative_binomial(r, r / (r + media))
+
+
+def generar_desde_perfil(perfil, n_dias, n_juegos=None, n_horas=None, inicio="2022-01-01", seed=0, ancho_min=60):
+    """Genera una tabla con las columnas de all_data.csv muestreando del perfil ajustado.
+
+    Args:
+        perfil (dict): Salida de `ajustar_perfil`.
+        n_dias (int): Días de operación a generar.
+        n_juegos (int): Juegos; por encima de los reales se clonan (`Dragon #2`).
+        n_horas (int): Horas por día desde las 9:00; las extra repiten el perfil de la última hora.
+        inicio (str): Primer día del calendario.
+        seed (int): Semilla del generador.
+        ancho_min (int): Minutos por franja (15 da columnas 9:00, 9:15, ...); cada
+            franja toma el perfil de su hora con la media y varianza escaladas.
+
+    Returns:
+        DataFrame: `n_dias x n_juegos` filas.
+    """
+    rng = np.random.default_rng(seed)
+    reales = list(perfil["juegos"])
+    n_juegos = n_juegos or len(reales)
+    n_horas = n_horas or len(perfil["horas"])
+    juegos = [reales[i % len(reales)] + (f" #{i // len(reales) + 1}" if i >= len(reales) else "") for i in range(n_juegos)]
+    n_franjas = n_horas * 60 // ancho_min
+    horas = etiquetas(n_franjas, ancho_min)
+    escala = ancho_min / 60
+
+    fechas = fechas_operacion(n_dias, inicio, perfil["p_abierto_dow"], rng)
+    mes_dia = fechas.strftime("%m-%d")
+    festivo = pd.Series(mes_dia).map(FERIADOS_GT)
+    temporada = np.array([es_temporada_alta(f) for f in fechas])
+    factor = (np.asarray(perfil["factor_dow"])[fechas.dayofweek]
+              * np.asarray(perfil["factor_temporada"])[temporada]
+              * np.asarray(perfil["factor_festivo"])[festivo.notna().to_numpy().astype(int)])
+
+    bloques = []
+    for j, nombre in enumerate(juegos):
+        p = perfil["juegos"][nombre.split(" #")[0]]
+        cic = np.zeros((n_dias, n_franjas))
+        asi = np.zeros((n_dias, n_franjas))
+        for i in range(n_franjas):
+            ph = p["horas"][min(i * ancho_min // 60, len(p["horas"]) - 1)]
+            abierto = rng.random(n_dias) >= ph["p_cerrado"]
+            c = _muestrear_ciclos(rng, ph["media"] * escala * factor, ph["var"] * escala, n_dias) * abierto
+            occ = rng.gamma(ph["occ_k"], ph["occ_theta"], n_dias) if ph["occ_theta"] > 0 else np.zeros(n_dias)
+            cic[:, i] = c
+            asi[:, i] = np.round(c * p["capacidad"] * occ)
+        bloque = {"date": fechas.strftime("%Y-%m-%d"), "juego": nombre}
+        for i, h in enumerate(horas):
+            bloque[f"{h} ciclos"] = cic[:, i]
+            bloque[f"{h} asistencia"] = asi[:, i]
+        bloque["ciclos total"] = cic.sum(axis=1)
+        bloque["asistencia total"] = asi.sum(axis=1)
+        bloque["_orden"] = j
+        bloques.append(pd.DataFrame(bloque))
+    df = pd.concat(bloques, ignore_index=True).sort_values(["date", "_orden"], kind="stable").drop(columns="_orden")
+    df = df.reset_index(drop=True)
+
+    # Clima por día (igual para todos los juegos de ese día)
+    dia_cols = pd.DataFrame({"date": fechas.strftime("%Y-%m-%d")})
+    dia_cols["es_festivo"] = festivo.notna().to_numpy()
+    dia_cols["nombre_festivo"] = festivo.fillna("Ninguno").to_numpy()
+    dia_cols["temperatura_max"] = np.nan
+    dia_cols["temperatura_min"] = np.nan
+    dia_cols["condiciones_cielo"] = ""
+    dia_cols["prob_precipitacion"] = 0
+    for mes in np.unique(fechas.month):
+        m = fechas.month == mes
+        cm = perfil["clima_mes"].get(str(mes)) or next(iter(perfil["clima_mes"].values()))
+        dia_cols.loc[m, "temperatura_max"] = np.round(rng.normal(*cm["tmax"], m.sum()))
+        dia_cols.loc[m, "temperatura_min"] = np.round(rng.normal(*cm["tmin"], m.sum()))
+        dia_cols.loc[m, "condiciones_cielo"] = rng.choice(cm["condiciones"], m.sum(), p=cm["p"])
+        dia_cols.loc[m, "prob_precipitacion"] = rng.choice(cm["lluvia"], m.sum())
+    df = df.merge(dia_cols, on="date", how="left")
+    return _completar_columnas(df)
+
+
+def guardar_tabla(df, ruta, formato):
+    """Escribe CSV o Parquet (pyarrow) según `formato`."""
+    ruta = Path(ruta).with_suffix(f".{formato}")
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    if formato == "parquet":
+        df.to_parquet(ruta, index=False)
+    else:
+        df.to_csv(ruta, index=False)
+    return ruta
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Genera días de parque sintéticos ajustados sobre all_data.csv.")
+    ap.add_argument("--base", default=str(RAIZ / "all_data.csv"), help="all_data.csv para ajustar el perfil")
+    ap.add_argument("--perfil", help="JSON de perfil ya ajustado (se crea si no existe)")
+    ap.add_argument("--dias", type=int, default=612, help="Días de operación a generar")
+    ap.add_argument("--filas", type=int, help="Filas totales; si se da, dias = filas / juegos")
+    ap.add_argument("--juegos", type=int, default=25)
+    ap.add_argument("--horas", type=int, default=10, help="Horas por día desde las 9:00")
+    ap.add_argument("--franja", type=int, default=60, help="Minutos por franja (15 = cuartos de hora)")
+    ap.add_argument("--inicio", default="2022-01-01")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--salida", required=True, help="Carpeta de salida")
+    ap.add_argument("--formato", choices=["csv", "parquet"], default="csv")
+    ap.add_argument("--limpios", action="store_true", help="Además escribe un archivo limpio por día en <salida>/limpio")
+    ap.add_argument("--xls", type=int, default=0, metavar="N",
+                    help="Además escribe los primeros N días como reportes crudos .xlsx en <salida>/sucio")
+    args = ap.parse_args()
+
+    if args.perfil and Path(args.perfil).exists():
+        perfil = json.loads(Path(args.perfil).read_text())
+    else:
+        perfil = ajustar_perfil(pd.read_csv(args.base))
+        if args.perfil:
+            Path(args.perfil).write_text(json.dumps(perfil, ensure_ascii=False))
+    dias = -(-args.filas // args.juegos) if args.filas else args.dias
+
+    df = generar_desde_perfil(perfil, dias, args.juegos, args.horas, args.inicio, args.seed, args.franja)
+    salida = Path(args.salida)
+    print(f"✅ {len(df):,} filas en {guardar_tabla(df, salida / 'all_data', args.formato)}")
+
+    if args.limpios or args.xls:
+        for i, (nombre, limpio) in enumerate(limpios_por_dia(df)):
+            if args.limpios:
+                guardar_tabla(limpio, salida / "limpio" / nombre, args.formato)
+            if i < args.xls:
+                xlsx = salida / "sucio" / nombre.replace("_limpio.csv", ".xlsx")
+                xlsx.parent.mkdir(parents=True, exist_ok=True)
+                hoja_cruda(limpio, limpio["fecha"].iloc[0]).to_excel(xlsx, header=False, index=False)
+        print(f"✅ Archivos por día en {salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Servidor local que imita el endpoint past-weather de World Weather Online.
+
+Responde `date` + `enddate` (mismo mes, como WWO) con un día por fecha y clima
+determinista por fecha, para probar `scripts/clima.py` sin API key ni red.
+`--latencia-ms` agrega demora por request y `--tasa-429` devuelve "Too Many
+Requests" a esa fracción de los requests (para ver los reintentos). Al
+terminar imprime cuántos requests recibió y la concurrencia máxima observada.
+
+Uso:
+    python benchmarks/wwo_simulado.py --puerto 8766 --latencia-ms 200 --tasa-429 0.1
+    WWO_URL=http://127.0.0.1:8766/premium/v1/past-weather.ashx python scripts/clima.py --desde 2022-01-01 --hasta 2024-12-31
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CONDICIONES = ["Sunny", "Partly cloudy", "Overcast", "Patchy rain possible", "Light rain shower",
+               "Moderate rain", "Thundery outbreaks possible", "Cloudy"]
+
+
+def dia_simulado(fecha, tp=24):
+    """Día con la forma de `data.weather[i]` de WWO (valores como texto, igual que la API)."""
+    rng = random.Random(zlib.crc32(fecha.isoformat().encode()))
+    horas = range(0, 2400, tp * 100)
+    return {
+        "date": fecha.isoformat(),
+        "maxtempC": str(rng.randint(22, 29)),
+        "mintempC": str(rng.randint(13, 18)),
+        "hourly": [{"time": str(h), "tempC": str(rng.randint(14, 28)), "chanceofrain": str(rng.randint(0, 100)),
+                    "precipMM": f"{rng.choice([0, 0, 0, 0.2, 1.5, 6.3]):.1f}", "cloudcover": str(rng.randint(0, 100)),
+                    "weatherDesc": [{"value": rng.choice(CONDICIONES)}]} for h in horas],
+    }
+
+
+class Manejador(BaseHTTPRequestHandler):
+    latencia = 0.0
+    tasa_429 = 0.0
+    requests = 0
+    activos = 0
+    max_activos = 0
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls._lock:
+            cls.requests += 1
+            cls.activos += 1
+            cls.max_activos = max(cls.max_activos, cls.activos)
+        try:
+            time.sleep(cls.latencia)
+            q = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            if random.random() < cls.tasa_429:
+                return self._responder(429, {"data": {"error": [{"msg": "Too Many Requests"}]}}, {"Retry-After": "0.2"})
+            inicio = date.fromisoformat(q["date"])
+            fin = date.fromisoformat(q.get("enddate", q["date"]))
+            if (fin.year, fin.month) != (inicio.year, inicio.month) or fin < inicio:
+                return self._responder(200, {"data": {"error": [{"msg": "enddate must be in the same month"}]}})
+            dias = [dia_simulado(inicio + timedelta(days=i), int(q.get("tp", 24)))
+                    for i in range((fin - inicio).days + 1)]
+            self._responder(200, {"data": {"request": [{"query": q.get("q")}], "weather": dias}})
+        finally:
+            with cls._lock:
+                cls.activos -= 1
+
+    def _responder(self, codigo, cuerpo, cabeceras=None):
+        datos = json.dumps(cuerpo).encode()
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        for k, v in (cabeceras or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    ap = argparse.ArgumentParser(description="WWO past-weather simulado para pruebas locales.")
+    ap.add_argument("--puerto", type=int, default=8766)
+    ap.add_argument("--latencia-ms", type=float, default=100)
+    ap.add_argument("--tasa-429", type=float, default=0.0)
+    args = ap.parse_args()
+
+    Manejador.latencia = args.latencia_ms / 1000
+    Manejador.tasa_429 = args.tasa_429
+    servidor = ThreadingHTTPServer(("127.0.0.1", args.puerto), Manejador)
+    print(f"WWO simulado en http://127.0.0.1:{args.puerto}/premium/v1/past-weather.ashx")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"{Manejador.requests} requests, concurrencia máxima {Manejador.max_activos}")
+
+
+if __name__ == "__main__":
+    main()
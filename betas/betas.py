@@ -1,81 +1,59 @@
 import argparse
 import pandas as pd
 import numpy as np
-import re
 import sys
 from pathlib import Path
 
-CAPACIDADES_JUEGOS = {
-    "Balloon Wheel": 24,
-    "Samba Balloon": 32,
-    "Loco Bus": 24,
-    "Dragon": 20,
-    "Comanche": 24,
-    "Ratón Loroco": 4,
-    "Remolino": 6,
-    "Rascacielos": 18,
-    "Tronco Splash": 4,
-    "Bumperazo": 60,
-    "Brincanguro": 24,
-    "Moto Bala": 12,
-    "Convoy": 20,
-    "Bumpercitos": 28,
-    "Bici Magica": 12,
-    "Polo Norte": 12,
-    "Sol de Mi Barrio": 108,
-    "Tifón": 16,
-    "Carrusel": 52,
-    "Trencito": 74,
-    "El Revoloteo": 24,
-    "Guerra Pirata": 24,
-    "Faro Saltarín": 16,
-    "El Relámpago": 9,
-    "Casichoco": 40
-}
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+from franjas import detectar, minuto  # noqa: E402
+from juegos import JUEGOS  # noqa: E402
+
+# Nombre en all_data.csv -> capacidad por ciclo (scripts/juegos.py)
+CAPACIDADES_JUEGOS = {j.nombre_datos: j.capacidad for j in JUEGOS.values()}
 
 def detect_hour_pairs(columns):
-    """Devuelve lista de (hora, col_asistencia, col_ciclos) presentes en el DataFrame."""
-    hour_re = re.compile(r"^(\d{1,2}:\d{2})\s+")
-    asist = [c for c in columns if re.search(r"^\d{1,2}:\d{2}\s+asistencia$", c)]
-    cicl  = [c for c in columns if re.search(r"^\d{1,2}:\d{2}\s+ciclos$", c)]
-    hours = sorted({hour_re.match(c).group(1) for c in asist + cicl if hour_re.match(c)})
-    return [(h, f"{h} asistencia", f"{h} ciclos") for h in hours
-            if f"{h} asistencia" in columns and f"{h} ciclos" in columns]
+    """Devuelve lista de (hora, col_asistencia, col_ciclos) presentes en el DataFrame.
+
+    Acepta franjas de cualquier ancho ("9:00", "9:15", ...) y las ordena por
+    minuto del día, no como texto.
+    """
+    return [(h, a_col, c_col) for _, h, c_col, a_col in detectar(columns)]
 
 def build_long(df, caps):
-    """Expande a formato largo con lambda, ciclos, mu_nom y beta_req."""
-    rows = []
+    """Expande a formato largo con lambda, ciclos, mu_nom y beta_req.
+
+    Vectorizado sobre la matriz juego x franja; `minuto` es la franja como
+    entero (minuto del día) para agrupar sin comparar strings.
+    """
     pairs = detect_hour_pairs(df.columns)
-    for _, row in df.iterrows():
-        juego = row.get("juego", None)
-        if juego not in caps:
-            continue
-        cap_nom = caps[juego]
-        for h, a_col, c_col in pairs:
-            lam_h = row.get(a_col, np.nan)
-            ciclos = row.get(c_col, np.nan)
-            if pd.isna(lam_h) or pd.isna(ciclos):
-                continue
-            try:
-                lam_h = float(lam_h)
-                ciclos = float(ciclos)
-            except Exception:
-                continue
-            mu_nom = ciclos * cap_nom
-            if mu_nom <= 0:
-                beta_req = np.nan if lam_h == 0 else np.inf
-            else:
-                beta_req = lam_h / mu_nom
-            rows.append({
-                "juego": juego,
-                "hour": h,
-                "lambda_pax_h": lam_h,
-                "ciclos_h": ciclos,
-                "cap_nom": cap_nom,
-                "mu_nom_pax_h": mu_nom,
-                "beta_req": beta_req
-            })
-    return pd.DataFrame(rows)
+    df = df[df["juego"].isin(list(caps))] if "juego" in df.columns else df.iloc[:0]
+    if df.empty or not pairs:
+        return pd.DataFrame(columns=["juego", "hour", "minuto", "lambda_pax_h", "ciclos_h",
+                                     "cap_nom", "mu_nom_pax_h", "beta_req"])
+
+    # Fila por (registro, franja) en el mismo orden que antes: registro a registro
+    lam = df[[a for _, a, _ in pairs]].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float).ravel()
+    cic = df[[c for _, _, c in pairs]].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float).ravel()
+    juegos = np.repeat(df["juego"].to_numpy(), len(pairs))
+    horas = np.tile([h for h, _, _ in pairs], len(df))
+    minutos = np.tile(np.array([minuto(h) for h, _, _ in pairs], dtype=np.int16), len(df))
+    cap_nom = np.repeat(df["juego"].map(caps).to_numpy(dtype=float), len(pairs))
+
+    ok = ~(np.isnan(lam) | np.isnan(cic))
+    lam, cic, cap_nom = lam[ok], cic[ok], cap_nom[ok]
+    mu_nom = cic * cap_nom
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta_req = np.where(mu_nom > 0, lam / mu_nom, np.where(lam == 0, np.nan, np.inf))
+    return pd.DataFrame({
+        "juego": juegos[ok],
+        "hour": horas[ok],
+        "minuto": minutos[ok],
+        "lambda_pax_h": lam,
+        "ciclos_h": cic,
+        "cap_nom": cap_nom,
+        "mu_nom_pax_h": mu_nom,
+        "beta_req": beta_req,
+    })
 
 def main():
     ap = argparse.ArgumentParser(description="Calcula percentiles de beta_req por juego (p50, p75, p80, p90, p95).")
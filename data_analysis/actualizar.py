@@ -0,0 +1,233 @@
+"""Actualización incremental de los bundles con días nuevos.
+
+En lugar de reentrenar los 600 árboles con toda la historia cada noche, toma el
+bundle guardado (`data_analysis/models/<juego>.joblib`) y los días posteriores
+a `bundle["datos_hasta"]`:
+
+- `arboles` (solo rf): `warm_start` agrega `--arboles-nuevos` árboles entrenados
+  con los últimos `--ventana` días; el preprocesador y los árboles existentes
+  no se tocan. Con `--max-arboles` se descartan los árboles más viejos para que
+  el bosque no crezca sin límite.
+- `ventana` (rf o hgb): reentrena el pipeline completo solo con los últimos
+  `--ventana` días.
+
+El costo depende de la ventana, no de la historia. Los vocabularios del bundle
+se conservan (los scripts en vivo no notan el cambio). Cada actualización sube
+`bundle["version_modelo"]`, agrega una entrada a `bundle["historial"]` y guarda
+la versión anterior como `<juego>.v<N>.joblib`.
+
+`--comparar` mide la deriva: aparta los últimos `--dias-prueba` días, entrena
+el bundle base sin los `--dias-nuevos` previos, lo actualiza con ellos y lo
+compara contra un reentrenamiento completo (MAE y segundos).
+
+Uso:
+    python data_analysis/actualizar.py --todos
+    python data_analysis/actualizar.py dragon --estrategia ventana --ventana 90
+    python data_analysis/actualizar.py --todos --comparar --dias-nuevos 7
+"""
+import argparse
+import copy
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(RAIZ / "scripts"), str(Path(__file__).resolve().parent)]
+
+import entrenar  # noqa: E402
+import matrices  # noqa: E402
+import vocabulario  # noqa: E402
+
+ESTRATEGIAS = ("arboles", "ventana")
+
+
+# =========================
+# 1) DATOS
+# =========================
+def datos_bundle(juego, bundle):
+    """(X, y, días) sin outliers, codificados con los vocabularios del bundle."""
+    vocabularios = vocabulario.desde_bundle(bundle)
+    if vocabularios is None:
+        raise ValueError("el bundle es de strings; reentrénalo con --codificacion enteros")
+    m = matrices.cargar(juego)
+    X, y = m.dataframe(vocabularios=vocabularios)
+    return X[bundle["cat_cols"] + bundle["num_cols"]], y, m.dias[~m.outlier]
+
+
+def ultimos_dias(dias, n):
+    """Máscara de las filas de los últimos `n` días de operación."""
+    unicos = np.unique(dias)
+    return dias >= unicos[max(0, len(unicos) - n)]
+
+
+# =========================
+# 2) ACTUALIZAR
+# =========================
+def actualizar_bundle(bundle, X, y, dias, estrategia="arboles", arboles_nuevos=50, ventana=28,
+                      max_arboles=None, n_jobs=-1):
+    """Devuelve un bundle nuevo (versión + 1) con los días posteriores a `datos_hasta`.
+
+    Returns:
+        dict | None: None si no hay días nuevos.
+    """
+    hasta = np.datetime64(bundle["datos_hasta"], "D")
+    if not (dias > hasta).any():
+        return None
+    reciente = ultimos_dias(dias, ventana) | (dias > hasta)
+    X_w, y_w = X[reciente], y[reciente]
+    pipe = bundle["pipeline"]
+    modelo = bundle.get("modelo", "rf")
+
+    t0 = time.perf_counter()
+    if estrategia == "arboles":
+        if modelo != "rf":
+            raise ValueError("warm_start con árboles nuevos solo aplica a rf; usa --estrategia ventana")
+        pipe = copy.deepcopy(pipe)  # el bundle de entrada queda intacto
+        rf = pipe.named_steps["model"]
+        rf.set_params(warm_start=True, n_estimators=len(rf.estimators_) + arboles_nuevos, n_jobs=n_jobs)
+        rf.fit(pipe.named_steps["pre"].transform(X_w), y_w)
+        rf.set_params(warm_start=False)
+        if max_arboles and len(rf.estimators_) > max_arboles:
+            rf.estimators_ = rf.estimators_[-max_arboles:]
+            rf.set_params(n_estimators=max_arboles)
+    else:
+        params = pipe.named_steps["model"].get_params()
+        n_arboles = params["max_iter"] if modelo == "hgb" else params["n_estimators"]
+        pipe = entrenar.construir_pipeline(bundle["cat_cols"], bundle["num_cols"], vocabulario.desde_bundle(bundle),
+                                           n_arboles, n_jobs, modelo)
+        pipe.fit(X_w, y_w)
+    segundos = time.perf_counter() - t0
+
+    version = bundle.get("version_modelo", 1) + 1
+    nuevo_hasta = str(dias.max())
+    return {
+        **bundle,
+        "pipeline": pipe,
+        "version_modelo": version,
+        "datos_hasta": nuevo_hasta,
+        "historial": bundle.get("historial", []) + [{
+            "version": version, "estrategia": estrategia, "datos_hasta": nuevo_hasta,
+            "dias_nuevos": int(len(np.unique(dias[dias > hasta]))), "filas": int(reciente.sum()),
+            "fit_seg": round(segundos, 3),
+        }],
+    }
+
+
+def guardar_version(bundle, salida, juego):
+    """Guarda el bundle y deja la versión anterior como `<juego>.v<N>.joblib`."""
+    import joblib
+
+    archivo = Path(salida) / f"{juego}.joblib"
+    if archivo.exists():
+        shutil.copy2(archivo, archivo.with_name(f"{juego}.v{bundle['version_modelo'] - 1}.joblib"))
+    joblib.dump(bundle, archivo)
+    return archivo
+
+
+# =========================
+# 3) DERIVA VS. REENTRENAMIENTO
+# =========================
+def comparar(juego, estrategia="arboles", dias_nuevos=7, dias_prueba=14, modelo="rf", n_arboles=600, **kwargs):
+    """MAE en los últimos `dias_prueba` días: bundle actualizado vs. reentrenado desde cero."""
+    import sklearn
+
+    m = matrices.cargar(juego)
+    X, y = m.dataframe()
+    dias = m.dias[~m.outlier]
+    unicos = np.unique(dias)
+    corte_prueba, corte_base = unicos[-dias_prueba], unicos[-dias_prueba - dias_nuevos]
+    prueba, hist = dias >= corte_prueba, dias < corte_prueba
+    base = dias < corte_base
+
+    def ajustar(mascara):
+        pipe = entrenar.construir_pipeline(m.cat_cols, m.num_cols, m.vocabularios, n_arboles, modelo=modelo)
+        t0 = time.perf_counter()
+        pipe.fit(X[mascara], y[mascara])
+        return pipe, time.perf_counter() - t0
+
+    pipe_base, _ = ajustar(base)
+    bundle = {"pipeline": pipe_base, "cat_cols": m.cat_cols, "num_cols": m.num_cols, "modelo": modelo,
+              "version": sklearn.__version__, "vocabularios": vocabulario.a_bundle(m.vocabularios),
+              "version_modelo": 1, "datos_hasta": str(dias[base].max())}
+    actualizado = actualizar_bundle(bundle, X[hist], y[hist], dias[hist], estrategia, **kwargs)
+    completo, seg_completo = ajustar(hist)
+
+    mae = lambda pipe: entrenar.reporte(y[prueba], pipe.predict(X[prueba]))["mae"]  # noqa: E731
+    return {
+        "juego": juego,
+        "mae_base": mae(pipe_base),
+        "mae_actualizado": mae(actualizado["pipeline"]),
+        "mae_completo": mae(completo),
+        "seg_actualizado": actualizado["historial"][-1]["fit_seg"],
+        "seg_completo": round(seg_completo, 3),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Actualiza los bundles con los días nuevos sin reentrenar todo.")
+    ap.add_argument("juegos", nargs="*", help="Juegos (nombre del CSV en data/by_game)")
+    ap.add_argument("--todos", action="store_true", help="Los 25 juegos")
+    ap.add_argument("--estrategia", choices=ESTRATEGIAS, default="arboles")
+    ap.add_argument("--arboles-nuevos", type=int, default=50, help="Árboles agregados por actualización (arboles)")
+    ap.add_argument("--max-arboles", type=int, help="Descarta los árboles más viejos por encima de este tope")
+    ap.add_argument("--ventana", type=int, default=28, help="Días de operación recientes con los que se entrena")
+    ap.add_argument("--modelos", default=str(entrenar.MODELS_DIR), help="Carpeta de los .joblib")
+    ap.add_argument("--comparar", action="store_true", help="Actualizado vs. reentrenado en días apartados (no guarda)")
+    ap.add_argument("--modelo", choices=entrenar.MODELOS, default="rf", help="Backend para --comparar")
+    ap.add_argument("--arboles", type=int, default=600, help="Árboles del modelo base para --comparar")
+    ap.add_argument("--dias-nuevos", type=int, default=7)
+    ap.add_argument("--dias-prueba", type=int, default=14)
+    args = ap.parse_args()
+
+    juegos = list(entrenar.JUEGOS) if args.todos else args.juegos
+    if not juegos:
+        ap.error("indica uno o más juegos o --todos")
+    opciones = {"arboles_nuevos": args.arboles_nuevos, "ventana": args.ventana, "max_arboles": args.max_arboles}
+
+    if args.comparar:
+        import pandas as pd
+
+        filas = []
+        for juego in juegos:
+            r = comparar(juego, args.estrategia, args.dias_nuevos, args.dias_prueba, args.modelo, args.arboles,
+                         **opciones)
+            print(f"[{juego}] MAE base={r['mae_base']:.2f} | actualizado={r['mae_actualizado']:.2f} "
+                  f"({r['seg_actualizado']} s) | completo={r['mae_completo']:.2f} ({r['seg_completo']} s)")
+            filas.append(r)
+        tabla = pd.DataFrame(filas)
+        print(f"\nPromedio: MAE actualizado={tabla['mae_actualizado'].mean():.3f} vs. completo="
+              f"{tabla['mae_completo'].mean():.3f} | {tabla['seg_actualizado'].sum():.1f} s vs. "
+              f"{tabla['seg_completo'].sum():.1f} s")
+        return
+
+    import joblib
+
+    for juego in juegos:
+        archivo = Path(args.modelos) / f"{juego}.joblib"
+        if not archivo.exists():
+            print(f"❌ [{juego}] No existe {archivo}")
+            continue
+        bundle = joblib.load(archivo)
+        if "datos_hasta" not in bundle:
+            print(f"❌ [{juego}] Bundle sin datos_hasta; reentrénalo con entrenar.py")
+            continue
+        try:
+            X, y, dias = datos_bundle(juego, bundle)
+            nuevo = actualizar_bundle(bundle, X, y, dias, args.estrategia, **opciones)
+        except ValueError as e:
+            print(f"❌ [{juego}] {e}")
+            continue
+        if nuevo is None:
+            print(f"⚠️ [{juego}] Sin días nuevos después de {bundle['datos_hasta']}")
+            continue
+        h = nuevo["historial"][-1]
+        guardar_version(nuevo, args.modelos, juego)
+        print(f"✅ [{juego}] v{h['version']}: {h['dias_nuevos']} días nuevos, {h['filas']} filas, "
+              f"{h['fit_seg']} s ({args.estrategia}) -> datos hasta {h['datos_hasta']}")
+
+
+if __name__ == "__main__":
+    main()
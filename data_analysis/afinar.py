@@ -0,0 +1,154 @@
+"""Búsqueda de hiperparámetros por juego con successive halving.
+
+Para cada juego corre un `HalvingRandomSearchCV`: muchos candidatos empiezan
+con pocos árboles (o iteraciones) y solo el mejor tercio pasa a la siguiente
+ronda con el triple de recurso, así las configuraciones malas se descartan
+temprano. Los juegos se reparten en un pool de procesos compartido; cada
+proceso carga la matriz X/y de su juego del cache de `matrices.py` una sola vez
+y la reutiliza en todos los candidatos, rondas y folds.
+
+El resultado se guarda en `data_analysis/hiperparametros.json`
+({modelo: {juego: {"params", "mae_cv", ...}}}) y lo usa
+`entrenar.py --hiperparametros data_analysis/hiperparametros.json`.
+
+Uso:
+    python data_analysis/afinar.py --todos
+    python data_analysis/afinar.py dragon tifon --modelo hgb --candidatos 60 --procesos 2
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(RAIZ / "scripts"), str(Path(__file__).resolve().parent)]
+
+import entrenar  # noqa: E402
+import matrices  # noqa: E402
+
+SALIDA = Path(__file__).resolve().parent / "hiperparametros.json"
+
+# Espacios de búsqueda; el recurso (árboles / iteraciones) lo reparte el halving
+ESPACIOS = {
+    "rf": {
+        "min_samples_leaf": [1, 2, 4, 8],
+        "min_samples_split": [2, 4, 8],
+        "max_features": ["sqrt", 0.3, 0.5, 1.0],
+        "max_depth": [None, 12, 20],
+    },
+    "hgb": {
+        "learning_rate": [0.03, 0.05, 0.1, 0.2],
+        "max_leaf_nodes": [15, 31, 63],
+        "min_samples_leaf": [5, 20, 50],
+        "l2_regularization": [0.0, 0.1, 1.0],
+    },
+}
+RECURSO = {"rf": "n_estimators", "hgb": "max_iter"}
+
+
+# =========================
+# 1) DATOS (una vez por juego)
+# =========================
+def matriz_juego(juego, modelo):
+    """X/y numéricos del juego (sin outliers), ya preprocesados como los ve el modelo.
+
+    Sale del cache de `matrices.py`. rf: one-hot de los códigos (idéntico al
+    OneHotEncoder de `entrenar`) + numéricas imputadas con la mediana. hgb:
+    códigos enteros + numéricas con NaN. La mediana se calcula con todo el
+    juego; para comparar candidatos da igual.
+    """
+    m = matrices.cargar(juego)
+    matriz, y = m.matriz(modelo), m.y[~m.outlier]
+    if modelo == "hgb":
+        return matriz, y, len(m.cat_cols)
+    return np.where(np.isnan(matriz), np.nanmedian(matriz, axis=0), matriz), y, 0
+
+
+def estimador(modelo, n_cat):
+    from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+
+    if modelo == "hgb":
+        return HistGradientBoostingRegressor(categorical_features=list(range(n_cat)), early_stopping=False,
+                                             random_state=entrenar.RANDOM_STATE)
+    return RandomForestRegressor(max_features="sqrt", n_jobs=1, random_state=entrenar.RANDOM_STATE)
+
+
+# =========================
+# 2) BÚSQUEDA
+# =========================
+def afinar_juego(juego, modelo="rf", candidatos=27, factor=3, folds=3, min_recurso=50, max_recurso=600, semilla=0):
+    """Successive halving sobre un juego; devuelve los mejores parámetros y su MAE de CV."""
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingRandomSearchCV, KFold
+
+    t0 = time.perf_counter()
+    X, y, n_cat = matriz_juego(juego, modelo)
+    busqueda = HalvingRandomSearchCV(
+        estimador(modelo, n_cat), ESPACIOS[modelo], n_candidates=candidatos, factor=factor,
+        resource=RECURSO[modelo], min_resources=min_recurso, max_resources=max_recurso,
+        cv=KFold(folds, shuffle=True, random_state=semilla), scoring="neg_mean_absolute_error",
+        refit=False, random_state=semilla, n_jobs=1,
+    )
+    busqueda.fit(X, y)
+    params = {k: (v.item() if isinstance(v, np.generic) else v) for k, v in busqueda.best_params_.items()}
+    return {
+        "juego": juego,
+        "params": params,
+        "mae_cv": round(float(-busqueda.best_score_), 4),
+        "candidatos": len(busqueda.cv_results_["params"]),
+        "rondas": int(busqueda.n_iterations_),
+        "seg": round(time.perf_counter() - t0, 1),
+    }
+
+
+def afinar(juegos, modelo="rf", procesos=None, **kwargs):
+    """Reparte los juegos en un pool de procesos; itera los resultados según terminan."""
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        for juego in juegos:
+            yield afinar_juego(juego, modelo, **kwargs)
+        return
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = [pool.submit(afinar_juego, juego, modelo, **kwargs) for juego in juegos]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Busca hiperparámetros por juego con successive halving.")
+    ap.add_argument("juegos", nargs="*", help="Juegos (nombre del CSV en data/by_game)")
+    ap.add_argument("--todos", action="store_true", help="Los 25 juegos")
+    ap.add_argument("--modelo", choices=list(ESPACIOS), default="rf")
+    ap.add_argument("--candidatos", type=int, default=27, help="Configuraciones en la primera ronda")
+    ap.add_argument("--factor", type=int, default=3, help="Se queda 1/factor por ronda y multiplica el recurso")
+    ap.add_argument("--folds", type=int, default=3)
+    ap.add_argument("--min-recurso", type=int, default=50, help="Árboles/iteraciones en la primera ronda")
+    ap.add_argument("--max-recurso", type=int, default=600)
+    ap.add_argument("--procesos", type=int, help="Procesos del pool (por defecto, uno por CPU)")
+    ap.add_argument("--salida", default=str(SALIDA))
+    args = ap.parse_args()
+
+    juegos = list(entrenar.JUEGOS) if args.todos else args.juegos
+    if not juegos:
+        ap.error("indica uno o más juegos o --todos")
+
+    salida = Path(args.salida)
+    resultados = json.loads(salida.read_text()) if salida.exists() else {}
+    t0 = time.perf_counter()
+    for r in afinar(juegos, args.modelo, args.procesos, candidatos=args.candidatos, factor=args.factor,
+                    folds=args.folds, min_recurso=args.min_recurso, max_recurso=args.max_recurso):
+        print(f"[{r['juego']}] MAE cv={r['mae_cv']:.3f} | {r['candidatos']} candidatos en {r['rondas']} rondas "
+              f"({r['seg']} s) -> {r['params']}", flush=True)
+        resultados.setdefault(args.modelo, {})[r.pop("juego")] = r
+        # Se guarda tras cada juego para no perder lo avanzado si se corta la ventana nocturna
+        salida.write_text(json.dumps(resultados, indent=2, ensure_ascii=False) + "\n")
+    print(f"✅ {len(juegos)} juegos en {time.perf_counter() - t0:.0f} s -> {salida}")
+
+
+if __name__ == "__main__":
+    main()
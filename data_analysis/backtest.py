@@ -0,0 +1,197 @@
+"""Backtesting con origen móvil sobre `data/by_game`.
+
+El split aleatorio 80/20 de los notebooks mezcla franjas del mismo día entre
+train y test, así que no dice cómo le va a los scripts en vivo prediciendo el
+día siguiente. Aquí se reproduce la historia en orden: para cada origen se
+entrena con los días anteriores (todos, o los últimos `--ventana`) y se evalúa
+cada uno de los `--paso` días de operación siguientes antes de volver a
+entrenar. Con `--paso 1` se reentrena todos los días.
+
+Cada juego se carga una sola vez por proceso desde el cache de `matrices.py`
+(códigos + numéricas, ya en formato largo); por fold solo se calcula la
+mediana del imputer con los días de entrenamiento. Los folds de todos los juegos se reparten en bloques en
+un pool de procesos. El modelo es el mismo de `entrenar.py` (rf/hgb y, si se
+pasan, los hiperparámetros de `afinar.py`).
+
+Salida: una fila por (juego, día evaluado) con MAE/RMSE del día -> curva de
+error por juego en el tiempo (`--salida`, CSV), y un resumen por juego.
+
+Uso:
+    python data_analysis/backtest.py --todos --modelo hgb
+    python data_analysis/backtest.py dragon tifon --paso 1 --ventana 180 --salida curvas.csv
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(RAIZ / "scripts"), str(Path(__file__).resolve().parent)]
+
+import entrenar  # noqa: E402
+import matrices  # noqa: E402
+
+SALIDA = Path(__file__).resolve().parent / "backtest.csv"
+
+
+# =========================
+# 1) DATOS (cacheados por proceso)
+# =========================
+@lru_cache(maxsize=None)
+def datos_backtest(juego, modelo):
+    """(matriz, y, días, n_cat) de un juego en orden cronológico, con outliers.
+
+    Sale del cache de `matrices.py`; los outliers se quitan por fold solo de
+    los días de entrenamiento.
+    """
+    m = matrices.cargar(juego)
+    n_cat = len(m.cat_cols) if modelo == "hgb" else 0
+    return m.matriz(modelo, sin_outliers=False), m.y, m.dias, n_cat
+
+
+def origenes(dias, inicial, paso):
+    """Índices (en los días únicos) donde se reentrena: desde `inicial`, cada `paso`."""
+    return list(range(inicial, len(np.unique(dias)), paso))
+
+
+def estimador(modelo, n_cat, n_arboles, params):
+    """El mismo modelo que arma `entrenar.construir_pipeline`, sin el paso `pre`."""
+    from sklearn.base import clone
+
+    est = clone(entrenar.construir_pipeline([], [], None, n_arboles, 1, modelo, params).named_steps["model"])
+    if modelo == "hgb":
+        est.set_params(categorical_features=list(range(n_cat)) or None)
+    return est
+
+
+# =========================
+# 2) FOLDS
+# =========================
+def correr_folds(juego, indices, modelo="rf", n_arboles=100, paso=7, ventana=None, params=None):
+    """Entrena en cada origen de `indices` y evalúa los `paso` días siguientes.
+
+    Returns:
+        list: Un dict por día evaluado (juego, fecha, origen, dias_desde_ajuste, n, mae, rmse, fit_seg).
+    """
+    matriz, y, dias, n_cat = datos_backtest(juego, modelo)
+    unicos = np.unique(dias)
+    filas = []
+    for i in indices:
+        desde = unicos[max(0, i - ventana)] if ventana else unicos[0]
+        train = (dias >= desde) & (dias < unicos[i])
+        X_train, y_train = matriz[train], pd.Series(y[train])
+        X_train, y_train = entrenar.quitar_outliers(pd.DataFrame(X_train), y_train)
+        X_train = X_train.to_numpy()
+        if modelo != "hgb":
+            mediana = np.nanmedian(X_train, axis=0)
+            X_train = np.where(np.isnan(X_train), mediana, X_train)
+
+        est = estimador(modelo, n_cat, n_arboles, params)
+        t0 = time.perf_counter()
+        est.fit(X_train, y_train.to_numpy())
+        fit_seg = time.perf_counter() - t0
+
+        # Un solo predict para los `paso` días; luego se corta por día
+        evaluados = unicos[i:i + paso]
+        test = (dias >= evaluados[0]) & (dias <= evaluados[-1])
+        X_test = matriz[test]
+        if modelo != "hgb":
+            X_test = np.where(np.isnan(X_test), mediana, X_test)
+        error = est.predict(X_test) - y[test]
+        dias_test = dias[test]
+        for h, dia in enumerate(evaluados, start=1):
+            e = error[dias_test == dia]
+            filas.append({
+                "juego": juego, "fecha": str(dia), "origen": str(unicos[i]), "dias_desde_ajuste": h,
+                "n": len(e), "mae": float(np.abs(e).mean()),
+                "rmse": float(np.sqrt((e ** 2).mean())), "fit_seg": round(fit_seg, 3),
+            })
+    return filas
+
+
+def backtest(juegos, modelo="rf", n_arboles=100, inicial=60, paso=7, ventana=None, hiperparametros=None,
+             procesos=None, folds_por_tarea=10):
+    """Reparte (juego, bloque de folds) en un pool de procesos; itera los bloques según terminan."""
+    hiperparametros = hiperparametros or {}
+    tareas = []
+    for juego in juegos:
+        _, _, dias, _ = datos_backtest(juego, modelo)
+        indices = origenes(dias, inicial, paso)
+        params = hiperparametros.get(modelo, {}).get(juego, {}).get("params")
+        for k in range(0, len(indices), folds_por_tarea):
+            tareas.append((juego, indices[k:k + folds_por_tarea], modelo, n_arboles, paso, ventana, params))
+
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        for tarea in tareas:
+            yield correr_folds(*tarea)
+        return
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for futuro in as_completed([pool.submit(correr_folds, *tarea) for tarea in tareas]):
+            yield futuro.result()
+
+
+# =========================
+# 3) RESUMEN
+# =========================
+def resumen(curvas):
+    """MAE/RMSE por juego ponderados por filas, y MAE según días desde el último ajuste."""
+    curvas = curvas.assign(ae=curvas["mae"] * curvas["n"], se=curvas["rmse"] ** 2 * curvas["n"])
+    g = curvas.groupby("juego")
+    tabla = pd.DataFrame({
+        "dias": g.size(),
+        "folds": g["origen"].nunique(),
+        "mae": g["ae"].sum() / g["n"].sum(),
+        "rmse": np.sqrt(g["se"].sum() / g["n"].sum()),
+        "fit_seg": g.apply(lambda d: d.drop_duplicates("origen")["fit_seg"].sum(), include_groups=False),
+    })
+    por_h = curvas.groupby("dias_desde_ajuste")
+    return tabla.round(3), (por_h["ae"].sum() / por_h["n"].sum()).round(3)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Backtesting con origen móvil (día a día) por juego.")
+    ap.add_argument("juegos", nargs="*", help="Juegos (nombre del CSV en data/by_game)")
+    ap.add_argument("--todos", action="store_true", help="Los 25 juegos")
+    ap.add_argument("--modelo", choices=entrenar.MODELOS, default="rf")
+    ap.add_argument("--arboles", type=int, default=100, help="Árboles (rf) o máximo de iteraciones (hgb)")
+    ap.add_argument("--inicial", type=int, default=60, help="Días de operación antes del primer origen")
+    ap.add_argument("--paso", type=int, default=7, help="Días evaluados por ajuste (1 = reentrenar a diario)")
+    ap.add_argument("--ventana", type=int, help="Entrenar solo con los últimos N días (por defecto, toda la historia)")
+    ap.add_argument("--hiperparametros", help="JSON de data_analysis/afinar.py")
+    ap.add_argument("--procesos", type=int, help="Procesos del pool (por defecto, uno por CPU)")
+    ap.add_argument("--salida", default=str(SALIDA), help="CSV con la curva de error por juego y día")
+    args = ap.parse_args()
+
+    juegos = list(entrenar.JUEGOS) if args.todos else args.juegos
+    if not juegos:
+        ap.error("indica uno o más juegos o --todos")
+    hiperparametros = json.loads(Path(args.hiperparametros).read_text()) if args.hiperparametros else None
+
+    t0 = time.perf_counter()
+    filas = []
+    for bloque in backtest(juegos, args.modelo, args.arboles, args.inicial, args.paso, args.ventana,
+                           hiperparametros, args.procesos):
+        filas.extend(bloque)
+    if not filas:
+        print("⚠️ No hay días para evaluar (¿--inicial mayor que la historia?)")
+        return
+    curvas = pd.DataFrame(filas).sort_values(["juego", "fecha"]).reset_index(drop=True)
+    curvas.to_csv(args.salida, index=False)
+
+    tabla, por_h = resumen(curvas)
+    print(tabla.to_string())
+    print("\nMAE según días desde el último ajuste:")
+    print(por_h.to_string())
+    print(f"\n✅ {len(curvas)} días evaluados en {time.perf_counter() - t0:.0f} s -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
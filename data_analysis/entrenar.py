@@ -0,0 +1,475 @@
+"""Entrena los modelos de espera por juego fuera de los notebooks.
+
+Reproduce el flujo de `data_analysis/eda/<juego>.ipynb`: formato largo por
+franja desde `data/by_game/<juego>.csv`, quita franjas cerradas y Wq <= 0,
+elimina outliers IQR (solo si son < 5 %), split 80/20 y RandomForest de 600
+árboles con OneHot + imputer, y guarda el bundle en `data_analysis/models/`.
+
+Con `--codificacion enteros` (por defecto) las categóricas se traducen una vez
+a códigos con `scripts/vocabulario.py` y los vocabularios se guardan en el
+bundle; `--codificacion texto` deja el bundle igual al de los notebooks.
+`--modelo hgb` usa HistGradientBoosting con categóricas nativas en lugar del
+RandomForest; el bundle tiene el mismo formato y lo consumen los mismos scripts.
+
+Con `--global` entrena un solo modelo sobre todos los juegos (juego, capacidad
+y beta como features) que se sirve con un solo `predict` para los 25 juegos
+(`scripts/fast_predict.py --global`); `--comparar` lo enfrenta a los modelos por
+juego (MAE/R² por juego, tiempo de entrenamiento, tamaño y latencia por ciclo).
+
+Uso:
+    python data_analysis/entrenar.py dragon
+    python data_analysis/entrenar.py --todos --arboles 300
+    python data_analysis/entrenar.py dragon --codificacion texto --no-guardar
+    python data_analysis/entrenar.py --todos --global
+    python data_analysis/entrenar.py --todos --comparar --reporte reporte_global.csv
+    python data_analysis/entrenar.py --todos --modelo hgb
+    python data_analysis/entrenar.py --todos --comparar-modelos --reporte rf_vs_hgb.csv
+"""
+import argparse
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(RAIZ / "scripts")]
+
+import cielo  # noqa: E402
+import franjas  # noqa: E402
+import vocabulario  # noqa: E402
+from clima import COLUMNAS_HORA, unir_por_hora  # noqa: E402
+from juegos import JUEGOS  # noqa: E402
+
+MODELS_DIR = RAIZ / "data_analysis" / "models"
+BY_GAME_DIR = RAIZ / "data" / "by_game"
+RANDOM_STATE = 42
+
+CAT_COLS = ["day_of_week", "hora", "es_festivo", "cielo", "nombre_festivo"]
+NUM_COLS = ["month", "day", "temperatura_max", "temporada_alta", "asistencia_h", "ciclos_h", "intensidad_lluvia",
+            *COLUMNAS_HORA]
+GLOBAL_CAT_COLS = CAT_COLS + ["juego"]
+GLOBAL_NUM_COLS = NUM_COLS + ["capacidad", "beta"]
+MODELOS = ("rf", "hgb")
+NOTAS_MODELO = {
+    "rf": "OneHot + SimpleImputer; sin passthrough",
+    "hgb": "HistGradientBoosting con categóricas nativas; sin OneHot",
+}
+BASE_COLS = ["date", "day_of_week", "es_festivo", "nombre_festivo", "temperatura_max",
+             "condiciones_cielo", *cielo.COLUMNAS, "temporada_alta"]
+
+
+# =========================
+# 1) FORMATO LARGO
+# =========================
+def formato_largo(df):
+    """Una fila por (día, franja) con features, estado y `Wq` como en el notebook.
+
+    Args:
+        df (DataFrame): `data/by_game/<juego>.csv`.
+
+    Returns:
+        DataFrame: Sin franjas cerradas ni `Wq <= 0`; columna `hora` con la etiqueta,
+        `cielo` / `intensidad_lluvia` (derivadas de `condiciones_cielo` si el CSV
+        no las trae) y, si la tabla de clima tiene bloques por hora, `COLUMNAS_HORA`.
+    """
+    df = cielo.agregar(df.copy())
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["year"] = df["date"].dt.year
+    df["month"] = df["date"].dt.month
+    df["day"] = df["date"].dt.day
+    base = [c for c in BASE_COLS + ["year", "month", "day"] if c in df.columns]
+
+    registros = []
+    for _, h, col_c, col_a in franjas.detectar(df.columns):
+        if f"Wq_{h}(min)" not in df.columns:
+            continue
+        sub = df[base].copy()
+        sub["hora"] = h
+        sub["asistencia_h"] = df[col_a]
+        sub["ciclos_h"] = df[col_c]
+        sub["state"] = df[f"state_{h}"] if f"state_{h}" in df.columns else np.nan
+        sub["Wq"] = df[f"Wq_{h}(min)"]
+        registros.append(sub)
+    largo = pd.concat(registros, ignore_index=True)
+
+    cerrado = largo["state"].astype(str).str.lower().str.contains("closed", na=False)
+    largo = largo[~cerrado & (largo["Wq"] > 0)].drop(columns=["state"])
+    # Clima de la franja (scripts/clima.py); sin bloques guardados no se agregan las columnas
+    largo = unir_por_hora(largo)
+    return largo.sort_values(["date", "hora"]).reset_index(drop=True)
+
+
+def quitar_outliers(X, y, max_porcentaje=5):
+    """Quita outliers IQR de `y` solo si son menos de `max_porcentaje` %."""
+    q1, q3 = y.quantile(0.25), y.quantile(0.75)
+    iqr = q3 - q1
+    outliers = (y < q1 - 1.5 * iqr) | (y > q3 + 1.5 * iqr)
+    if outliers.mean() * 100 < max_porcentaje:
+        return X[~outliers], y[~outliers]
+    return X, y
+
+
+# =========================
+# 2) PIPELINE
+# =========================
+def construir_pipeline(cat_cols, num_cols, vocabularios=None, n_arboles=600, n_jobs=-1, modelo="rf", params=None):
+    """OneHot + SimpleImputer(median) -> RandomForest, con los hiperparámetros del notebook.
+
+    Con `vocabularios` el OneHotEncoder recibe las categorías fijas `0..n-1`,
+    así no tiene que descubrirlas ni comparar strings. `modelo="hgb"` cambia
+    el backend (ver `pipeline_hgb`) y `params` pisa los hiperparámetros del
+    modelo (p. ej. los que encontró `afinar.py`).
+    """
+    pipe = (pipeline_hgb(cat_cols, num_cols, vocabularios, n_arboles) if modelo == "hgb"
+            else _pipeline_rf(cat_cols, num_cols, vocabularios, n_arboles, n_jobs))
+    if params:
+        pipe.named_steps["model"].set_params(**params)
+    return pipe
+
+
+def _pipeline_rf(cat_cols, num_cols, vocabularios, n_arboles, n_jobs):
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    categorias = "auto"
+    if vocabularios is not None:
+        categorias = [np.arange(len(vocabularios[c]), dtype=np.int16) for c in cat_cols]
+    pre = ColumnTransformer(
+        transformers=[
+            ("cat", OneHotEncoder(categories=categorias, handle_unknown="ignore", sparse_output=False), cat_cols),
+            ("num", Pipeline(steps=[("imputer", SimpleImputer(strategy="median"))]), num_cols),
+        ],
+        remainder="drop",
+    )
+    rf = RandomForestRegressor(
+        n_estimators=n_arboles, max_depth=None, min_samples_leaf=2, min_samples_split=4,
+        max_features="sqrt", n_jobs=n_jobs, random_state=RANDOM_STATE, bootstrap=True,
+    )
+    return Pipeline(steps=[("pre", pre), ("model", rf)])
+
+
+def pipeline_hgb(cat_cols, num_cols, vocabularios=None, max_iter=600):
+    """HistGradientBoosting con categóricas nativas: sin OneHotEncoder ni imputer.
+
+    Las categóricas entran como códigos: los de `vocabulario` tal cual, o un
+    OrdinalEncoder si el bundle es de strings. Los desconocidos quedan en -1,
+    que HGB trata como faltante, igual que los NaN de las numéricas.
+    `max_iter` es el tope de iteraciones; corta antes con early stopping.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OrdinalEncoder
+
+    if vocabularios is not None:
+        cat = "passthrough"
+    else:
+        cat = OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1, encoded_missing_value=-1)
+    pre = ColumnTransformer(
+        transformers=[("cat", cat, cat_cols), ("num", "passthrough", num_cols)],
+        remainder="drop",
+    )
+    hgb = HistGradientBoostingRegressor(
+        max_iter=max_iter, learning_rate=0.1, max_leaf_nodes=31, min_samples_leaf=20,
+        categorical_features=list(range(len(cat_cols))), early_stopping=True,
+        validation_fraction=0.1, n_iter_no_change=20, random_state=RANDOM_STATE,
+    )
+    return Pipeline(steps=[("pre", pre), ("model", hgb)])
+
+
+def reporte(y_true, y_pred):
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+    return {
+        "mae": round(float(mean_absolute_error(y_true, y_pred)), 4),
+        "rmse": round(float(np.sqrt(mean_squared_error(y_true, y_pred))), 4),
+        "r2": round(float(r2_score(y_true, y_pred)), 4),
+    }
+
+
+# =========================
+# 3) ENTRENAMIENTO
+# =========================
+def datos_juego(juego):
+    """(X, y) limpios de un juego, listos para el split."""
+    largo = formato_largo(pd.read_csv(BY_GAME_DIR / f"{juego}.csv"))
+    cat_cols = [c for c in CAT_COLS if c in largo.columns]
+    num_cols = [c for c in NUM_COLS if c in largo.columns]
+    X, y = quitar_outliers(largo[cat_cols + num_cols], largo["Wq"].astype(float))
+    return X, y, cat_cols, num_cols
+
+
+def entrenar_juego(juego, codificacion="enteros", n_arboles=600, n_jobs=-1, modelo="rf", params=None):
+    """Entrena un juego y devuelve el bundle (con métricas de test en `bundle["metricas"]`)."""
+    import sklearn
+    from sklearn.model_selection import train_test_split
+
+    vocabularios = None
+    if codificacion == "enteros":
+        # Ya codificado y sin outliers desde el cache de `matrices.py`
+        import matrices
+        m = matrices.cargar(juego)
+        X, y = m.dataframe()
+        cat_cols, num_cols, vocabularios = m.cat_cols, m.num_cols, m.vocabularios
+        ancho = franjas.ancho_de(sorted(vocabularios["hora"].valores), 60)
+        hasta = str(m.dias.max())
+    else:
+        X, y, cat_cols, num_cols = datos_juego(juego)
+        ancho = franjas.ancho_de(sorted({franjas.minuto(h) for h in X["hora"].unique()}), 60)
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE)
+    pipe = construir_pipeline(cat_cols, num_cols, vocabularios, n_arboles, n_jobs, modelo, params)
+    t0 = time.perf_counter()
+    pipe.fit(X_train, y_train)
+    segundos = time.perf_counter() - t0
+
+    bundle = {
+        "pipeline": pipe,
+        "cat_cols": cat_cols,
+        "num_cols": num_cols,
+        "version": sklearn.__version__,
+        "notes": NOTAS_MODELO[modelo] + ("; hiperparámetros de afinar.py" if params else ""),
+        "modelo": modelo,
+        "ancho_franja": ancho,
+        "metricas": {**reporte(y_test, pipe.predict(X_test)), "filas": len(X), "fit_seg": round(segundos, 2)},
+    }
+    if vocabularios is not None:
+        bundle["vocabularios"] = vocabulario.a_bundle(vocabularios)
+        bundle["notes"] += "; categóricas como códigos enteros (scripts/vocabulario.py)"
+        # Punto de partida para `actualizar.py`
+        bundle["version_modelo"] = 1
+        bundle["datos_hasta"] = hasta
+        bundle["historial"] = [{"version": 1, "estrategia": "completo", "datos_hasta": hasta,
+                                "filas": len(X_train), "fit_seg": round(segundos, 2)}]
+    return bundle
+
+
+# =========================
+# 4) MODELO GLOBAL
+# =========================
+def atributos_juegos():
+    """{id: {"capacidad", "beta"}} del registro con el que by_game.py calcula Wq."""
+    return {j.id: {"capacidad": j.capacidad, "beta": j.beta} for j in JUEGOS.values()}
+
+
+def entrenar_global(juegos, codificacion="enteros", n_arboles=600, n_jobs=-1, modelo="rf"):
+    """Un solo modelo sobre la tabla larga de todos los juegos.
+
+    Cada juego se parte 80/20 con la misma semilla que `entrenar_juego`, así las
+    métricas por juego (`bundle["metricas"]["por_juego"]`) salen de las mismas
+    filas de test que las del modelo por juego.
+    """
+    import sklearn
+    from sklearn.model_selection import train_test_split
+
+    atributos = atributos_juegos()
+    trains, tests = [], []
+    for juego in juegos:
+        X, y, _, _ = datos_juego(juego)
+        X = X.assign(juego=juego, **atributos[juego])
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE)
+        trains.append((X_train, y_train))
+        tests.append((juego, X_test, y_test))
+    X_train = pd.concat([x for x, _ in trains], ignore_index=True)
+    y_train = pd.concat([y for _, y in trains], ignore_index=True)
+    cat_cols = [c for c in GLOBAL_CAT_COLS if c in X_train.columns]
+    num_cols = [c for c in GLOBAL_NUM_COLS if c in X_train.columns]
+    ancho = franjas.ancho_de(sorted({franjas.minuto(h) for h in X_train["hora"].unique()}), 60)
+
+    vocabularios = None
+    if codificacion == "enteros":
+        vocabularios = vocabulario.ajustar_vocabularios(X_train, cat_cols)
+        X_train = vocabulario.codificar_df(X_train, vocabularios)
+
+    pipe = construir_pipeline(cat_cols, num_cols, vocabularios, n_arboles, n_jobs, modelo)
+    t0 = time.perf_counter()
+    pipe.fit(X_train[cat_cols + num_cols], y_train)
+    segundos = time.perf_counter() - t0
+
+    por_juego, y_all, p_all = {}, [], []
+    for juego, X_test, y_test in tests:
+        if vocabularios is not None:
+            X_test = vocabulario.codificar_df(X_test, vocabularios)
+        pred = pipe.predict(X_test[cat_cols + num_cols])
+        por_juego[juego] = reporte(y_test, pred)
+        y_all.append(y_test.to_numpy())
+        p_all.append(pred)
+
+    bundle = {
+        "pipeline": pipe,
+        "cat_cols": cat_cols,
+        "num_cols": num_cols,
+        "version": sklearn.__version__,
+        "notes": f"Modelo global: juego, capacidad y beta como features; {NOTAS_MODELO[modelo]}",
+        "modelo": modelo,
+        "ancho_franja": ancho,
+        "juegos": {j: atributos[j] for j in juegos},
+        "metricas": {**reporte(np.concatenate(y_all), np.concatenate(p_all)), "filas": len(X_train),
+                     "fit_seg": round(segundos, 2), "por_juego": por_juego},
+    }
+    if vocabularios is not None:
+        bundle["vocabularios"] = vocabulario.a_bundle(vocabularios)
+    return bundle
+
+
+def tamano_mb(bundle):
+    """Tamaño del bundle serializado con joblib (MB)."""
+    import joblib
+    buf = io.BytesIO()
+    joblib.dump(bundle, buf)
+    return buf.tell() / 2**20
+
+
+def _mejor_tiempo(fn, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos)
+
+
+def comparar_global(juegos, codificacion="enteros", n_arboles=600, ciclos=20, modelo="rf"):
+    """Modelo global vs. un modelo por juego sobre las mismas filas de test.
+
+    Returns:
+        tuple: (DataFrame por juego con MAE/R² de ambos, dict resumen, bundle global).
+    """
+    import fast_predict
+
+    glob = entrenar_global(juegos, codificacion, n_arboles, modelo=modelo)
+    filas, bundles, tabla = [], {}, []
+    for juego in juegos:
+        b = bundles[juego] = entrenar_juego(juego, codificacion, n_arboles, modelo=modelo)
+        g = glob["metricas"]["por_juego"][juego]
+        tabla.append({"juego": juego, "mae_juego": b["metricas"]["mae"], "mae_global": g["mae"],
+                      "r2_juego": b["metricas"]["r2"], "r2_global": g["r2"]})
+        filas.append(datos_juego(juego)[0].iloc[0].to_dict())
+
+    # Un ciclo en vivo = una predicción para cada juego
+    filas_glob = [{**f, "juego": j, **glob["juegos"][j]} for j, f in zip(juegos, filas)]
+    seg_juegos = _mejor_tiempo(lambda: [fast_predict.predecir_fila(bundles[j], f) for j, f in zip(juegos, filas)], ciclos)
+    seg_global = _mejor_tiempo(lambda: fast_predict.predecir_lote(glob, filas_glob), ciclos)
+
+    resumen = {
+        "fit_seg": {"por_juego": round(sum(b["metricas"]["fit_seg"] for b in bundles.values()), 2),
+                    "global": glob["metricas"]["fit_seg"]},
+        "mb": {"por_juego": round(sum(tamano_mb(b) for b in bundles.values()), 2),
+               "global": round(tamano_mb(glob), 2)},
+        "ms_por_ciclo": {"por_juego": round(seg_juegos * 1000, 2), "global": round(seg_global * 1000, 2)},
+        "mae_medio": {"por_juego": round(float(np.mean([t["mae_juego"] for t in tabla])), 4),
+                      "global": round(float(np.mean([t["mae_global"] for t in tabla])), 4)},
+    }
+    return pd.DataFrame(tabla), resumen, glob
+
+
+# =========================
+# 5) COMPARACIÓN DE BACKENDS
+# =========================
+def comparar_modelos(juegos, codificacion="enteros", n_arboles=600, filas_latencia=200):
+    """RandomForest vs. HistGradientBoosting por juego.
+
+    Returns:
+        DataFrame: juego, modelo, MAE, R², fit (s), bundle (MB), carga (ms) y
+        predict por fila (µs, con `fast_predict.predecir_fila` como en vivo).
+    """
+    import joblib
+    import fast_predict
+
+    tabla = []
+    for juego in juegos:
+        filas = datos_juego(juego)[0].sample(filas_latencia, replace=True, random_state=0).to_dict(orient="records")
+        for modelo in MODELOS:
+            bundle = entrenar_juego(juego, codificacion, n_arboles, modelo=modelo)
+            buf = io.BytesIO()
+            joblib.dump(bundle, buf)
+            t0 = time.perf_counter()
+            buf.seek(0)
+            cargado = joblib.load(buf)
+            carga = time.perf_counter() - t0
+            fast_predict.predecir_fila(cargado, filas[0])
+            t0 = time.perf_counter()
+            for fila in filas:
+                fast_predict.predecir_fila(cargado, fila)
+            por_fila = (time.perf_counter() - t0) / len(filas)
+            m = bundle["metricas"]
+            tabla.append({"juego": juego, "modelo": modelo, "mae": m["mae"], "r2": m["r2"], "fit_seg": m["fit_seg"],
+                          "mb": round(buf.tell() / 2**20, 2), "carga_ms": round(carga * 1000, 1),
+                          "us_por_fila": round(por_fila * 1e6, 1)})
+    return pd.DataFrame(tabla)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Entrena los modelos de espera por juego (RandomForest).")
+    ap.add_argument("juegos", nargs="*", help="Juegos (nombre del CSV en data/by_game)")
+    ap.add_argument("--todos", action="store_true", help="Entrena los 25 juegos")
+    ap.add_argument("--codificacion", choices=["enteros", "texto"], default="enteros")
+    ap.add_argument("--arboles", type=int, default=600, help="Árboles (rf) o máximo de iteraciones (hgb)")
+    ap.add_argument("--modelo", choices=MODELOS, default="rf", help="Backend: RandomForest o HistGradientBoosting")
+    ap.add_argument("--comparar-modelos", action="store_true", help="Tabla rf vs. hgb por juego (no guarda)")
+    ap.add_argument("--hiperparametros", help="JSON de data_analysis/afinar.py con los mejores parámetros por juego")
+    ap.add_argument("--salida", default=str(MODELS_DIR), help="Carpeta de los .joblib")
+    ap.add_argument("--no-guardar", action="store_true", help="Solo reporta métricas")
+    ap.add_argument("--global", dest="modelo_global", action="store_true",
+                    help="Un solo modelo para todos los juegos -> <salida>/global.joblib")
+    ap.add_argument("--comparar", action="store_true", help="Modelo global vs. modelos por juego (no guarda)")
+    ap.add_argument("--reporte", help="CSV con la comparación por juego")
+    args = ap.parse_args()
+
+    juegos = list(JUEGOS) if args.todos else args.juegos
+    if not juegos:
+        ap.error("indica uno o más juegos o --todos")
+
+    import joblib
+    salida = Path(args.salida)
+    salida.mkdir(parents=True, exist_ok=True)
+
+    if args.comparar_modelos:
+        tabla = comparar_modelos(juegos, args.codificacion, args.arboles)
+        print(tabla.to_string(index=False))
+        print(tabla.groupby("modelo")[["mae", "r2", "fit_seg", "mb", "carga_ms", "us_por_fila"]].mean().round(3).to_string())
+        if args.reporte:
+            tabla.to_csv(args.reporte, index=False)
+            print(f"✅ Reporte en {args.reporte}")
+        return
+
+    if args.comparar:
+        tabla, resumen, _ = comparar_global(juegos, args.codificacion, args.arboles, modelo=args.modelo)
+        print(tabla.to_string(index=False))
+        for metrica, valores in resumen.items():
+            print(f"{metrica:<14} por juego: {valores['por_juego']:>10} | global: {valores['global']:>10}")
+        if args.reporte:
+            tabla.to_csv(args.reporte, index=False)
+            print(f"✅ Reporte en {args.reporte}")
+        return
+
+    if args.modelo_global:
+        bundle = entrenar_global(juegos, args.codificacion, args.arboles, modelo=args.modelo)
+        m = bundle["metricas"]
+        print(f"[global] MAE={m['mae']:,.2f} | RMSE={m['rmse']:,.2f} | R²={m['r2']:,.3f} "
+              f"({m['filas']} filas, fit {m['fit_seg']} s)")
+        if not args.no_guardar:
+            joblib.dump(bundle, salida / "global.joblib")
+            print(f"✅ Guardado en {salida / 'global.joblib'}")
+        return
+
+    hiperparametros = json.loads(Path(args.hiperparametros).read_text()) if args.hiperparametros else {}
+    for juego in juegos:
+        params = hiperparametros.get(args.modelo, {}).get(juego, {}).get("params")
+        bundle = entrenar_juego(juego, args.codificacion, args.arboles, modelo=args.modelo, params=params)
+        m = bundle["metricas"]
+        print(f"[{juego}] MAE={m['mae']:,.2f} | RMSE={m['rmse']:,.2f} | R²={m['r2']:,.3f} "
+              f"({m['filas']} filas, fit {m['fit_seg']} s)")
+        if not args.no_guardar:
+            joblib.dump(bundle, salida / f"{juego}.joblib")
+            print(f"✅ Guardado en {salida / f'{juego}.joblib'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Cache en disco de las matrices de features por juego.
+
+Entrenar, afinar y el backtest arrancaban igual: leer `data/by_game/<juego>.csv`,
+pasar a formato largo, filtrar franjas cerradas y `Wq <= 0`, marcar outliers
+y codificar categóricas. Aquí ese trabajo se hace una vez y se guarda en
+`data_analysis/cache/<juego>-<clave>.npz` (arreglos NumPy sin comprimir):
+
+    codigos   int16 (n, k)   categóricas codificadas con `vocabulario`
+    num       float32 (n, m) numéricas (NaN donde falta el dato)
+    y         float64 (n,)   Wq en minutos
+    dias      datetime64[D]  fecha de cada fila (orden cronológico)
+    outlier   bool (n,)      outliers IQR que quita `entrenar.quitar_outliers`
+    meta      JSON           columnas, vocabularios y configuración
+
+La clave es un hash del CSV de origen más la configuración de la
+transformación (columnas, `VERSION`, tope de outliers, bloques de clima por
+hora guardados). Si cambia el CSV, el clima o el código de features (subir
+`VERSION`), la clave cambia y se vuelve a materializar; los `.npz` viejos del
+juego se borran. El one-hot no se guarda: sale de los códigos con
+`vocabulario.one_hot` en microsegundos.
+
+Uso:
+    python data_analysis/matrices.py --todos      # precalcula los 25 juegos
+"""
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(RAIZ / "scripts"), str(Path(__file__).resolve().parent)]
+
+import entrenar  # noqa: E402
+import vocabulario  # noqa: E402
+
+CACHE_DIR = Path(__file__).resolve().parent / "cache"
+VERSION = 2  # subir al cambiar formato_largo / quitar_outliers / columnas
+MAX_OUTLIERS = 5
+
+
+class Matriz:
+    """Features materializadas de un juego (ver docstring del módulo)."""
+
+    def __init__(self, codigos, num, y, dias, outlier, meta):
+        self.codigos, self.num, self.y, self.dias, self.outlier = codigos, num, y, dias, outlier
+        self.cat_cols = meta["cat_cols"]
+        self.num_cols = meta["num_cols"]
+        self.meta = meta
+        self.vocabularios = {c: vocabulario.Vocabulario(c, v) for c, v in meta["vocabularios"].items()}
+
+    def __len__(self):
+        return len(self.y)
+
+    def dataframe(self, sin_outliers=True, vocabularios=None):
+        """X codificado (como `vocabulario.codificar_df`) e y, listos para `construir_pipeline`.
+
+        Con `vocabularios` (p. ej. los de un bundle ya entrenado) los códigos se
+        traducen a esos vocabularios en lugar de los del cache.
+        """
+        m = ~self.outlier if sin_outliers else slice(None)
+        codigos = self.codigos[m]
+        if vocabularios is not None:
+            codigos = np.column_stack([
+                vocabulario.traduccion(self.vocabularios[c], vocabularios[c])[codigos[:, i]]
+                for i, c in enumerate(self.cat_cols)
+            ])
+        X = pd.DataFrame(codigos, columns=self.cat_cols)
+        X[self.num_cols] = self.num[m].astype(float)
+        return X, pd.Series(self.y[m], name="Wq")
+
+    def matriz(self, modelo="rf", sin_outliers=True):
+        """Lo que el paso `pre` le entrega al modelo: one-hot (rf) o códigos (hgb) + numéricas sin imputar."""
+        m = ~self.outlier if sin_outliers else slice(None)
+        codigos = self.codigos[m]
+        cat = codigos if modelo == "hgb" else vocabulario.one_hot(codigos, self.vocabularios, self.cat_cols)
+        return np.hstack([cat, self.num[m]]).astype(np.float32)
+
+
+# =========================
+# 1) CLAVE
+# =========================
+def configuracion():
+    from clima import TablaClima
+
+    return {"version": VERSION, "cat_cols": entrenar.CAT_COLS, "num_cols": entrenar.NUM_COLS,
+            "max_outliers": MAX_OUTLIERS, "clima_horas": TablaClima().firma()}
+
+
+def clave(juego):
+    """Hash del CSV de origen + configuración de la transformación (16 hex)."""
+    h = hashlib.sha256((entrenar.BY_GAME_DIR / f"{juego}.csv").read_bytes())
+    h.update(json.dumps(configuracion(), sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+# =========================
+# 2) MATERIALIZAR / CARGAR
+# =========================
+def materializar(juego):
+    """Corre el pipeline de pandas una vez y devuelve los arreglos de la `Matriz`."""
+    largo = entrenar.formato_largo(pd.read_csv(entrenar.BY_GAME_DIR / f"{juego}.csv"))
+    largo = largo.dropna(subset=["date"]).reset_index(drop=True)
+    cat_cols = [c for c in entrenar.CAT_COLS if c in largo.columns]
+    num_cols = [c for c in entrenar.NUM_COLS if c in largo.columns]
+    y = largo["Wq"].astype(float)
+    _, y_limpio = entrenar.quitar_outliers(largo, y, MAX_OUTLIERS)
+    outlier = ~y.index.isin(y_limpio.index)
+
+    # Vocabularios con las filas que ve el entrenamiento, igual que `entrenar_juego`
+    vocabularios = vocabulario.ajustar_vocabularios(largo[~outlier], cat_cols)
+    arreglos = {
+        "codigos": vocabulario.codificar_df(largo[cat_cols], vocabularios).to_numpy(dtype=np.int16),
+        "num": largo[num_cols].to_numpy(dtype=np.float32),
+        "y": y.to_numpy(),
+        "dias": largo["date"].to_numpy(dtype="datetime64[D]"),
+        "outlier": outlier,
+    }
+    meta = {**configuracion(), "juego": juego, "cat_cols": cat_cols, "num_cols": num_cols,
+            "vocabularios": vocabulario.a_bundle(vocabularios)}
+    return arreglos, meta
+
+
+def cargar(juego, cache_dir=CACHE_DIR):
+    """`Matriz` del juego desde el cache; si no está (o cambió la clave) la materializa y la guarda."""
+    cache_dir = Path(cache_dir)
+    archivo = cache_dir / f"{juego}-{clave(juego)}.npz"
+    if archivo.exists():
+        with np.load(archivo) as npz:
+            arreglos = {k: npz[k] for k in npz.files if k != "meta"}
+            meta = json.loads(str(npz["meta"]))
+        return Matriz(**arreglos, meta=meta)
+
+    arreglos, meta = materializar(juego)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for viejo in cache_dir.glob(f"{juego}-*.npz"):
+        viejo.unlink()
+    # Se escribe a un temporal y se renombra: otro proceso nunca lee un .npz a medias
+    tmp = archivo.with_suffix(".tmp.npz")
+    np.savez(tmp, **arreglos, meta=np.array(json.dumps(meta, ensure_ascii=False)))
+    tmp.replace(archivo)
+    return Matriz(**arreglos, meta=meta)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Materializa las matrices de features por juego.")
+    ap.add_argument("juegos", nargs="*", help="Juegos (nombre del CSV en data/by_game)")
+    ap.add_argument("--todos", action="store_true", help="Los 25 juegos")
+    ap.add_argument("--cache", default=str(CACHE_DIR))
+    args = ap.parse_args()
+
+    juegos = list(entrenar.JUEGOS) if args.todos else args.juegos
+    if not juegos:
+        ap.error("indica uno o más juegos o --todos")
+    for juego in juegos:
+        t0 = time.perf_counter()
+        m = cargar(juego, args.cache)
+        print(f"[{juego}] {len(m)} filas, {int(m.outlier.sum())} outliers ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+    print(f"✅ Cache en {args.cache}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
 import pandas as pd
 import os
 import re
-import requests
+import sys
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from franjas import ANCHO_MIN, etiquetas  # noqa: E402
+from juegos import EXCLUIDO, JUEGOS, IndiceNombres  # noqa: E402
+import validar  # noqa: E402
+from bitacora import Bitacora, Registro  # noqa: E402
+import cielo  # noqa: E402
+import clima as clima_wwo  # noqa: E402
+
 load_dotenv()
 
 # Juegos de la lista a excluir de los reportes
@@ -14,6 +22,12 @@ JUEGOS_EXCLUIR = [
     "Delta", "Los Voladores", "Frisbi"
 ]
 
+# Filas del reporte que no son juegos (encabezados de sección y totales)
+FILAS_NO_JUEGO = ["Mecánico", "Total", "Total General"]
+
+# Nombre crudo -> id del registro (scripts/juegos.py), memorizado entre hojas y archivos
+INDICE = IndiceNombres(excluir=JUEGOS_EXCLUIR + FILAS_NO_JUEGO)
+
 # Días festivos en Guatemala
 FERIADOS_GT = {
     "01-01": "Año Nuevo",
@@ -26,10 +40,12 @@ FERIADOS_GT = {
     "12-25": "Navidad"
 }
 
+# Clima por día desde la tabla local (se llena con scripts/clima.py)
+TABLA_CLIMA = clima_wwo.TablaClima()
+
 # Carpeta de entrada y salida
 input_folder = "./data/2022/sucio"
 output_folder = "./data/2022/limpio"
-Path(output_folder).mkdir(parents=True, exist_ok=True)
 
 # =======================
 # FUNCIONES
@@ -57,40 +73,6 @@ def extraer_fecha(df):
     return None
 
 
-def obtener_clima_wwo(api_key, fecha, lugar="Petapa,Guatemala"):
-    """Obtiene el clima de World Weather Online para una fecha y lugar específicos.
-    """
-
-    url = "http://api.worldweatheronline.com/premium/v1/past-weather.ashx"
-    params = {
-        "key": api_key,
-        "q": lugar,
-        "format": "json",
-        "date": fecha.strftime("%Y-%m-%d"),
-        "tp": 24
-    }
-
-    try:
-        response = requests.get(url, params=params)
-        data = response.json()
-        clima_dia = data["data"]["weather"][0]
-        detalle = clima_dia["hourly"][0]
-
-        return {
-            "temperatura_max": float(clima_dia["maxtempC"]),
-            "temperatura_min": float(clima_dia["mintempC"]),
-            "condiciones_cielo": detalle["weatherDesc"][0]["value"],
-            "prob_precipitacion": int(detalle.get("chanceofrain", 0))
-        }
-    except Exception as e:
-        print(f"❌ Error al obtener clima: {e}")
-        return {
-            "temperatura_max": None,
-            "temperatura_min": None,
-            "condiciones_cielo": None,
-            "prob_precipitacion": None
-        }
-
 def hacer_nombres_unicos(cols):
     """Genera nombres únicos para las columnas, agregando un sufijo si es necesario.
     Args:
@@ -110,87 +92,207 @@ def hacer_nombres_unicos(cols):
             result.append(f"{col_str}_{seen[col_str]}")
     return result
 
-# =======================
-# PROCESAMIENTO
-# =======================
+def limpiar_hoja(sheet, ancho_min=ANCHO_MIN):
+    """Convierte una hoja cruda del reporte en una tabla juego x franja.
+
+    Args:
+        sheet (DataFrame): Hoja leída con `header=None`.
+        ancho_min (int): Minutos por franja del reporte (60 por hora, 15 para
+            los conteos de torniquete por cuarto de hora).
+
+    Returns:
+        DataFrame: Columnas `juego`, `H:MM ciclos`, `H:MM asistencia`, totales.
+    """
+    # Buscar la fila con 'ciclos' para identificar el inicio de los datos
+    inicio_datos_idx = sheet[sheet.astype(str).apply(
+        lambda row: row.str.contains("ciclos", case=False).any(), axis=1
+    )].index[0]
+
+    # Encabezados y datos, asegurando que los nombres de columnas sean únicos
+    column_headers = sheet.iloc[inicio_datos_idx + 1]
+    df = sheet.iloc[inicio_datos_idx + 2:].copy()
+    df.columns = hacer_nombres_unicos(column_headers)
+    df = df.rename(columns={df.columns[0]: "juego"})
+
+    # Filtros
+    # Eliminar filas de arcadas (todo lo que sigue a la sección "Arcada")
+    arcadas = df[df["juego"].astype(str).str.contains("Arcada", case=False)].index
+    if len(arcadas) > 0:
+        df = df.loc[:arcadas[0] - 1]
+    # Nombre canónico de cada juego; fuera juegos excluidos, encabezados y totales.
+    # Los nombres sin resolver se conservan y quedan en INDICE.sin_resolver para el reporte.
+    ids = INDICE.resolver_serie(df["juego"])
+    df = df[ids != EXCLUIDO].copy()
+    ids = ids[ids != EXCLUIDO]
+    resueltos = ids.notna()
+    df.loc[resueltos, "juego"] = [JUEGOS[i].nombre_datos for i in ids[resueltos]]
+    df = df.dropna(axis=1, how="all")
+
+    # Reordenar columnas
+    ciclos_total_col = [col for col in df.columns if "ciclos total" in str(col).lower()]
+    asistencia_total_col = [col for col in df.columns if "asistencia total" in str(col).lower()]
+    cols_por_hora = [col for col in df.columns if col not in ciclos_total_col + asistencia_total_col + ["juego"]]
+
+    n_pares = len(cols_por_hora) // 2
+    horas = etiquetas(n_pares, ancho_min)
+    nombres_columnas = ["juego"]
+    for hora in horas:
+        nombres_columnas.extend([f"{hora} ciclos", f"{hora} asistencia"])
+
+    nombres_columnas = nombres_columnas[:len(df.columns) - 2] + ["ciclos total", "asistencia total"]
+    df = df[["juego"] + cols_por_hora + ciclos_total_col + asistencia_total_col]
+    df.columns = nombres_columnas
+    return df
+
+
+def agregar_contexto(df, fecha_reporte, info_clima):
+    """Agrega fecha, festivo, clima y promedios por hora a la tabla limpia.
+
+    Args:
+        df (DataFrame): Salida de `limpiar_hoja`.
+        fecha_reporte (datetime | None): Fecha del reporte.
+        info_clima (dict | None): Clima del día (`TablaClima.clima`).
 
-# Recorrer los archivos en la carpeta de entrada
-for filename in os.listdir(input_folder):
-    # Verificar si el archivo es un Excel
-    if not filename.endswith(".xls"):
-        continue
+    Returns:
+        DataFrame: Tabla lista para guardarse como `_limpio.csv`.
+    """
+    # Fecha
+    # Extraer la fecha del reporte y agregar información de clima y festivos
+    if fecha_reporte:
+        mes_dia = fecha_reporte.strftime("%m-%d")
+        festivo = FERIADOS_GT.get(mes_dia)
+        df["fecha"] = fecha_reporte.date()
+        df["es_festivo"] = festivo is not None
+        df["nombre_festivo"] = festivo if festivo else "Ninguno"
+        for k, v in (info_clima or {}).items():
+            df[k] = v
+        if info_clima:
+            # Categoría fija + intensidad en lugar del texto libre de WWO (scripts/cielo.py)
+            for k, v in cielo.de_clima(info_clima).items():
+                df[k] = v
+    else:
+        print("⚠️ No se pudo extraer la fecha del archivo.")
+
+    # Estadísticas
+    df["promedio_asistencia_por_hora"] = df.filter(like="asistencia").mean(axis=1)
+    df["promedio_ciclos_por_hora"] = df.filter(like="ciclos").mean(axis=1)
+    return df
+
+
+def procesar_archivo(file_path, output_folder, api_key=None, clima=TABLA_CLIMA.clima, registro=None):
+    """Limpia todas las hojas de un XLS y guarda `<nombre>_limpio.csv`.
+
+    Args:
+        file_path (str): Ruta del XLS crudo.
+        output_folder (str): Carpeta de salida.
+        api_key (str): Key de World Weather Online.
+        clima (callable): Función `(api_key, fecha) -> dict` para el clima (por
+            defecto, la tabla local de `scripts/clima.py`).
+        registro (bitacora.Registro | None): Donde anotar ms por etapa, filas y
+            estado de cada hoja (ver `scripts/bitacora.py`).
+
+    Las hojas que no pasan `scripts/validar.py` se escriben en `cuarentena/`
+    (junto a `output_folder`) con un `.json` de sus problemas.
 
-    # Leer el archivo Excel
-    file_path = os.path.join(input_folder, filename)
-    print(f"\n📄 Procesando archivo: {filename}")
-    df_sheets = pd.read_excel(file_path, sheet_name=None, header=None)
+    Returns:
+        list: Rutas de los CSV escritos en `output_folder`.
+    """
+    registro = registro or Registro(file_path)
+    filename = os.path.basename(file_path)
+    with registro.etapa("leer"):
+        df_sheets = pd.read_excel(file_path, sheet_name=None, header=None)
+    # La fecha sale de cualquier hoja del archivo: se busca una vez para todas
+    with registro.etapa("detectar"):
+        fecha_reporte = extraer_fecha(df_sheets)
+    escritos = []
 
     # Procesar cada hoja del archivo
     for name, sheet in df_sheets.items():
+        hoja = registro.hoja(name)
         try:
-            # Buscar la fila con 'ciclos' para identificar el inicio de los datos
-            inicio_datos_idx = sheet[sheet.astype(str).apply(
-                lambda row: row.str.contains("ciclos", case=False).any(), axis=1
-            )].index[0]
-
-            # Encabezados y datos, asegurando que los nombres de columnas sean únicos
-            column_headers = sheet.iloc[inicio_datos_idx + 1]
-            df = sheet.iloc[inicio_datos_idx + 2:].copy()
-            df.columns = hacer_nombres_unicos(column_headers)
-            df = df.rename(columns={df.columns[0]: "juego"})
-
-            # Filtros
-            # Excluir juegos no deseados y eliminar filas de arcadas
-            df = df[~df["juego"].astype(str).isin(JUEGOS_EXCLUIR)]
-            arcadas = df[df["juego"].astype(str).str.contains("Arcada", case=False)].index
-            if len(arcadas) > 0:
-                df = df.loc[:arcadas[0] - 1]
-            df = df.dropna(axis=1, how="all")
-            df = df[~df["juego"].astype(str).str.contains("Mecánico", case=False, na=False)]
-
-            # Reordenar columnas
-            ciclos_total_col = [col for col in df.columns if "ciclos total" in str(col).lower()]
-            asistencia_total_col = [col for col in df.columns if "asistencia total" in str(col).lower()]
-            cols_por_hora = [col for col in df.columns if col not in ciclos_total_col + asistencia_total_col + ["juego"]]
-
-            n_pares = len(cols_por_hora) // 2
-            horas = [f"{h}:00" for h in range(9, 9 + n_pares)]
-            nombres_columnas = ["juego"]
-            for hora in horas:
-                nombres_columnas.extend([f"{hora} ciclos", f"{hora} asistencia"])
-
-            nombres_columnas = nombres_columnas[:len(df.columns) - 2] + ["ciclos total", "asistencia total"]
-            df = df[["juego"] + cols_por_hora + ciclos_total_col + asistencia_total_col]
-            df.columns = nombres_columnas
-
-            # Eliminar filas con juegos mecánicos o totales
-            df = df[~df["juego"].astype(str).str.contains("Mec·nico|Total", case=False, na=False)]
-
-            # Fecha
-            # Extraer la fecha del reporte y agregar información de clima y festivos
-            fecha_reporte = extraer_fecha(df_sheets)
-            if fecha_reporte:
-                mes_dia = fecha_reporte.strftime("%m-%d")
-                festivo = FERIADOS_GT.get(mes_dia)
-                df["fecha"] = fecha_reporte.date()
-                df["es_festivo"] = festivo is not None
-                df["nombre_festivo"] = festivo if festivo else "Ninguno"
-                api_key = os.getenv('CLIMATE_API_KEY')
-                info_clima = obtener_clima_wwo(api_key, fecha_reporte)
-                for k, v in info_clima.items():
-                    df[k] = v
-            else:
-                print("⚠️ No se pudo extraer la fecha del archivo.")
-
-            # Estadísticas
-            df["promedio_asistencia_por_hora"] = df.filter(like="asistencia").mean(axis=1)
-            df["promedio_ciclos_por_hora"] = df.filter(like="ciclos").mean(axis=1)
-
-            # Guardar con mismo nombre en carpeta de salida
+            with hoja.etapa("limpiar"):
+                df = limpiar_hoja(sheet)
+            with hoja.etapa("clima"):
+                info_clima = clima(api_key, fecha_reporte) if fecha_reporte else None
+            df = agregar_contexto(df, fecha_reporte, info_clima)
+            hoja.filas = len(df)
+
+            # Guardar con mismo nombre en carpeta de salida (o en cuarentena si no pasa la validación)
             nombre_salida = os.path.splitext(filename)[0] + "_limpio.csv"
-            output_path = os.path.join(output_folder, nombre_salida)
-            df.to_csv(output_path, index=False)
-            print(f"✅ Guardado en: {output_path}")
+            with hoja.etapa("validar"):
+                problemas = validar.validar(df, validar.fecha_de_archivo(filename))
+            with hoja.etapa("escribir"):
+                if problemas:
+                    reporte = {"archivo": file_path, "filas": len(df), "problemas": problemas}
+                    hoja.destino = validar.escribir_en_cuarentena(df, output_folder, nombre_salida, reporte)
+                    hoja.estado = "cuarentena"
+                    print(f"🚧 En cuarentena: {hoja.destino} {problemas}")
+                    continue
+                hoja.destino = os.path.join(output_folder, nombre_salida)
+                df.to_csv(hoja.destino, index=False)
+            escritos.append(hoja.destino)
+            print(f"✅ Guardado en: {hoja.destino}")
 
         except Exception as e:
+            hoja.fallo(e)
             print(f"❌ Error procesando hoja '{name}' en {filename}: {e}")
+    return escritos
+
+
+def reportar_sin_resolver(indice=INDICE):
+    """Imprime los nombres que no se pudieron asociar a un juego del registro (se conservan tal cual)."""
+    if not indice.sin_resolver:
+        print("✅ Todos los nombres de juego se resolvieron contra el registro.")
+        return
+    print("⚠️ Nombres sin resolver (agrégalos como alias en scripts/juegos.py o a JUEGOS_EXCLUIR):")
+    for nombre, n in sorted(indice.sin_resolver.items(), key=lambda x: -x[1]):
+        print(f"   {nombre!r}: {n} fila(s)")
+
+
+# =======================
+# PROCESAMIENTO
+# =======================
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Limpia los reportes XLS de una carpeta.")
+    ap.add_argument("--entrada", default=input_folder)
+    ap.add_argument("--salida", default=output_folder)
+    ap.add_argument("--reanudar", action="store_true",
+                    help="Salta los archivos que ya terminaron (ok/cuarentena) según la bitácora")
+    ap.add_argument("--lentos", type=int, default=5, help="Archivos más lentos a listar al final")
+    args = ap.parse_args()
+
+    Path(args.salida).mkdir(parents=True, exist_ok=True)
+    api_key = os.getenv('CLIMATE_API_KEY')
+    bitacora = Bitacora()
+    terminados = bitacora.terminados() if args.reanudar else set()
+    bitacora.iniciar(args.entrada, args.salida)
+
+    # Clima de todas las fechas de la carpeta en pocos requests por rango (no uno por hoja)
+    if api_key:
+        fechas = [f.date() for f in map(validar.fecha_de_archivo, os.listdir(args.entrada)) if f is not None]
+        r = clima_wwo.backfill(fechas, api_key, TABLA_CLIMA)
+        print(f"🌦️ Clima: {r['fechas']} fechas nuevas en {r['requests']} requests; faltan {r['faltan']}")
+
+    # Recorrer los archivos en la carpeta de entrada (en orden, para que la bitácora sea comparable)
+    saltados = 0
+    for filename in sorted(os.listdir(args.entrada)):
+        # Verificar si el archivo es un Excel
+        if not filename.endswith((".xls", ".xlsx")):
+            continue
+        file_path = os.path.join(args.entrada, filename)
+        if file_path in terminados:
+            saltados += 1
+            continue
+
+        print(f"\n📄 Procesando archivo: {filename}")
+        with bitacora.archivo(file_path) as registro:
+            procesar_archivo(file_path, args.salida, api_key, registro=registro)
+
+    bitacora.cerrar()
+    if saltados:
+        print(f"\n⏭️ {saltados} archivo(s) ya terminados en corridas anteriores.")
+    reportar_sin_resolver()
+    if bitacora.ruta:
+        bitacora.imprimir(n_lentos=args.lentos)
@@ -0,0 +1,233 @@
+"""Bitácora de la ingesta (`reader.py`): qué pasó con cada archivo y cada hoja.
+
+Los prints de `reader.py` sirven mientras se mira la consola, pero si una
+reingesta de 600 archivos se cae a la mitad no queda registro de qué archivos
+terminaron, cuáles fallaron ni cuánto tardó cada uno. Aquí cada archivo deja
+una fila en SQLite (y cada hoja la suya) con:
+
+- estado: `ok`, `cuarentena` (no pasó `validar.py`) o `error` (con el mensaje);
+- filas limpias;
+- ms por etapa: `leer` (read_excel), `detectar` (fecha del reporte),
+  `limpiar` (limpiar_hoja), `clima`, `validar` y `escribir`.
+
+Cada archivo se guarda al terminarlo, así que lo registrado sobrevive a una
+corrida interrumpida. `reader.py --reanudar` salta los archivos cuyo último
+registro es `ok` o `cuarentena` y no cambiaron desde entonces (`mtime`).
+
+Variable de entorno: `BITACORA_INGESTA` (ruta, vacía = sin bitácora).
+
+Uso:
+    python scripts/bitacora.py                  # resumen de la última corrida + archivos más lentos
+    python scripts/bitacora.py --corrida 3 --lentos 20
+    python scripts/bitacora.py --errores        # hojas con error de la corrida
+"""
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+RUTA = os.getenv("BITACORA_INGESTA", "data/cache/ingesta.sqlite")
+ETAPAS = ("leer", "detectar", "limpiar", "clima", "validar", "escribir")
+TERMINADOS = ("ok", "cuarentena")
+
+_COLUMNAS_ETAPAS = ", ".join(f"{e}_ms REAL" for e in ETAPAS)
+
+
+class Registro:
+    """ms por etapa, filas, estado y error de un archivo o de una de sus hojas."""
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.ms = {}
+        self.filas = 0
+        self.estado = "ok"
+        self.error = None
+        self.destino = None
+        self.hojas = []
+        self.t0 = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, etapa):
+        """Mide el bloque y lo suma a `etapa` (las excepciones siguen su curso)."""
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ms[etapa] = self.ms.get(etapa, 0.0) + (time.perf_counter() - t) * 1000
+
+    def hoja(self, nombre):
+        h = Registro(nombre)
+        self.hojas.append(h)
+        return h
+
+    def fallo(self, e):
+        self.estado = "error"
+        self.error = f"{type(e).__name__}: {e}"
+
+    def total_ms(self):
+        return (time.perf_counter() - self.t0) * 1000
+
+    def resumir(self):
+        """Estado, filas y ms del archivo a partir de sus hojas (llamar al terminarlo)."""
+        estados = {h.estado for h in self.hojas}
+        if self.estado == "ok":
+            self.estado = "error" if "error" in estados else "cuarentena" if "cuarentena" in estados else "ok"
+        self.filas = sum(h.filas for h in self.hojas)
+        for h in self.hojas:
+            for etapa, ms in h.ms.items():
+                self.ms[etapa] = self.ms.get(etapa, 0.0) + ms
+
+
+class Bitacora:
+    """Corridas de la ingesta en SQLite: una fila por archivo y por hoja."""
+
+    def __init__(self, ruta=RUTA):
+        self.ruta = ruta
+        self.corrida = None
+        self._con = None
+
+    def _conexion(self):
+        if self._con is None:
+            os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+            con = sqlite3.connect(self.ruta, timeout=5)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("CREATE TABLE IF NOT EXISTS corridas (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                        "inicio REAL, fin REAL, entrada TEXT, salida TEXT)")
+            con.execute("CREATE TABLE IF NOT EXISTS archivos (corrida INTEGER, archivo TEXT, mtime REAL, "
+                        f"estado TEXT, hojas INTEGER, filas INTEGER, total_ms REAL, {_COLUMNAS_ETAPAS}, "
+                        "error TEXT, ts REAL)")
+            con.execute("CREATE TABLE IF NOT EXISTS hojas (corrida INTEGER, archivo TEXT, hoja TEXT, "
+                        f"estado TEXT, filas INTEGER, total_ms REAL, {_COLUMNAS_ETAPAS}, destino TEXT, error TEXT)")
+            con.execute("CREATE INDEX IF NOT EXISTS archivos_corrida ON archivos (corrida)")
+            self._con = con
+        return self._con
+
+    def iniciar(self, entrada, salida):
+        """Abre una corrida nueva y devuelve su id (None sin bitácora)."""
+        if not self.ruta:
+            return None
+        con = self._conexion()
+        with con:
+            cur = con.execute("INSERT INTO corridas (inicio, entrada, salida) VALUES (?, ?, ?)",
+                              (time.time(), str(entrada), str(salida)))
+        self.corrida = cur.lastrowid
+        return self.corrida
+
+    def cerrar(self):
+        if self.ruta and self.corrida is not None:
+            con = self._conexion()
+            with con:
+                con.execute("UPDATE corridas SET fin = ? WHERE id = ?", (time.time(), self.corrida))
+
+    def terminados(self):
+        """Rutas cuyo último registro es `ok`/`cuarentena` y que no cambiaron desde entonces."""
+        if not self.ruta or not os.path.exists(self.ruta):
+            return set()
+        ultimos = {}
+        for archivo, estado, mtime in self._conexion().execute(
+                "SELECT archivo, estado, mtime FROM archivos ORDER BY corrida, ts"):
+            ultimos[archivo] = (estado, mtime)
+        return {a for a, (estado, mtime) in ultimos.items()
+                if estado in TERMINADOS and os.path.exists(a) and os.path.getmtime(a) == mtime}
+
+    @contextmanager
+    def archivo(self, ruta):
+        """Entrega el `Registro` del archivo y lo guarda al salir; un error se registra y no corta la corrida."""
+        registro = Registro(str(ruta))
+        try:
+            yield registro
+        except Exception as e:
+            registro.fallo(e)
+            print(f"❌ Error procesando {os.path.basename(str(ruta))}: {registro.error}")
+        registro.resumir()
+        self._guardar(registro)
+
+    def _guardar(self, r):
+        if not self.ruta:
+            return
+        etapas = [r.ms.get(e) for e in ETAPAS]
+        mtime = os.path.getmtime(r.nombre) if os.path.exists(r.nombre) else None
+        try:
+            con = self._conexion()
+            with con:
+                con.execute(f"INSERT INTO archivos VALUES ({', '.join('?' * (9 + len(ETAPAS)))})",
+                            (self.corrida, r.nombre, mtime, r.estado, len(r.hojas), r.filas,
+                             r.total_ms(), *etapas, r.error, time.time()))
+                con.executemany(f"INSERT INTO hojas VALUES ({', '.join('?' * (8 + len(ETAPAS)))})",
+                                [(self.corrida, r.nombre, h.nombre, h.estado, h.filas, sum(h.ms.values()),
+                                  *[h.ms.get(e) for e in ETAPAS], h.destino, h.error) for h in r.hojas])
+        except sqlite3.Error as e:
+            print(f"⚠️ No se pudo guardar la bitácora ({e}).")
+
+    # =========================
+    # CONSULTAS
+    # =========================
+    def ultima_corrida(self):
+        fila = self._conexion().execute("SELECT MAX(id) FROM corridas").fetchone()
+        return fila[0] if fila else None
+
+    def resumen(self, corrida=None):
+        """{"archivos", "por_estado", "filas", "total_s", "ms_por_etapa"} de la corrida (la última por defecto)."""
+        corrida = corrida or self.corrida or self.ultima_corrida()
+        con = self._conexion()
+        por_estado = dict(con.execute("SELECT estado, COUNT(*) FROM archivos WHERE corrida = ? GROUP BY estado",
+                                      (corrida,)).fetchall())
+        sumas = con.execute(f"SELECT COUNT(*), SUM(filas), SUM(total_ms), "
+                            f"{', '.join(f'SUM({e}_ms)' for e in ETAPAS)} FROM archivos WHERE corrida = ?",
+                            (corrida,)).fetchone()
+        return {
+            "corrida": corrida,
+            "archivos": sumas[0],
+            "por_estado": por_estado,
+            "filas": sumas[1] or 0,
+            "total_s": round((sumas[2] or 0) / 1000, 2),
+            "ms_por_etapa": {e: round(ms or 0, 1) for e, ms in zip(ETAPAS, sumas[3:])},
+        }
+
+    def lentos(self, n=10, corrida=None):
+        """[(archivo, estado, total_ms, {etapa: ms})] de los `n` archivos más lentos de la corrida."""
+        corrida = corrida or self.corrida or self.ultima_corrida()
+        filas = self._conexion().execute(
+            f"SELECT archivo, estado, total_ms, {', '.join(f'{e}_ms' for e in ETAPAS)} FROM archivos "
+            "WHERE corrida = ? ORDER BY total_ms DESC LIMIT ?", (corrida, n)).fetchall()
+        return [(a, estado, total, {e: ms for e, ms in zip(ETAPAS, etapas) if ms is not None})
+                for a, estado, total, *etapas in filas]
+
+    def errores(self, corrida=None):
+        """[(archivo, hoja o None, error)] de la corrida."""
+        corrida = corrida or self.corrida or self.ultima_corrida()
+        con = self._conexion()
+        return (con.execute("SELECT archivo, hoja, error FROM hojas WHERE corrida = ? AND estado = 'error'",
+                            (corrida,)).fetchall()
+                + con.execute("SELECT archivo, NULL, error FROM archivos WHERE corrida = ? AND estado = 'error' "
+                              "AND hojas = 0", (corrida,)).fetchall())
+
+    def imprimir(self, corrida=None, n_lentos=5):
+        r = self.resumen(corrida)
+        malos = r["por_estado"].get("error", 0)
+        print(f"{'✅' if not malos else '⚠️'} Corrida {r['corrida']}: {r['archivos']} archivos {r['por_estado']}, "
+              f"{r['filas']:,} filas, {r['total_s']} s")
+        print("   ms por etapa:", r["ms_por_etapa"])
+        if n_lentos:
+            print(f"   {n_lentos} más lentos:")
+            for archivo, estado, total, ms in self.lentos(n_lentos, r["corrida"]):
+                detalle = ", ".join(f"{e}={v:.0f}" for e, v in ms.items())
+                print(f"   {os.path.basename(archivo):<22}{estado:<12}{total:>9.0f} ms  ({detalle})")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Resumen de la bitácora de ingesta (reader.py).")
+    ap.add_argument("--corrida", type=int, help="Id de la corrida (por defecto, la última)")
+    ap.add_argument("--lentos", type=int, default=10, help="Archivos más lentos a listar")
+    ap.add_argument("--errores", action="store_true", help="Lista las hojas y archivos con error")
+    args = ap.parse_args()
+
+    if not os.path.exists(RUTA):
+        raise SystemExit(f"❌ No hay bitácora en {RUTA}; corre reader.py primero.")
+    bitacora = Bitacora()
+    bitacora.imprimir(args.corrida, args.lentos)
+    if args.errores:
+        for archivo, hoja, error in bitacora.errores(args.corrida):
+            print(f"❌ {os.path.basename(archivo)}{f' [{hoja}]' if hoja else ''}: {error}")
@@ -1,33 +1,35 @@
-import os, joblib, pandas as pd, numpy as np, requests
-from datetime import datetime, date
+import os, joblib, pandas as pd, numpy as np
+from datetime import datetime
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 from pb_helpers import set_time_by_name
+from metricas import Ciclo
+from franjas import ANCHO_MIN
+import fast_predict
+from vocabulario import preparar_entrada
+from cache_predicciones import CachePredicciones, version_modelo
+from empuje import Empuje
+from juegos import JUEGOS
 
 # =========================
 # 0) CONFIG 
 # =========================
 TZ = ZoneInfo("America/Guatemala")
 
-# Feriados Guatemala (MM-DD -> nombre)
-FERIADOS_GT = {
-    "01-01": "Año Nuevo",
-    "01-15": "Día del Cristo Negro",
-    "05-01": "Día del Trabajo",
-    "06-30": "Día del Ejército",
-    "09-15": "Día de la Independencia",
-    "10-20": "Revolución de 1944",
-    "11-01": "Día de Todos los Santos",
-    "12-25": "Navidad",
-}
-
 load_dotenv()
 WWO_KEY = os.getenv("CLIMATE_API_KEY")  # World Weather Online
 
+# Tiempos/contadores de este ciclo (una línea JSON al final)
+CICLO = Ciclo("bumperazo")
+
 # =========================
 # 1) CARGA MODELO
 # =========================
-bundle = joblib.load(os.path.expanduser("data_analysis/models/bumperazo.joblib"))
+with CICLO.span("modelo"):
+    bundle = joblib.load(os.path.expanduser("data_analysis/models/bumperazo.joblib"))
+VERSION_MODELO = version_modelo(os.path.expanduser("data_analysis/models/bumperazo.joblib"))
+CACHE = CachePredicciones()  # misma fila en la misma hora -> sin pipe.predict
+EMPUJE = Empuje(enviar=set_time_by_name)  # último valor enviado por juego (SQLite)
 pipe = bundle["pipeline"]
 cat_cols = bundle["cat_cols"]
 num_cols = bundle["num_cols"]
@@ -75,46 +77,16 @@ def construir_lookup(hist_largo: pd.DataFrame, lookback_years: int = 3):
 
 # Cargar histórico y construir lookup una sola vez
 try:
-    hist_raw = pd.read_csv(HIST_CSV)
-    HIST_LARGO = preparar_historico_largo(hist_raw)
-    LOOKUP = construir_lookup(HIST_LARGO, lookback_years=3)
+    with CICLO.span("csv"):
+        hist_raw = pd.read_csv(HIST_CSV)
+    with CICLO.span("lookup"):
+        HIST_LARGO = preparar_historico_largo(hist_raw)
+        LOOKUP = construir_lookup(HIST_LARGO, lookback_years=3)
 except Exception as e:
     print(f"⚠️ No se pudo preparar el lookup histórico ({e}). Se usarán NaNs para asistencia/ciclos.")
     HIST_LARGO = None
     LOOKUP = None
 
-# =========================
-# 2.1) CLIMA (WWO)
-# =========================
-def obtener_clima_wwo(api_key, fecha_dt: date, lugar="Petapa,Guatemala"):
-    """World Weather Online - past-weather (tp=24) para la fecha dada."""
-    if not api_key:
-        return {"temperatura_max": None, "temperatura_min": None, "condiciones_cielo": None, "prob_precipitacion": None}
-
-    url = "http://api.worldweatheronline.com/premium/v1/past-weather.ashx"
-    params = {
-        "key": api_key,
-        "q": lugar,
-        "format": "json",
-        "date": fecha_dt.strftime("%Y-%m-%d"),
-        "tp": 24
-    }
-    try:
-        r = requests.get(url, params=params, timeout=15)
-        r.raise_for_status()
-        data = r.json()
-        clima_dia = data["data"]["weather"][0]
-        detalle = clima_dia["hourly"][0]
-        return {
-            "temperatura_max": float(clima_dia.get("maxtempC")) if clima_dia.get("maxtempC") is not None else None,
-            "temperatura_min": float(clima_dia.get("mintempC")) if clima_dia.get("mintempC") is not None else None,
-            "condiciones_cielo": detalle["weatherDesc"][0]["value"] if detalle.get("weatherDesc") else None,
-            "prob_precipitacion": int(detalle.get("chanceofrain", 0)) if detalle.get("chanceofrain") is not None else None
-        }
-    except Exception as e:
-        print(f"❌ Error al obtener clima: {e}")
-        return {"temperatura_max": None, "temperatura_min": None, "condiciones_cielo": None, "prob_precipitacion": None}
-
 # =========================
 # 2.2) RELLENAR 
 # =========================
@@ -169,7 +141,8 @@ def rellenar_expecteds(df_nuevo: pd.DataFrame) -> pd.DataFrame:
 # 3) PREDICCIÓN
 # =========================
 def predecir(df_nuevo: pd.DataFrame) -> pd.Series:
-    df_in = rellenar_expecteds(df_nuevo)
+    with CICLO.span("rellenar"):
+        df_in = rellenar_expecteds(df_nuevo)
 
     for c in cat_cols:
         if c not in df_in.columns:
@@ -178,42 +151,38 @@ def predecir(df_nuevo: pd.DataFrame) -> pd.Series:
         if c not in df_in.columns:
             df_in[c] = np.nan
 
-    X_nuevo = df_in[cat_cols + num_cols]
-    pred = pipe.predict(X_nuevo)
-    return pd.Series(np.round(pred, 2), index=df_nuevo.index, name="prediccion")
+    filas = df_in[cat_cols + num_cols].to_dict(orient="records")
+    cacheadas = [CACHE.obtener(CICLO.juego, VERSION_MODELO, f) for f in filas]
+    if all(p is not None for p in cacheadas):
+        CICLO.contar("cache_hit", len(filas))
+        return pd.Series(cacheadas, index=df_nuevo.index, name="prediccion")
+    CICLO.contar("cache_miss", len(filas))
+
+    X_nuevo = preparar_entrada(bundle, df_in[cat_cols + num_cols])
+    with CICLO.span("predict"):
+        pred = np.round(pipe.predict(X_nuevo), 2)
+    for f, p in zip(filas, pred):
+        CACHE.guardar(CICLO.juego, VERSION_MODELO, f, p)
+    return pd.Series(pred, index=df_nuevo.index, name="prediccion")
 
 # =========================
 # 4) ENTRADA DINÁMICA
 # =========================
 def construir_fila_actual():
     now = datetime.now(TZ)
-    fecha_hoy = now.date()  # date
-    mes_dia = now.strftime("%m-%d")
-    festivo = FERIADOS_GT.get(mes_dia)
-
-    # Clima del día
-    clima = obtener_clima_wwo(WWO_KEY, fecha_hoy, lugar="Petapa,Guatemala")
-
-    # day_of_week 
-    day_of_week = now.strftime("%A")
-    hora_hh = now.strftime("%H:00")
-
-    fila = {
-        "day_of_week": [day_of_week],
-        "hora": [hora_hh],
-        "es_festivo": [festivo is not None],
-        "condiciones_cielo": [clima.get("condiciones_cielo")],
-        "nombre_festivo": [festivo if festivo else ""],
-        "month": [now.month],
-        "day": [now.day],
-        "temperatura_max": [clima.get("temperatura_max")],
-        "temporada_alta": [0],
-        "prob_precipitacion": [clima.get("prob_precipitacion")]
-    }
-    return pd.DataFrame(fila)
+
+    # Clima del día desde la tabla local (scripts/clima.py): WWO solo si falta o si el de hoy venció
+    with CICLO.span("clima"):
+        clima = fast_predict.obtener_clima_wwo(WWO_KEY, now.date())
+
+    # Misma fila que fast_predict / precalcular / servicio: cielo, intensidad de lluvia y clima
+    # de la franja incluidos. asistencia_h / ciclos_h quedan en NaN y las completa `rellenar_expecteds`.
+    fila = fast_predict.construir_fila(now, clima, None, bundle.get("ancho_franja", ANCHO_MIN))
+    return pd.DataFrame([fila])
 
 if __name__ == "__main__":
-    df_nuevo = construir_fila_actual()
+    with CICLO.span("fila"):
+        df_nuevo = construir_fila_actual()
     predicciones = predecir(df_nuevo)
     info = {
         "timestamp": datetime.now(TZ).isoformat(),
@@ -223,9 +192,9 @@ if __name__ == "__main__":
     print(info)
 
     # Actualizar PocketBase
-    try:
-        GAME_NAME = "Bumperazo"
-        resp = set_time_by_name(GAME_NAME, float(predicciones.iloc[0]))
-        print("Actualizado en PocketBase. Nuevo time:", resp.get("time"))
-    except Exception as e:
-        print("Error actualizando PocketBase:", e)
\ No newline at end of file
+    GAME_NAME = JUEGOS[CICLO.juego].nombre_pb  # scripts/juegos.py
+    with CICLO.span("push"):
+        EMPUJE.encolar(GAME_NAME, float(predicciones.iloc[0]))
+        EMPUJE.enviar(CICLO)  # solo si cambió ≥ PUSH_UMBRAL respecto del último enviado
+
+    CICLO.emitir(prediccion=float(predicciones.iloc[0]))
@@ -0,0 +1,86 @@
+import pandas as pd
+import numpy as np
+
+# Paso 4 del flujo (antes solo en data.ipynb): separa all_data.csv por juego,
+# calcula las métricas M/M/1 por hora y escribe data/by_game/<juego>.csv.
+
+# Capacidad, beta y espera máxima de cada juego: scripts/juegos.py
+import juegos
+from juegos import JUEGOS
+
+# %%
+from franjas import ancho_de, detectar
+
+def mm1_perhour(df, capacidad_por_ciclo, max_espera_min=60, juego_name=None, ancho_min=None):
+    """Agrega lambda, mu, rho, Wq y estado M/M/1 por franja (`<H:MM> ciclos/asistencia`).
+
+    Las franjas se detectan en las columnas; `ancho_min` (60 por hora, 15 para
+    cuartos de hora) se infiere del salto entre ellas si no se indica. Las tasas
+    quedan siempre en personas por minuto.
+    """
+    beta = juegos.beta(juego_name) if juego_name is not None else juegos.BETA_DEFECTO
+    franjas = detectar(df.columns)
+    ancho = float(ancho_min or ancho_de([m for m, *_ in franjas], 60))
+
+    nuevas = {}
+    for _, h, col_cic, col_asist in franjas:
+        lam = df[col_asist].astype(float).to_numpy() / ancho
+        mu  = (df[col_cic].astype(float).to_numpy() * (float(capacidad_por_ciclo) * beta)) / ancho
+
+        rho   = np.full(len(df), np.nan)
+        Wq    = np.full(len(df), np.nan)
+        state = np.array([""] * len(df), dtype=object)
+
+        closed       = (mu == 0) & (lam == 0)
+        off_service  = (mu == 0) & (lam > 0)
+        stable       = (mu > lam) & (mu > 0)
+        saturated    = (mu <= lam) & (mu > 0)
+
+        rho[closed] = 0
+        Wq[closed]  = 0
+        state[closed] = "Closed"
+
+        rho[off_service] = np.inf
+        Wq[off_service]  = max_espera_min
+        state[off_service] = "Off service"
+
+        rho[stable] = lam[stable] / mu[stable]
+        Wq[stable]  = lam[stable] / (mu[stable] * (mu[stable] - lam[stable]))
+        state[stable] = "stable"
+
+        rho[saturated] = lam[saturated] / mu[saturated]
+        Wq[saturated]  = max_espera_min
+        state[saturated] = "saturated"
+
+        nuevas[f"lambda_{h}(/min)"] = lam.round(4)
+        nuevas[f"mu_{h}(/min)"]     = mu.round(4)
+        nuevas[f"rho_{h}"]          = np.clip(rho, None, 10)
+        nuevas[f"Wq_{h}(min)"]      = np.minimum(Wq, max_espera_min)
+        nuevas[f"state_{h}"]        = state
+    # Un solo concat: con franjas de 15 min son 4x columnas y agregarlas de a una fragmenta el DataFrame
+    return pd.concat([df, pd.DataFrame(nuevas, index=df.index)], axis=1)
+
+# %%
+def separar_por_juego(all_data):
+    """Devuelve {id: DataFrame con M/M/1 por hora} para cada juego del registro.
+
+    Los nombres de `all_data['juego']` se resuelven con `juegos.buscar`; los que
+    no están en el registro se reportan en vez de perderse en silencio.
+    """
+    ids = {n: getattr(juegos.buscar(n), "id", None) for n in all_data["juego"].dropna().unique()}
+    desconocidos = sorted(n for n, i in ids.items() if i is None)
+    if desconocidos:
+        print(f"⚠️ Juegos fuera del registro (se omiten): {', '.join(map(str, desconocidos))}")
+    id_fila = all_data["juego"].map(ids)
+    salida = {}
+    for j in JUEGOS.values():
+        df_juego = all_data[id_fila == j.id].drop(columns=['juego'])
+        salida[j.id] = mm1_perhour(df_juego, capacidad_por_ciclo=j.capacidad,
+                                   max_espera_min=j.max_espera, juego_name=j.id)
+    return salida
+
+if __name__ == "__main__":
+    all_data = pd.read_csv("all_data.csv")
+    for archivo, df_final in separar_por_juego(all_data).items():
+        df_final.to_csv(f"./data/by_game/{archivo}.csv", index=False)
+        print(f"✅ Guardado en: ./data/by_game/{archivo}.csv")
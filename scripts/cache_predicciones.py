@@ -0,0 +1,148 @@
+"""Cache persistente de predicciones en vivo.
+
+Dentro de la misma hora la fila de entrada (día, hora, feriado, clima, mes,
+día, promedios del lookup) no cambia, así que la predicción tampoco. Cada
+predicción se guarda en SQLite con la clave (juego, versión del modelo, fila
+canónica); la siguiente corrida con la misma fila la lee y no llama a
+`pipe.predict`. La versión del modelo es el `mtime`/tamaño del `.joblib`: al
+reentrenar o actualizar el bundle las entradas viejas dejan de coincidir.
+
+Se conservan las `CACHE_PREDICCIONES_MAX` entradas usadas más recientemente
+(LRU). Hits y misses se acumulan en la misma base (`estadisticas()`) y cada
+ciclo los cuenta en `metricas.Ciclo` (`cache_hit` / `cache_miss`).
+
+Variables de entorno: `CACHE_PREDICCIONES` (ruta, vacía = desactivado) y
+`CACHE_PREDICCIONES_MAX` (5000 por defecto).
+
+Uso:
+    python scripts/cache_predicciones.py            # hit rate y entradas
+    python scripts/cache_predicciones.py --vaciar
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+RUTA = os.getenv("CACHE_PREDICCIONES", "data/cache/predicciones.sqlite")
+MAX_ENTRADAS = int(os.getenv("CACHE_PREDICCIONES_MAX", "5000"))
+
+
+def version_modelo(ruta_modelo):
+    """Identifica el `.joblib` sin cargarlo: `mtime_ns-tamaño`."""
+    st = os.stat(ruta_modelo)
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+def _canonico(valor):
+    """Mismo valor para lo que llega de pandas, NumPy o un dict plano."""
+    if hasattr(valor, "item"):
+        valor = valor.item()  # escalares de NumPy
+    try:
+        if valor is None or bool(valor != valor):
+            return None  # None / NaN
+    except TypeError:
+        return None  # pd.NA
+    if isinstance(valor, bool):
+        return int(valor)
+    if isinstance(valor, float):
+        return round(valor, 6)
+    return valor
+
+
+def clave(juego, version, fila):
+    """Hash de (juego, versión, fila) con las columnas en orden alfabético."""
+    canonica = {k: _canonico(v) for k, v in sorted(fila.items())}
+    texto = json.dumps([juego, version, canonica], ensure_ascii=False, default=str)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+class CachePredicciones:
+    """Cache LRU en SQLite; cualquier error se reporta y se trata como miss."""
+
+    def __init__(self, ruta=RUTA, max_entradas=MAX_ENTRADAS):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self._con = None
+
+    def _conexion(self):
+        if self._con is None:
+            os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+            # Los 25 scripts pueden correr a la vez desde cron
+            con = sqlite3.connect(self.ruta, timeout=5)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("CREATE TABLE IF NOT EXISTS predicciones "
+                        "(clave TEXT PRIMARY KEY, juego TEXT, prediccion REAL, usado REAL)")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_usado ON predicciones (usado)")
+            con.execute("CREATE TABLE IF NOT EXISTS estadisticas (evento TEXT PRIMARY KEY, n INTEGER)")
+            self._con = con
+        return self._con
+
+    def _contar(self, con, evento):
+        con.execute("INSERT INTO estadisticas VALUES (?, 1) ON CONFLICT(evento) DO UPDATE SET n = n + 1",
+                    (evento,))
+
+    def obtener(self, juego, version, fila):
+        """Predicción guardada para la fila, o None (miss)."""
+        if not self.ruta:
+            return None
+        try:
+            con = self._conexion()
+            with con:
+                k = clave(juego, version, fila)
+                r = con.execute("SELECT prediccion FROM predicciones WHERE clave = ?", (k,)).fetchone()
+                if r is None:
+                    self._contar(con, "miss")
+                    return None
+                con.execute("UPDATE predicciones SET usado = ? WHERE clave = ?", (time.time(), k))
+                self._contar(con, "hit")
+                return r[0]
+        except sqlite3.Error as e:
+            print(f"⚠️ Cache de predicciones no disponible ({e}).")
+            return None
+
+    def guardar(self, juego, version, fila, prediccion):
+        """Guarda la predicción y recorta a las `max_entradas` más recientes."""
+        if not self.ruta:
+            return
+        try:
+            con = self._conexion()
+            with con:
+                con.execute("INSERT OR REPLACE INTO predicciones VALUES (?, ?, ?, ?)",
+                            (clave(juego, version, fila), juego, float(prediccion), time.time()))
+                con.execute("DELETE FROM predicciones WHERE clave IN (SELECT clave FROM predicciones "
+                            "ORDER BY usado DESC LIMIT -1 OFFSET ?)", (self.max_entradas,))
+        except sqlite3.Error as e:
+            print(f"⚠️ No se pudo guardar en el cache de predicciones ({e}).")
+
+    def estadisticas(self):
+        """{"entradas", "hits", "misses", "hit_rate"} acumulados desde que existe la base."""
+        con = self._conexion()
+        n = dict(con.execute("SELECT evento, n FROM estadisticas").fetchall())
+        hits, misses = n.get("hit", 0), n.get("miss", 0)
+        return {
+            "entradas": con.execute("SELECT COUNT(*) FROM predicciones").fetchone()[0],
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+
+    def vaciar(self):
+        con = self._conexion()
+        with con:
+            con.execute("DELETE FROM predicciones")
+            con.execute("DELETE FROM estadisticas")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Estado del cache de predicciones en vivo.")
+    ap.add_argument("--vaciar", action="store_true", help="Borra entradas y contadores")
+    args = ap.parse_args()
+    cache = CachePredicciones()
+    if args.vaciar:
+        cache.vaciar()
+        print(f"✅ Cache vaciado ({cache.ruta})")
+    else:
+        print(cache.estadisticas())
@@ -0,0 +1,138 @@
+"""Categorías fijas de cielo a partir del texto (o código) de World Weather Online.
+
+`condiciones_cielo` llega como texto libre ("Patchy rain possible", "Moderate
+or heavy rain shower", "Overcast", ...) y entraba al OneHotEncoder tal cual:
+una redacción que no se vio al entrenar quedaba en ceros
+(`handle_unknown="ignore"`) y cada variante sumaba columnas al bosque. Aquí
+cada descripción se reduce a:
+
+- `cielo`: una de `CATEGORIAS` (despejado, parcial, nublado, niebla, lluvia,
+  tormenta), vocabulario fijo;
+- `intensidad_lluvia`: 0 sin lluvia, 1 ligera / posible / llovizna,
+  2 moderada, 3 fuerte / torrencial.
+
+Si hay `weatherCode` de WWO se usa la tabla `CODIGOS_WWO`; si no, reglas por
+palabra clave sobre el texto (inglés o español), así una redacción nueva
+("Light rain shower", "Lluvia moderada") cae en su categoría en vez de
+desaparecer. Se aplica al ingerir (`reader.py` escribe las dos columnas),
+al entrenar (`entrenar.formato_largo` las deriva si el CSV es anterior) y en
+vivo (`fast_predict.construir_fila`).
+
+Uso:
+    python scripts/cielo.py                           # cómo se reducen los textos de data/by_game
+    python scripts/cielo.py "Light rain shower" "Niebla"
+"""
+import re
+from functools import lru_cache
+
+CATEGORIAS = ("despejado", "parcial", "nublado", "niebla", "lluvia", "tormenta")
+COLUMNAS = ("cielo", "intensidad_lluvia")
+
+# https://www.worldweatheronline.com/weather-api/api/docs/weather-icons.aspx
+CODIGOS_WWO = {
+    113: ("despejado", 0), 116: ("parcial", 0), 119: ("nublado", 0), 122: ("nublado", 0),
+    143: ("niebla", 0), 248: ("niebla", 0), 260: ("niebla", 0),
+    176: ("lluvia", 1), 179: ("lluvia", 1), 182: ("lluvia", 1), 185: ("lluvia", 1),
+    263: ("lluvia", 1), 266: ("lluvia", 1), 281: ("lluvia", 1), 284: ("lluvia", 2),
+    293: ("lluvia", 1), 296: ("lluvia", 1), 299: ("lluvia", 2), 302: ("lluvia", 2),
+    305: ("lluvia", 3), 308: ("lluvia", 3), 311: ("lluvia", 1), 314: ("lluvia", 2),
+    317: ("lluvia", 1), 320: ("lluvia", 2), 323: ("lluvia", 1), 326: ("lluvia", 1),
+    329: ("lluvia", 2), 332: ("lluvia", 2), 335: ("lluvia", 3), 338: ("lluvia", 3),
+    227: ("lluvia", 2), 230: ("lluvia", 3), 350: ("lluvia", 2),
+    353: ("lluvia", 1), 356: ("lluvia", 3), 359: ("lluvia", 3), 362: ("lluvia", 1),
+    365: ("lluvia", 2), 368: ("lluvia", 1), 371: ("lluvia", 3), 374: ("lluvia", 1),
+    377: ("lluvia", 2),
+    200: ("tormenta", 1), 386: ("tormenta", 1), 389: ("tormenta", 3), 392: ("tormenta", 1),
+    395: ("tormenta", 3),
+}
+
+# (patrón, categoría) en orden: la primera que coincide gana
+_REGLAS = [
+    (r"thunder|tormenta|electric", "tormenta"),
+    (r"rain|drizzle|shower|sleet|snow|ice|blizzard|lluvi|llovizna|chubasc|aguacero|nieve|granizo", "lluvia"),
+    (r"fog|mist|haze|niebla|neblina|bruma", "niebla"),
+    (r"partly|partial|parcial", "parcial"),
+    (r"overcast|cloudy|cubierto|nublado|nubes", "nublado"),
+    (r"sunny|clear|despejado|soleado", "despejado"),
+]
+_INTENSIDAD = [
+    (r"heavy|torrential|fuerte|torrencial|intens", 3),
+    (r"moderate|moderad", 2),
+    (r"light|patchy|possible|drizzle|ligera|debil|llovizna|posible|aislad", 1),
+]
+
+
+@lru_cache(maxsize=512)
+def _por_texto(texto):
+    t = texto.lower()
+    categoria = next((c for patron, c in _REGLAS if re.search(patron, t)), None)
+    if categoria not in ("lluvia", "tormenta"):
+        return categoria, 0 if categoria else None
+    return categoria, next((i for patron, i in _INTENSIDAD if re.search(patron, t)), 2)
+
+
+def reducir(texto=None, codigo=None):
+    """(categoria, intensidad_lluvia) de una descripción de WWO; (None, None) si no se reconoce."""
+    try:
+        codigo = int(codigo) if codigo not in (None, "") else None
+    except (TypeError, ValueError):
+        codigo = None
+    if codigo in CODIGOS_WWO:
+        return CODIGOS_WWO[codigo]
+    if not isinstance(texto, str) or not texto.strip():
+        return None, None
+    return _por_texto(texto.strip())
+
+
+def de_clima(clima):
+    """{"cielo", "intensidad_lluvia"} de un dict de clima del día.
+
+    Las claves que ya vengan en `clima` (p. ej. un escenario de /que-pasa-si
+    con `{"cielo": "lluvia"}`) pisan las derivadas del texto.
+    """
+    clima = clima or {}
+    categoria, intensidad = reducir(clima.get("condiciones_cielo"))
+    return {"cielo": clima.get("cielo", categoria), "intensidad_lluvia": clima.get("intensidad_lluvia", intensidad)}
+
+
+def agregar(df, columna="condiciones_cielo"):
+    """Agrega `COLUMNAS` a `df` desde `columna` (una llamada a `reducir` por texto distinto).
+
+    Si `df` ya las trae (CSV ingerido con esta versión) se completan solo los
+    huecos; sin `columna` se devuelve tal cual.
+    """
+    if columna not in df.columns:
+        return df
+    textos = df[columna]
+    reducidos = {t: reducir(t) for t in textos.dropna().unique()}
+    categoria = textos.map({t: c for t, (c, _) in reducidos.items()})
+    intensidad = textos.map({t: i for t, (_, i) in reducidos.items()}).astype(float)
+    df = df.copy()
+    df["cielo"] = df["cielo"].fillna(categoria) if "cielo" in df.columns else categoria
+    df["intensidad_lluvia"] = (df["intensidad_lluvia"].fillna(intensidad) if "intensidad_lluvia" in df.columns
+                               else intensidad)
+    return df
+
+
+if __name__ == "__main__":
+    import glob
+    import sys
+    from collections import Counter
+
+    if sys.argv[1:]:
+        for texto in sys.argv[1:]:
+            print(f"{texto!r} -> {reducir(texto)}")
+        sys.exit(0)
+    import pandas as pd
+
+    textos = Counter()
+    for ruta in glob.glob("data/by_game/*.csv"):
+        cols = pd.read_csv(ruta, nrows=0).columns
+        if "condiciones_cielo" in cols:
+            textos.update(pd.read_csv(ruta, usecols=["condiciones_cielo"])["condiciones_cielo"].dropna())
+    sin_categoria = [t for t in textos if reducir(t)[0] is None]
+    for texto, n in textos.most_common():
+        print(f"{texto:<40}{n:>7}  -> {reducir(texto)}")
+    categorias = {reducir(t)[0] for t in textos} - {None}
+    print(f"{'⚠️' if sin_categoria else '✅'} {len(textos)} textos distintos -> {len(categorias)} categorías"
+          + (f"; sin categoría: {sin_categoria}" if sin_categoria else ""))
@@ -0,0 +1,412 @@
+"""Tabla local de clima histórico (World Weather Online) y su backfill por rangos.
+
+`reader.py` pedía a WWO una fecha por llamada (`date=...`, tp=24): rehacer
+tres años eran ~1,000 requests en serie, repetidos en cada reingesta. El
+endpoint past-weather acepta `date` + `enddate` (dentro del mismo mes), así
+que aquí el backfill:
+
+- calcula las fechas que faltan en la tabla (las de los reportes en
+  `data/<año>/{sucio,limpio}` o un rango `--desde/--hasta`);
+- las agrupa en rangos de un mes como máximo (~36 requests para tres años);
+- los pide con httpx asíncrono, a lo sumo `--concurrencia` a la vez y
+  `--por-segundo` inicios por segundo, con reintentos ante 429 / 5xx;
+- guarda un registro por día en SQLite (`CLIMA_TABLA`, por defecto
+  `data/cache/clima.sqlite`).
+
+`reader.py` toma el clima de esa tabla (`TablaClima.clima`) en lugar de
+llamar a la API por hoja. `WWO_URL` cambia el endpoint, p. ej. al servidor
+simulado de `benchmarks/wwo_simulado.py`.
+
+Clima por hora: el registro diario (tp=24) repite para todas las franjas la
+condición y la probabilidad de lluvia del día, y la lluvia que vacía las
+filas es la de las 15:00. Por cada rango se pide también `tp=CLIMA_TP` (3 h
+por defecto) y se guarda un bloque por (fecha, minuto de inicio) en
+`clima_horas` (WITHOUT ROWID, minuto entero). De ahí salen las features
+`prob_lluvia_hora`, `precip_mm_hora`, `temp_hora` y `nubosidad_hora`:
+
+- entrenamiento: `unir_por_hora(largo)` las agrega al formato largo con un
+  merge por (fecha, bloque), sin requests;
+- en vivo / precálculo: `del_dia(api_key, fecha)` devuelve el día con sus
+  bloques (`"horas"`), una descarga por día pasado como máximo (el de hoy
+  se vuelve a pedir pasados `CLIMA_TTL_HOY_SEG` segundos), y
+  `valores_hora(clima, minuto)` elige el bloque de cada franja.
+
+Uso:
+    python scripts/clima.py                                  # fechas de los reportes que falten
+    python scripts/clima.py --desde 2022-01-01 --hasta 2024-12-31 --concurrencia 4 --por-segundo 5
+    python scripts/clima.py --estado                         # días guardados y faltantes
+"""
+import os
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+RUTA = os.getenv("CLIMA_TABLA", "data/cache/clima.sqlite")
+URL_WWO = os.getenv("WWO_URL", "http://api.worldweatheronline.com/premium/v1/past-weather.ashx")
+LUGAR = "Petapa,Guatemala"
+ZONA = "America/Guatemala"
+TTL_HOY_SEG = int(os.getenv("CLIMA_TTL_HOY_SEG", "1800"))  # el clima de hoy (o futuro) se vuelve a pedir tras esto
+COLUMNAS = ("temperatura_max", "temperatura_min", "condiciones_cielo", "prob_precipitacion")
+CLIMA_VACIO = dict.fromkeys(COLUMNAS)
+TP_HORARIO = int(os.getenv("CLIMA_TP", "3"))  # horas por bloque (1 o 3)
+COLUMNAS_HORA = ("prob_lluvia_hora", "precip_mm_hora", "temp_hora", "nubosidad_hora")
+REINTENTOS = 4
+
+
+def _numero(valor, tipo=float):
+    return tipo(valor) if valor not in (None, "") else None
+
+
+def parsear_dia(dia):
+    """Día de la respuesta de WWO (tp=24) -> (fecha, {columnas}); mismos campos que `fast_predict.obtener_clima_wwo`."""
+    detalle = (dia.get("hourly") or [{}])[0]
+    return date.fromisoformat(dia["date"]), {
+        "temperatura_max": _numero(dia.get("maxtempC")),
+        "temperatura_min": _numero(dia.get("mintempC")),
+        "condiciones_cielo": detalle["weatherDesc"][0]["value"] if detalle.get("weatherDesc") else None,
+        "prob_precipitacion": _numero(detalle.get("chanceofrain", 0), int),
+    }
+
+
+def parsear_horas(dia):
+    """Día de la respuesta de WWO con tp < 24 -> [(fecha, minuto, {columnas hora}, condiciones)]."""
+    fecha = date.fromisoformat(dia["date"])
+    bloques = []
+    for h in dia.get("hourly") or []:
+        hhmm = int(h.get("time", 0))
+        bloques.append((fecha, hhmm // 100 * 60 + hhmm % 100, {
+            "prob_lluvia_hora": _numero(h.get("chanceofrain"), int),
+            "precip_mm_hora": _numero(h.get("precipMM")),
+            "temp_hora": _numero(h.get("tempC")),
+            "nubosidad_hora": _numero(h.get("cloudcover"), int),
+        }, h["weatherDesc"][0]["value"] if h.get("weatherDesc") else None))
+    return bloques
+
+
+def valores_hora(clima, minuto):
+    """Features por hora de la franja que empieza en `minuto` (bloque que la contiene).
+
+    Las claves de `COLUMNAS_HORA` que vengan sueltas en `clima` (p. ej. un
+    escenario de /que-pasa-si) pisan las del bloque.
+    """
+    valores = dict.fromkeys(COLUMNAS_HORA)
+    for bloque in (clima or {}).get("horas") or []:
+        if bloque["minuto"] > minuto:
+            break
+        valores = {k: bloque.get(k) for k in COLUMNAS_HORA}
+    return {**valores, **{k: clima[k] for k in COLUMNAS_HORA if k in (clima or {})}}
+
+
+def rangos_mensuales(fechas):
+    """Fechas sueltas -> [(inicio, fin)] con inicio/fin en el mismo mes (lo que acepta `enddate`)."""
+    por_mes = {}
+    for f in sorted(set(fechas)):
+        inicio, fin = por_mes.setdefault((f.year, f.month), (f, f))
+        por_mes[(f.year, f.month)] = (inicio, f)
+    return list(por_mes.values())
+
+
+def fechas_de_reportes(patrones=("data/20*/sucio/*.xls*", "data/20*/limpio/*.csv")):
+    """Fechas de los reportes según su nombre de archivo (`ddmmyyyy`)."""
+    import glob
+
+    from validar import fecha_de_archivo
+
+    fechas = {fecha_de_archivo(a) for p in patrones for a in glob.glob(p)}
+    return sorted(f.date() for f in fechas if f is not None)
+
+
+# =========================
+# TABLA LOCAL
+# =========================
+class TablaClima:
+    """Un registro de clima por día en SQLite."""
+
+    def __init__(self, ruta=RUTA):
+        self.ruta = ruta
+        self._con = None
+        self._dias = None
+        self._horas = None
+
+    def _conexion(self):
+        if self._con is None:
+            os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+            con = sqlite3.connect(self.ruta, timeout=5)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("CREATE TABLE IF NOT EXISTS clima (fecha TEXT PRIMARY KEY, temperatura_max REAL, "
+                        "temperatura_min REAL, condiciones_cielo TEXT, prob_precipitacion INTEGER, descargado REAL)")
+            con.execute("CREATE TABLE IF NOT EXISTS clima_horas (fecha TEXT, minuto INTEGER, prob_lluvia INTEGER, "
+                        "precip_mm REAL, temp REAL, nubosidad INTEGER, condiciones TEXT, "
+                        "PRIMARY KEY (fecha, minuto)) WITHOUT ROWID")
+            self._con = con
+        return self._con
+
+    def guardar(self, dias, horas=()):
+        """Inserta o reemplaza [(fecha, {columnas})] y los bloques [(fecha, minuto, {columnas hora}, condiciones)]."""
+        ahora = time.time()
+        con = self._conexion()
+        with con:
+            con.executemany("INSERT OR REPLACE INTO clima VALUES (?, ?, ?, ?, ?, ?)",
+                            [(f.isoformat(), *[c[k] for k in COLUMNAS], ahora) for f, c in dias])
+            con.executemany("INSERT OR REPLACE INTO clima_horas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            [(f.isoformat(), m, *[c[k] for k in COLUMNAS_HORA], cond) for f, m, c, cond in horas])
+        self._dias = self._horas = None
+
+    def dias(self):
+        """{fecha: {columnas}} de toda la tabla (se lee una vez y se reutiliza)."""
+        if self._dias is None:
+            filas = self._conexion().execute(f"SELECT fecha, {', '.join(COLUMNAS)} FROM clima").fetchall()
+            self._dias = {date.fromisoformat(f): dict(zip(COLUMNAS, valores)) for f, *valores in filas}
+        return self._dias
+
+    def horas(self):
+        """DataFrame de todos los bloques: fecha (datetime64), minuto, COLUMNAS_HORA, condiciones."""
+        if self._horas is None:
+            import pandas as pd
+
+            self._horas = pd.read_sql_query(
+                "SELECT fecha, minuto, prob_lluvia AS prob_lluvia_hora, precip_mm AS precip_mm_hora, "
+                "temp AS temp_hora, nubosidad AS nubosidad_hora, condiciones FROM clima_horas ORDER BY fecha, minuto",
+                self._conexion(), parse_dates=["fecha"])
+        return self._horas
+
+    def fechas_con_horas(self):
+        return {date.fromisoformat(f) for (f,) in self._conexion().execute("SELECT DISTINCT fecha FROM clima_horas")}
+
+    def firma(self):
+        """Cambia cuando cambian los bloques guardados (para invalidar caches de features)."""
+        if not os.path.exists(self.ruta):
+            return "0-None"
+        n, ultimo = self._conexion().execute("SELECT COUNT(*), MAX(fecha) FROM clima_horas").fetchone()
+        return f"{n}-{ultimo}"
+
+    def faltantes(self, fechas):
+        """Fechas sin registro diario o sin bloques por hora."""
+        guardadas = self.dias()
+        con_horas = self.fechas_con_horas()
+        return sorted(f for f in set(fechas) if f not in guardadas or f not in con_horas)
+
+    def con_horas(self, fecha):
+        """Clima del día + `"horas"`: [{"minuto", COLUMNAS_HORA...}] ordenado (None si no hay registro)."""
+        diario = self.dias().get(fecha)
+        if diario is None:
+            return None
+        filas = self._conexion().execute(
+            "SELECT minuto, prob_lluvia, precip_mm, temp, nubosidad FROM clima_horas WHERE fecha = ? ORDER BY minuto",
+            (fecha.isoformat(),)).fetchall()
+        return {**diario, "horas": [dict(zip(("minuto",) + COLUMNAS_HORA, f)) for f in filas]}
+
+    def descargado(self, fecha):
+        """Epoch de la última descarga del día (None si no está)."""
+        fila = self._conexion().execute("SELECT descargado FROM clima WHERE fecha = ?", (fecha.isoformat(),)).fetchone()
+        return fila[0] if fila else None
+
+    def marcar_descargado(self, fecha):
+        """Reinicia el TTL del día sin cambiar sus datos (refresco fallido: no reintentar en cada ciclo)."""
+        con = self._conexion()
+        with con:
+            con.execute("UPDATE clima SET descargado = ? WHERE fecha = ?", (time.time(), fecha.isoformat()))
+
+    def clima(self, api_key, fecha):
+        """Misma firma que `obtener_clima_wwo` (el api_key no se usa): clima del día o CLIMA_VACIO."""
+        if hasattr(fecha, "date"):
+            fecha = fecha.date()
+        encontrado = self.dias().get(fecha)
+        if encontrado is None:
+            print(f"⚠️ Sin clima para {fecha} en {self.ruta} (corre scripts/clima.py).")
+            return dict(CLIMA_VACIO)
+        return dict(encontrado)
+
+
+def unir_por_hora(df, tabla=None, col_fecha="date", col_hora="hora"):
+    """Agrega COLUMNAS_HORA a un formato largo (fecha, etiqueta de franja) con un merge vectorizado.
+
+    Cada franja toma el bloque que la contiene (9:00 y 10:00 -> bloque 9:00
+    con tp=3). Si la tabla no tiene bloques, `df` vuelve sin cambios.
+    """
+    import franjas
+    import numpy as np
+    import pandas as pd
+
+    tabla = tabla or TablaClima()
+    if not os.path.exists(tabla.ruta):
+        return df
+    horas = tabla.horas()
+    if horas.empty:
+        return df
+    inicios = np.unique(horas["minuto"])
+    ancho = int(np.diff(inicios).min()) if len(inicios) > 1 else 24 * 60
+    minutos = df[col_hora].map({h: franjas.minuto(h) for h in df[col_hora].unique()}).to_numpy(dtype=float)
+    claves = pd.DataFrame({"_fecha": pd.to_datetime(df[col_fecha]).dt.normalize().to_numpy(),
+                           "_bloque": minutos // ancho * ancho})
+    bloques = horas.rename(columns={"fecha": "_fecha", "minuto": "_bloque"}).astype({"_bloque": float})
+    unido = claves.merge(bloques[["_fecha", "_bloque", *COLUMNAS_HORA]], how="left", on=["_fecha", "_bloque"])
+    return df.assign(**{c: unido[c].to_numpy() for c in COLUMNAS_HORA})
+
+
+def del_dia(api_key, fecha, tabla=None, ttl=None, hoy=None, **opciones):
+    """Clima del día con sus bloques por hora desde la tabla; lo descarga (si hay key) si falta.
+
+    Un día pasado no cambia y se descarga una sola vez. El de hoy (o una fecha
+    futura) sí cambia durante el día: se vuelve a pedir cuando lo guardado
+    tiene más de `ttl` segundos (`CLIMA_TTL_HOY_SEG`), así `--verificar-clima`
+    de precalcular.py y el TTL de servicio.py ven los cambios. Si la descarga
+    falla se devuelve lo guardado y el siguiente intento espera otro `ttl`.
+    """
+    tabla = tabla or TablaClima()
+    ttl = TTL_HOY_SEG if ttl is None else ttl
+    hoy = hoy or datetime.now(ZoneInfo(ZONA)).date()
+    clima = tabla.con_horas(fecha)
+    vencido = clima is not None and fecha >= hoy and time.time() - (tabla.descargado(fecha) or 0) > ttl
+    if (clima is None or not clima["horas"] or vencido) and (api_key or opciones.get("url")):
+        r = backfill([fecha], api_key, tabla, forzar=vencido, **opciones)
+        for e in r["errores"]:
+            print(f"❌ Error al obtener clima: {e}")
+        if vencido and r["errores"]:
+            tabla.marcar_descargado(fecha)
+        clima = tabla.con_horas(fecha)
+    return clima or {**CLIMA_VACIO, "horas": []}
+
+
+# =========================
+# DESCARGA
+# =========================
+class _Ritmo:
+    """Espacia los inicios de request a `por_segundo` como máximo."""
+
+    def __init__(self, por_segundo):
+        import asyncio
+
+        self.intervalo = 1 / por_segundo if por_segundo else 0
+        self.siguiente = 0.0
+        self._lock = asyncio.Lock()
+
+    async def esperar(self):
+        import asyncio
+
+        async with self._lock:
+            ahora = time.monotonic()
+            espera = self.siguiente - ahora
+            self.siguiente = max(ahora, self.siguiente) + self.intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+async def _pedir_rango(cliente, api_key, inicio, fin, tp, semaforo, ritmo, url, stats):
+    import asyncio
+
+    params = {"key": api_key, "q": LUGAR, "format": "json", "date": inicio.isoformat(),
+              "enddate": fin.isoformat(), "tp": tp}
+    for intento in range(REINTENTOS):
+        async with semaforo:
+            await ritmo.esperar()
+            stats["requests"] += 1
+            try:
+                r = await cliente.get(url, params=params)
+            except Exception as e:  # red: se reintenta igual que un 5xx
+                r, error = None, e
+        if r is not None and r.status_code == 200:
+            datos = r.json().get("data", {})
+            if "error" in datos:
+                raise RuntimeError(f"{inicio}..{fin}: {datos['error'][0].get('msg')}")
+            if tp == 24:
+                return [parsear_dia(d) for d in datos.get("weather", [])]
+            return [b for d in datos.get("weather", []) for b in parsear_horas(d)]
+        if r is not None and r.status_code not in (429, 500, 502, 503, 504):
+            raise RuntimeError(f"{inicio}..{fin}: HTTP {r.status_code}")
+        stats["reintentos"] += 1
+        espera = float(r.headers.get("Retry-After", 0)) if r is not None else 0
+        await asyncio.sleep(max(espera, 0.5 * 2 ** intento))
+    raise RuntimeError(f"{inicio}..{fin}: sin respuesta tras {REINTENTOS} intentos "
+                       f"({error if r is None else f'HTTP {r.status_code}'})")
+
+
+async def descargar(api_key, rangos, concurrencia=4, por_segundo=5, url=URL_WWO, timeout=30, tp=TP_HORARIO):
+    """Pide cada rango con tp=24 (día) y tp=`tp` (bloques); devuelve (dias, horas, errores, stats)."""
+    import asyncio
+
+    import httpx
+
+    semaforo, ritmo = asyncio.Semaphore(concurrencia), _Ritmo(por_segundo)
+    stats = {"requests": 0, "reintentos": 0}
+    pedidos = [(i, f, t) for i, f in rangos for t in (24, tp)]
+    async with httpx.AsyncClient(timeout=timeout) as cliente:
+        resultados = await asyncio.gather(
+            *[_pedir_rango(cliente, api_key, i, f, t, semaforo, ritmo, url, stats) for i, f, t in pedidos],
+            return_exceptions=True)
+    dias, horas, errores = [], [], []
+    for (_, _, t), r in zip(pedidos, resultados):
+        if isinstance(r, Exception):
+            errores.append(str(r))
+        else:
+            (dias if t == 24 else horas).extend(r)
+    return dias, horas, errores, stats
+
+
+def backfill(fechas, api_key, tabla=None, concurrencia=4, por_segundo=5, url=URL_WWO, forzar=False):
+    """Descarga y guarda el clima de `fechas` que falten (todas con `forzar`); devuelve un resumen."""
+    import asyncio  # solo al descargar: la predicción en vivo importa este módulo para leer la tabla
+
+    tabla = tabla or TablaClima()
+    pendientes = sorted(set(fechas)) if forzar else tabla.faltantes(fechas)
+    rangos = rangos_mensuales(pendientes)
+    t0 = time.perf_counter()
+    dias, horas, errores, stats = asyncio.run(descargar(api_key, rangos, concurrencia, por_segundo, url)) \
+        if rangos else ([], [], [], {"requests": 0, "reintentos": 0})
+    # El rango trae los días intermedios también; se guardan todos
+    if dias or horas:
+        tabla.guardar(dias, horas)
+    return {
+        "fechas": len(pendientes),
+        "rangos": len(rangos),
+        "dias_guardados": len(dias),
+        "bloques_guardados": len(horas),
+        "faltan": len(tabla.faltantes(fechas)),
+        "errores": errores,
+        "segundos": round(time.perf_counter() - t0, 2),
+        **stats,
+    }
+
+
+def main():
+    import argparse
+
+    from dotenv import load_dotenv
+
+    ap = argparse.ArgumentParser(description="Backfill del clima histórico de WWO en una tabla local.")
+    ap.add_argument("--desde", type=date.fromisoformat, help="Inicio del rango (por defecto, fechas de los reportes)")
+    ap.add_argument("--hasta", type=date.fromisoformat, help="Fin del rango (incluido)")
+    ap.add_argument("--concurrencia", type=int, default=4, help="Requests simultáneos")
+    ap.add_argument("--por-segundo", type=float, default=5, help="Inicios de request por segundo")
+    ap.add_argument("--url", default=URL_WWO, help="Endpoint past-weather (p. ej. el simulado)")
+    ap.add_argument("--forzar", action="store_true", help="Vuelve a descargar aunque ya estén en la tabla")
+    ap.add_argument("--estado", action="store_true", help="Solo muestra días guardados y faltantes")
+    args = ap.parse_args()
+
+    if args.desde:
+        hasta = args.hasta or date.today() - timedelta(days=1)
+        fechas = [args.desde + timedelta(days=i) for i in range((hasta - args.desde).days + 1)]
+    else:
+        fechas = fechas_de_reportes()
+    tabla = TablaClima()
+    if args.estado:
+        faltan = tabla.faltantes(fechas)
+        print(f"{len(tabla.dias())} días ({len(tabla.fechas_con_horas())} con bloques por hora) en {tabla.ruta}; "
+              f"faltan {len(faltan)} de {len(fechas)} ({2 * len(rangos_mensuales(faltan))} requests por rango mensual)")
+        return
+
+    load_dotenv()
+    api_key = os.getenv("CLIMATE_API_KEY")
+    if not api_key and "worldweatheronline.com" in args.url:
+        raise SystemExit("❌ Falta CLIMATE_API_KEY")
+    r = backfill(fechas, api_key, tabla, args.concurrencia, args.por_segundo, args.url, args.forzar)
+    print(f"{'✅' if not r['errores'] else '⚠️'} {r['fechas']} fechas en {r['rangos']} rangos: "
+          f"{r['requests']} requests ({r['reintentos']} reintentos), {r['dias_guardados']} días y "
+          f"{r['bloques_guardados']} bloques guardados en {r['segundos']} s; faltan {r['faltan']}")
+    for e in r["errores"]:
+        print("❌", e)
+
+
+if __name__ == "__main__":
+    main()
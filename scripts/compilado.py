@@ -0,0 +1,313 @@
+"""Inferencia compilada: fila (dict) -> vector codificado -> bosque, todo en NumPy.
+
+Con una fila, `pipe.predict` pasa la mayor parte del tiempo en pandas y en los
+transformadores (ColumnTransformer -> OneHotEncoder -> SimpleImputer), no en
+recorrer los árboles. `compilar(bundle)` lee lo que ya está ajustado en el
+pipeline y lo deja en estructuras planas:
+
+- categóricas: un dict valor -> columna del one-hot por variable (las
+  categorías del OneHotEncoder o los vocabularios del bundle);
+- numéricas: las medianas del SimpleImputer;
+- bosque: los árboles de `estimators_` concatenados en arreglos
+  (hijo izquierdo/derecho, feature, umbral, valor) que se recorren para todas
+  las filas y todos los árboles a la vez, un nivel por iteración.
+
+El resultado es el de `pipe.predict` (mismo casteo a float32 antes de comparar
+contra los umbrales). Solo aplica a bundles RandomForest con OneHot + imputer
+o passthrough; para otros `compilar` devuelve None y se usa el camino normal.
+
+Uso:
+    python scripts/compilado.py dragon               # paridad y latencia por fila vs. pipeline
+    python scripts/compilado.py dragon --filas 1000
+    python scripts/compilado.py --todos --latencia 0 # paridad de todos los bundles (sale con error si falla)
+    python scripts/compilado.py dragon --bundle /tmp/dragon.joblib
+"""
+import numpy as np
+
+import vocabulario
+
+
+class ModeloCompilado:
+    """Preprocesamiento + bosque de un bundle, sin pandas ni sklearn al predecir."""
+
+    def __init__(self, bloques, n_features, arboles):
+        self.bloques = bloques
+        self.n_features = n_features
+        (self.raices, self.izq, self.der, self.feature, self.umbral, self.valor, self.profundidad) = arboles
+
+    def codificar(self, filas):
+        """Matriz (n, n_features) float32 igual a la salida del paso `pre`."""
+        X = np.zeros((len(filas), self.n_features))
+        for tipo, cols, inicio, datos in self.bloques:
+            if tipo == "onehot":
+                for col, indice in zip(cols, datos):
+                    for i, f in enumerate(filas):
+                        k = indice(f.get(col))
+                        if k is not None:
+                            X[i, k] = 1.0
+            else:  # numéricas: valor, o la mediana del imputer si falta
+                for j, col in enumerate(cols):
+                    for i, f in enumerate(filas):
+                        v = f.get(col)
+                        X[i, inicio + j] = datos[j] if _falta(v) else float(v)
+        return X.astype(np.float32)
+
+    def predecir_matriz(self, X):
+        """Promedio de las hojas de todos los árboles para cada fila de `X`."""
+        return self.hojas(X).mean(axis=1)
+
+    def hojas(self, X):
+        """Valor de la hoja a la que llega cada fila en cada árbol: (n_filas, n_árboles)."""
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        # Índice plano fila * n_features + feature: un solo `take` por nivel
+        base = (np.arange(len(X)) * X.shape[1])[:, None]
+        planos = X.ravel()
+        nodo = np.broadcast_to(self.raices, (len(X), len(self.raices))).copy()
+        # Las hojas apuntan a sí mismas, así que basta con iterar la profundidad máxima
+        for _ in range(self.profundidad):
+            va_izq = planos[base + self.feature[nodo]] <= self.umbral[nodo]
+            nodo = np.where(va_izq, self.izq[nodo], self.der[nodo])
+        return self.valor[nodo]
+
+    def predecir(self, filas):
+        return self.predecir_matriz(self.codificar(filas))
+
+
+class BosqueConjunto:
+    """Varios `ModeloCompilado` (p. ej. los 25 juegos) recorridos en una sola pasada.
+
+    Cada juego ocupa su propio tramo de columnas en la matriz codificada y sus
+    árboles leen features desplazadas a ese tramo; el recorrido es el mismo
+    de `ModeloCompilado.hojas` y al final se promedian las hojas por juego.
+    Cambia 25 recorridos de ~30 niveles por uno solo sobre todos los árboles.
+    """
+
+    def __init__(self, compilados):
+        self.compilados = dict(compilados)
+        raices, izq, der, feat, umbral, valor, inicios, n_arboles = [], [], [], [], [], [], [], []
+        col, nodo, arbol, profundidad = 0, 0, 0, 0
+        for c in self.compilados.values():
+            raices.append(c.raices + nodo)
+            izq.append(c.izq + nodo)
+            der.append(c.der + nodo)
+            feat.append(c.feature + col)
+            umbral.append(c.umbral)
+            valor.append(c.valor)
+            inicios.append(arbol)
+            n_arboles.append(len(c.raices))
+            col, nodo, arbol = col + c.n_features, nodo + len(c.izq), arbol + len(c.raices)
+            profundidad = max(profundidad, c.profundidad)
+        arboles = (np.concatenate(raices), np.concatenate(izq), np.concatenate(der), np.concatenate(feat),
+                   np.concatenate(umbral), np.concatenate(valor), profundidad)
+        self.bosque = ModeloCompilado([], col, arboles)
+        self.inicios = np.array(inicios)
+        self.n_arboles = np.array(n_arboles)
+
+    def predecir(self, filas_por_juego):
+        """{juego: predicciones}; `filas_por_juego` trae las mismas n filas (momentos) por juego."""
+        X = np.hstack([c.codificar(filas_por_juego[j]) for j, c in self.compilados.items()])
+        medias = np.add.reduceat(self.bosque.hojas(X), self.inicios, axis=1) / self.n_arboles
+        return {j: medias[:, k] for k, j in enumerate(self.compilados)}
+
+
+def _falta(v):
+    try:
+        return v is None or bool(v != v)
+    except TypeError:
+        return True  # pd.NA
+
+
+# =========================
+# COMPILAR
+# =========================
+def _indice_onehot(col, categorias, inicio, vocabularios):
+    """Función valor -> columna del one-hot (None si desconocido, como handle_unknown='ignore')."""
+    if vocabularios is not None:
+        voc = vocabularios[col]
+        return lambda v: (inicio + c) if (c := voc.codigo(v)) >= 0 else None
+    posiciones = {}
+    for k, c in enumerate(categorias):
+        posiciones.setdefault(c.item() if hasattr(c, "item") else c, inicio + k)
+    return lambda v: posiciones.get(v.item() if hasattr(v, "item") else v)
+
+
+def _bloques(pre, vocabularios):
+    """Plan del ColumnTransformer: [(tipo, columnas, columna inicial, datos)] o None si no se soporta."""
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    bloques, inicio = [], 0
+    for _, trans, cols in pre.transformers_:
+        if trans == "drop":
+            continue
+        cols = list(cols)
+        if isinstance(trans, Pipeline) and len(trans.steps) == 1:
+            trans = trans.steps[0][1]
+        if isinstance(trans, OneHotEncoder):
+            if trans.drop is not None or getattr(trans, "_infrequent_enabled", False):
+                return None
+            indices = []
+            for col, cats in zip(cols, trans.categories_):
+                indices.append(_indice_onehot(col, cats, inicio, vocabularios))
+                inicio += len(cats)
+            bloques.append(("onehot", cols, None, indices))
+        elif isinstance(trans, SimpleImputer) and trans.strategy in ("median", "mean", "constant"):
+            bloques.append(("num", cols, inicio, trans.statistics_.astype(float)))
+            inicio += len(cols)
+        elif trans == "passthrough":
+            bloques.append(("num", cols, inicio, np.full(len(cols), np.nan)))
+            inicio += len(cols)
+        else:
+            return None
+    return bloques, inicio
+
+
+def _aplanar(estimadores):
+    """Concatena los `tree_` en arreglos globales con índices globales; cada hoja es su propio hijo."""
+    izq, der, feat, umbral, valor, raices = [], [], [], [], [], []
+    desplazamiento, profundidad = 0, 0
+    for est in estimadores:
+        t = est.tree_
+        raices.append(desplazamiento)
+        hoja = t.children_left < 0
+        propio = np.arange(t.node_count) + desplazamiento
+        izq.append(np.where(hoja, propio, t.children_left + desplazamiento))
+        der.append(np.where(hoja, propio, t.children_right + desplazamiento))
+        feat.append(np.where(hoja, 0, t.feature))
+        umbral.append(t.threshold)
+        valor.append(t.value[:, 0, 0])
+        desplazamiento += t.node_count
+        profundidad = max(profundidad, t.max_depth)
+    return (np.array(raices), np.concatenate(izq), np.concatenate(der), np.concatenate(feat),
+            np.concatenate(umbral), np.concatenate(valor), profundidad)
+
+
+def compilar(bundle):
+    """`ModeloCompilado` del bundle, o None si el pipeline no es OneHot/imputer -> RandomForest."""
+    from sklearn.ensemble import RandomForestRegressor
+
+    pipe = bundle["pipeline"]
+    pre, modelo = pipe.steps[0][1], pipe.steps[-1][1]
+    if len(pipe.steps) != 2 or not isinstance(modelo, RandomForestRegressor) or not hasattr(pre, "transformers_"):
+        return None
+    plan = _bloques(pre, vocabulario.desde_bundle(bundle))
+    if plan is None or plan[1] != modelo.n_features_in_:
+        return None
+    bloques, n_features = plan
+    return ModeloCompilado(bloques, n_features, _aplanar(modelo.estimators_))
+
+
+# =========================
+# PARIDAD Y LATENCIA
+# =========================
+def _medir_us(fn, filas):
+    import time
+    t0 = time.perf_counter()
+    for f in filas:
+        fn(f)
+    return (time.perf_counter() - t0) / len(filas) * 1e6
+
+
+def filas_paridad(bundle, largo, n_filas=300):
+    """Filas (dicts) para comparar contra el pipeline: histórico + casos borde.
+
+    Las columnas son las del bundle (`cat_cols + num_cols`), no las de
+    `entrenar.CAT_COLS`, así un bundle de notebook (`condiciones_cielo`) y uno
+    nuevo (`cielo`, columnas por hora) se prueban con sus propias features; una
+    columna que el histórico ya no trae queda en None. A la muestra se agregan
+    filas con None, NaN y `pd.NA` en cada columna y con categorías desconocidas.
+    """
+    import pandas as pd
+
+    cols = bundle["cat_cols"] + bundle["num_cols"]
+    muestra = largo.reindex(columns=cols).sample(min(n_filas, len(largo)), random_state=0)
+    muestra = muestra.astype(object).where(muestra.notna(), None)
+    filas = muestra.to_dict(orient="records")
+    base = filas[0]
+    bordes = [dict.fromkeys(cols), dict.fromkeys(cols, float("nan"))]
+    bordes += [{**base, c: None} for c in cols]
+    bordes += [{**base, c: float("nan")} for c in bundle["num_cols"]]
+    bordes += [{**base, c: pd.NA} for c in bundle["num_cols"]]
+    bordes += [{**base, c: desconocido} for c in bundle["cat_cols"] for desconocido in ("???", "25:00", -7)]
+    return filas + bordes
+
+
+def paridad(bundle, filas, compilado=None):
+    """Diferencia máxima entre `pipe.predict` (con DataFrame) y el modelo compilado sobre `filas`."""
+    import pandas as pd
+
+    compilado = compilado or compilar(bundle)
+    cols = bundle["cat_cols"] + bundle["num_cols"]
+    df = pd.DataFrame(filas, columns=cols)
+    df[bundle["num_cols"]] = df[bundle["num_cols"]].apply(pd.to_numeric, errors="coerce")
+    df[bundle["cat_cols"]] = df[bundle["cat_cols"]].astype(object).where(df[bundle["cat_cols"]].notna(), None)
+    esperado = bundle["pipeline"].predict(vocabulario.preparar_entrada(bundle, df))
+    return float(np.abs(esperado - compilado.predecir(filas)).max())
+
+
+def main():
+    import argparse
+    import glob
+    import os
+    import sys
+    import time
+
+    import joblib
+    import pandas as pd
+
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.join(raiz, "data_analysis"))
+    import entrenar
+    import fast_predict
+
+    ap = argparse.ArgumentParser(description="Paridad y latencia de la inferencia compilada contra el pipeline.")
+    ap.add_argument("juegos", nargs="*", help="Juegos (bundles en data_analysis/models)")
+    ap.add_argument("--todos", action="store_true", help="Todos los bundles por juego de data_analysis/models")
+    ap.add_argument("--bundle", help="Ruta a un .joblib (p. ej. uno recién entrenado); usa el CSV del primer juego")
+    ap.add_argument("--filas", type=int, default=300, help="Filas del histórico para la paridad")
+    ap.add_argument("--latencia", type=int, default=100, help="Filas medidas una por una (0 = sin latencia)")
+    args = ap.parse_args()
+
+    modelos = os.path.join(raiz, "data_analysis", "models")
+    juegos = args.juegos or ([os.path.basename(r)[:-7] for r in sorted(glob.glob(os.path.join(modelos, "*.joblib")))
+                              if os.path.basename(r)[:-7] in fast_predict.JUEGOS] if args.todos else [])
+    if not juegos:
+        ap.error("indica un juego o --todos")
+    fallas = 0
+    for juego in juegos:
+        bundle = joblib.load(args.bundle or os.path.join(modelos, f"{juego}.joblib"))
+        t0 = time.perf_counter()
+        compilado = compilar(bundle)
+        ms_compilar = (time.perf_counter() - t0) * 1000
+        if compilado is None:
+            print(f"⚠️ [{juego}] Bundle no soportado (solo RandomForest con OneHot + imputer); se usa el pipeline.")
+            continue
+        if not (entrenar.BY_GAME_DIR / f"{juego}.csv").exists():
+            print(f"⚠️ [{juego}] No hay data/by_game/{juego}.csv para la paridad.")
+            continue
+        largo = entrenar.formato_largo(pd.read_csv(entrenar.BY_GAME_DIR / f"{juego}.csv"))
+        filas = filas_paridad(bundle, largo, args.filas)
+        dif = paridad(bundle, filas, compilado)
+        ok = dif < 1e-9
+        fallas += not ok
+        tipo = "enteros" if bundle.get("vocabularios") else "texto"
+        print(f"{'✅' if ok else '❌'} [{juego}] Paridad en {len(filas)} filas ({tipo}, "
+              f"{len(filas) - min(args.filas, len(largo))} borde): diferencia máxima {dif:.2e}")
+
+        if args.latencia:
+            cols = bundle["cat_cols"] + bundle["num_cols"]
+            muestra = filas[:args.latencia]
+            pipe_us = _medir_us(lambda f: bundle["pipeline"].predict(
+                vocabulario.preparar_entrada(bundle, pd.DataFrame({k: [v] for k, v in f.items()})[cols])), muestra)
+            fila_us = _medir_us(lambda f: fast_predict.predecir_lote(bundle, [f], compilado=False), muestra)
+            comp_us = _medir_us(lambda f: compilado.predecir([f]), muestra)
+            print(f"   Compilar: {ms_compilar:.1f} ms ({len(compilado.raices)} árboles, {len(compilado.izq)} nodos)")
+            print(f"   µs por fila: pipeline+DataFrame={pipe_us:,.0f} | predecir_fila={fila_us:,.0f} "
+                  f"| compilado={comp_us:,.0f}")
+    if fallas:
+        raise SystemExit(f"❌ {fallas} bundle(s) sin paridad")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Push a PocketBase solo cuando cambia la espera predicha.
+
+Cada ciclo encola `(nombre en PocketBase, valor)` con `encolar` y al final
+`enviar` manda de una vez (una pasada seguida, no un request por etapa del
+ciclo) solo los juegos cuyo valor se movió al menos `PUSH_UMBRAL` minutos
+respecto del último enviado. Los demás se suprimen: no hay escritura en
+PocketBase ni evento realtime hacia los dashboards.
+
+El último valor enviado por juego se guarda en SQLite, así que sobrevive a
+reinicios y lo comparten los 25 scripts de cron, `fast_predict.py` y
+`precalcular.py`. Un envío fallido no actualiza el último valor: el siguiente
+ciclo lo reintenta. En el `Ciclo` se cuentan `push_ok`, `push_suprimido` y
+`push_error`; los totales acumulados quedan en la misma base.
+
+Variables de entorno: `PUSH_ESTADO` (ruta, vacía = sin memoria, se envía
+todo) y `PUSH_UMBRAL` (minutos, 1.0 por defecto; 0 = enviar siempre).
+
+Uso:
+    python scripts/empuje.py                     # últimos valores y enviados / suprimidos
+    python scripts/empuje.py --olvidar Dragón    # el próximo ciclo lo envía sí o sí
+    python scripts/empuje.py --olvidar           # todos (p. ej. tras resetear PocketBase)
+"""
+import os
+import sqlite3
+import time
+
+RUTA = os.getenv("PUSH_ESTADO", "data/cache/push.sqlite")
+UMBRAL = float(os.getenv("PUSH_UMBRAL", "1.0"))
+
+
+class Empuje:
+    """Cola de cambios del ciclo + último valor enviado por juego."""
+
+    def __init__(self, enviar=None, ruta=RUTA, umbral=UMBRAL):
+        self._enviar = enviar
+        self.ruta = ruta
+        self.umbral = umbral
+        self.pendientes = {}
+        self._con = None
+
+    def _conexion(self):
+        if self._con is None:
+            os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+            con = sqlite3.connect(self.ruta, timeout=5)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("CREATE TABLE IF NOT EXISTS ultimos (nombre TEXT PRIMARY KEY, valor REAL, enviado REAL)")
+            con.execute("CREATE TABLE IF NOT EXISTS estadisticas (evento TEXT PRIMARY KEY, n INTEGER)")
+            self._con = con
+        return self._con
+
+    def ultimos(self):
+        """{nombre: último valor enviado}; vacío si no hay memoria."""
+        if not self.ruta:
+            return {}
+        try:
+            return dict(self._conexion().execute("SELECT nombre, valor FROM ultimos").fetchall())
+        except sqlite3.Error as e:
+            print(f"⚠️ Estado del push no disponible ({e}); se envía todo.")
+            return {}
+
+    def encolar(self, nombre, valor):
+        """Deja el valor para el próximo `enviar` (el último encolado por juego gana)."""
+        self.pendientes[nombre] = round(float(valor), 2)
+
+    def cambios(self):
+        """{nombre: valor} de lo encolado que supera el umbral contra el último enviado."""
+        ultimos = self.ultimos()
+        return {n: v for n, v in self.pendientes.items()
+                if n not in ultimos or abs(v - ultimos[n]) >= self.umbral}
+
+    def enviar(self, ciclo=None):
+        """Manda los cambios encolados y vacía la cola; devuelve {nombre: valor} enviados."""
+        if self._enviar is None:
+            from pb_helpers import set_time_by_name
+            self._enviar = set_time_by_name
+        cambios = self.cambios()
+        suprimidos = len(self.pendientes) - len(cambios)
+        self.pendientes = {}
+        enviados, errores = {}, 0
+        for nombre, valor in cambios.items():
+            try:
+                resp = self._enviar(nombre, valor)
+                enviados[nombre] = valor
+                print(f"Actualizado en PocketBase ({nombre}). Nuevo time:", (resp or {}).get("time"))
+            except Exception as e:
+                errores += 1
+                print(f"Error actualizando PocketBase ({nombre}):", e)
+        if suprimidos:
+            print(f"Sin cambios ≥ {self.umbral} min: {suprimidos} juego(s) sin push.")
+        if ciclo is not None:
+            for evento, n in (("push_ok", len(enviados)), ("push_suprimido", suprimidos), ("push_error", errores)):
+                if n:
+                    ciclo.contar(evento, n)
+        self._registrar(enviados, suprimidos, errores)
+        return enviados
+
+    def _registrar(self, enviados, suprimidos, errores):
+        if not self.ruta:
+            return
+        try:
+            con = self._conexion()
+            with con:
+                ahora = time.time()
+                con.executemany("INSERT OR REPLACE INTO ultimos VALUES (?, ?, ?)",
+                                [(n, v, ahora) for n, v in enviados.items()])
+                con.executemany("INSERT INTO estadisticas VALUES (?, ?) "
+                                "ON CONFLICT(evento) DO UPDATE SET n = n + excluded.n",
+                                [(e, n) for e, n in (("enviado", len(enviados)), ("suprimido", suprimidos),
+                                                     ("error", errores)) if n])
+        except sqlite3.Error as e:
+            print(f"⚠️ No se pudo guardar el estado del push ({e}).")
+
+    def estadisticas(self):
+        """{"enviados", "suprimidos", "errores", "tasa_supresion"} acumulados desde que existe la base."""
+        n = dict(self._conexion().execute("SELECT evento, n FROM estadisticas").fetchall())
+        enviados, suprimidos = n.get("enviado", 0), n.get("suprimido", 0)
+        return {
+            "enviados": enviados,
+            "suprimidos": suprimidos,
+            "errores": n.get("error", 0),
+            "tasa_supresion": round(suprimidos / (enviados + suprimidos), 4) if enviados + suprimidos else None,
+        }
+
+    def olvidar(self, nombres=None):
+        """Borra el último valor (de `nombres` o de todos): el próximo ciclo los envía."""
+        con = self._conexion()
+        with con:
+            if nombres:
+                con.executemany("DELETE FROM ultimos WHERE nombre = ?", [(n,) for n in nombres])
+            else:
+                con.execute("DELETE FROM ultimos")
+
+
+if __name__ == "__main__":
+    import argparse
+    from datetime import datetime
+
+    ap = argparse.ArgumentParser(description="Estado del push a PocketBase por cambios.")
+    ap.add_argument("--olvidar", nargs="*", metavar="NOMBRE", help="Fuerza el próximo envío (todos si no se indica)")
+    args = ap.parse_args()
+    empuje = Empuje()
+    if args.olvidar is not None:
+        empuje.olvidar(args.olvidar)
+        print(f"✅ Último valor olvidado: {', '.join(args.olvidar) or 'todos'}")
+    else:
+        filas = empuje._conexion().execute("SELECT nombre, valor, enviado FROM ultimos ORDER BY nombre").fetchall()
+        for nombre, valor, enviado in filas:
+            print(f"{nombre:<22}{valor:>8.2f}  {datetime.fromtimestamp(enviado):%Y-%m-%d %H:%M}")
+        print(empuje.estadisticas())
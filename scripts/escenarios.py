@@ -0,0 +1,291 @@
+"""Escenarios "¿qué pasa si...?" en lote sobre los modelos por juego.
+
+Preguntas como "¿y si llueve el sábado?", "¿y si el Dragón da 20 % más
+ciclos?" o "¿y si es feriado?" se respondían editando `construir_fila_actual`
+a mano. Aquí se describen en un JSON:
+
+    {
+      "juegos": ["dragon", "tifon"],                 # opcional; por defecto, los que tengan modelo
+      "fechas": ["2025-03-08"],                      # o {"desde": "2025-03-01", "hasta": "2025-03-31"}
+      "horas": 10,                                   # franjas desde la apertura (9:00)
+      "ejes": {
+        "clima":   {"actual": {}, "lluvia": {"clima": {"condiciones_cielo": "Heavy rain at times",
+                                                       "prob_lluvia_hora": 90}}},
+        "ciclos":  {"normal": {}, "+20%": {"juegos": ["dragon"], "escala": {"ciclos_h": 1.2}}},
+        "feriado": {"no": {}, "si": {"fila": {"es_festivo": true, "nombre_festivo": "Navidad"}}}
+      }
+    }
+
+Cada opción de un eje puede traer:
+
+- `clima`: claves que pisan el clima del día antes de armar la fila (pasan por
+  `cielo.de_clima` y `clima.valores_hora`, igual que `/que-pasa-si`);
+- `fila`: valores fijos de features ya armadas (`es_festivo`, `temporada_alta`, ...);
+- `escala`: factores sobre features numéricas (`ciclos_h`, `asistencia_h`, ...);
+- `juegos`: la opción solo aplica a esos juegos (en los demás es neutra).
+
+Los escenarios son el producto cartesiano de los ejes (`lluvia|+20%|si`, ...)
+y la grilla completa es juegos x fechas x franjas x escenarios. Nada de eso se
+materializa: por juego se recorre el producto con `itertools.product`, las
+filas base se arman una vez por (fecha, clima, franja) y se predicen en lotes
+de `--lote` filas con `fast_predict.predecir_lote` (ruta compilada); una fila
+que repite las features que usa el modelo no se vuelve a predecir. Cada lote
+se escribe al CSV de salida (`.csv.gz` comprimido) en cuanto se predice, con
+la espera del escenario, la del escenario base (sin pisar nada) y la
+diferencia.
+
+Uso:
+    python scripts/escenarios.py --ejemplo > escenarios.json
+    python scripts/escenarios.py escenarios.json --salida data/cache/escenarios.csv.gz
+    python scripts/escenarios.py escenarios.json --juegos dragon --resumen 20
+"""
+import argparse
+import csv
+import gzip
+import itertools
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import clima as clima_wwo
+import fast_predict
+import franjas
+from metricas import Ciclo
+from precalcular import HORAS, momentos_del_dia
+
+SALIDA = "data/cache/escenarios.csv.gz"
+LOTE = 4096
+CLAVES_OPCION = {"clima", "fila", "escala", "juegos"}
+COLUMNAS_SALIDA = ["escenario", "juego", "fecha", "hora", "espera", "base", "diferencia"]
+
+EJEMPLO = {
+    "fechas": {"desde": "2025-03-01", "hasta": "2025-03-31"},
+    "horas": HORAS,
+    "ejes": {
+        "clima": {"actual": {}, "nublado": {"clima": {"condiciones_cielo": "Overcast"}},
+                  "lluvia": {"clima": {"condiciones_cielo": "Heavy rain at times", "prob_lluvia_hora": 90}}},
+        "ciclos": {"normal": {}, "+20%": {"juegos": ["dragon"], "escala": {"ciclos_h": 1.2}}},
+        "feriado": {"no": {}, "si": {"fila": {"es_festivo": True, "nombre_festivo": "Navidad"}}},
+    },
+}
+
+
+# =========================
+# 1) ESPECIFICACIÓN
+# =========================
+def fechas_de(spec):
+    """Lista de fechas de `spec["fechas"]` (lista ISO o {"desde", "hasta"}); hoy si no hay."""
+    fechas = spec.get("fechas")
+    if not fechas:
+        return [datetime.now(ZoneInfo(fast_predict.TZ_NAME)).date()]
+    if isinstance(fechas, dict):
+        desde, hasta = date.fromisoformat(fechas["desde"]), date.fromisoformat(fechas["hasta"])
+        return [desde + timedelta(days=i) for i in range((hasta - desde).days + 1)]
+    return [date.fromisoformat(f) for f in fechas]
+
+
+def validar_spec(spec, features):
+    """Lanza ValueError si un eje u opción no tiene la forma esperada o pisa features inexistentes."""
+    ejes = spec.get("ejes") or {}
+    if not isinstance(ejes, dict):
+        raise ValueError("'ejes' debe ser {eje: {opción: {...}}}")
+    for eje, opciones in ejes.items():
+        if not isinstance(opciones, dict) or not opciones:
+            raise ValueError(f"Eje '{eje}' sin opciones")
+        for nombre, opcion in opciones.items():
+            donde = f"{eje}.{nombre}"
+            extra = set(opcion) - CLAVES_OPCION
+            if extra:
+                raise ValueError(f"{donde}: claves desconocidas {sorted(extra)} (válidas: {sorted(CLAVES_OPCION)})")
+            desconocidas = (set(opcion.get("fila", {})) | set(opcion.get("escala", {}))) - set(features)
+            if desconocidas:
+                raise ValueError(f"{donde}: features desconocidas {sorted(desconocidas)}")
+            no_numericas = [k for k in opcion.get("escala", {})
+                            if isinstance(features[k], (str, bool))]
+            if no_numericas:
+                raise ValueError(f"{donde}: 'escala' solo aplica a features numéricas, no a {no_numericas}")
+            for juego in opcion.get("juegos", ()):
+                if juego not in fast_predict.JUEGOS:
+                    raise ValueError(f"{donde}: juego desconocido '{juego}'")
+
+
+def escenarios(spec):
+    """Generador de (nombre, [opciones]) con el producto cartesiano de los ejes, sin materializarlo."""
+    ejes = list((spec.get("ejes") or {"escenario": {"base": {}}}).values())
+    for combinacion in itertools.product(*(list(o.items()) for o in ejes)):
+        yield "|".join(n for n, _ in combinacion), [o for _, o in combinacion]
+
+
+def contar_escenarios(spec):
+    n = 1
+    for opciones in (spec.get("ejes") or {}).values():
+        n *= len(opciones)
+    return n
+
+
+def combinar(opciones, juego):
+    """(clima, fila, escala) efectivos para `juego` a partir de las opciones que le aplican."""
+    clima, fila, escala = {}, {}, {}
+    for opcion in opciones:
+        if "juegos" in opcion and juego not in opcion["juegos"]:
+            continue
+        clima.update(opcion.get("clima", {}))
+        fila.update(opcion.get("fila", {}))
+        for k, factor in opcion.get("escala", {}).items():
+            escala[k] = escala.get(k, 1.0) * factor
+    return clima, fila, escala
+
+
+# =========================
+# 2) EVALUACIÓN
+# =========================
+def clima_base(fechas, api_key):
+    """{fecha: clima del día}: tabla local (y WWO si falta) hasta hoy; vacío para fechas futuras."""
+    hoy = datetime.now(ZoneInfo(fast_predict.TZ_NAME)).date()
+    return {f: (fast_predict.obtener_clima_wwo(api_key, f) if f <= hoy else {**clima_wwo.CLIMA_VACIO, "horas": []})
+            for f in fechas}
+
+
+def filas_juego(juego, bundle, lookup, spec, fechas, climas, tz):
+    """Generador de ((escenario, fecha, etiqueta), fila) para un juego.
+
+    La fila base (`construir_fila`) se arma una vez por fecha, franja y clima
+    pisado distinto; `fila` y `escala` se aplican sobre una copia.
+    """
+    ancho = bundle.get("ancho_franja", 60)
+    horas = spec.get("horas", HORAS)
+    momentos = {f: momentos_del_dia(f, tz, ancho, horas) for f in fechas}
+    bases = {}
+    for nombre, opciones in escenarios(spec):
+        clima, fija, escala = combinar(opciones, juego)
+        clave_clima = json.dumps(clima, sort_keys=True)
+        for f in fechas:
+            if (f, clave_clima) not in bases:
+                dia = {**climas[f], **clima}
+                bases[(f, clave_clima)] = [(franjas.etiqueta(franjas.franja_de(m, ancho)),
+                                            fast_predict.construir_fila(m, dia, lookup, ancho))
+                                           for m in momentos[f]]
+            for etiqueta, base in bases[(f, clave_clima)]:
+                fila = {**base, **fija}
+                for k, factor in escala.items():
+                    if fila[k] is not None:
+                        fila[k] = fila[k] * factor
+                yield (nombre, f, etiqueta), fila
+
+
+def predecir(bundle, filas, memo):
+    """Predicciones de `filas`; solo pasan por `predict` las que no están en `memo`.
+
+    La clave son las features que usa el bundle: un escenario que pisa algo que
+    el modelo no ve (p. ej. `cielo` en un bundle de notebook) o una opción que
+    no aplica al juego repite filas ya predichas.
+    """
+    columnas = bundle["cat_cols"] + bundle["num_cols"]
+    claves = [tuple(fila.get(c) for c in columnas) for fila in filas]
+    nuevas = {}
+    for clave, fila in zip(claves, filas):
+        if clave not in memo and clave not in nuevas:
+            nuevas[clave] = fila
+    if nuevas:
+        memo.update(zip(nuevas, fast_predict.predecir_lote(bundle, list(nuevas.values()))))
+    return [memo[c] for c in claves]
+
+
+def _abrir(ruta):
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    if ruta.endswith(".gz"):
+        return gzip.open(ruta, "wt", newline="", encoding="utf-8", compresslevel=1)
+    return open(ruta, "w", newline="", encoding="utf-8")
+
+
+def evaluar(spec, salida=SALIDA, juegos=None, lote=LOTE, api_key=None, ciclo=None):
+    """Predice toda la grilla de `spec` y la escribe en `salida` lote por lote.
+
+    Returns:
+        dict: {"filas", "escenarios", "juegos", "segundos", "por_escenario": {nombre: (n, suma dif)}}.
+    """
+    ciclo = ciclo or Ciclo("escenarios")
+    tz = ZoneInfo(fast_predict.TZ_NAME)
+    juegos = juegos or spec.get("juegos") or sorted(
+        j for j in fast_predict.JUEGOS if os.path.exists(os.path.join(fast_predict.MODELS_DIR, f"{j}.joblib")))
+    fechas = fechas_de(spec)
+    with ciclo.span("clima"):
+        climas = clima_base(fechas, api_key)
+    validar_spec(spec, fast_predict.construir_fila(momentos_del_dia(fechas[0], tz)[0], climas[fechas[0]], None))
+
+    t0 = time.perf_counter()
+    n_filas, por_escenario = 0, {}
+    with _abrir(salida) as f:
+        escritor = csv.writer(f)
+        escritor.writerow(COLUMNAS_SALIDA)
+        for juego in juegos:
+            with ciclo.span("modelo"):
+                bundle = fast_predict.cargar_modelo(juego)
+                lookup = fast_predict.cargar_lookup(juego)
+            memo = {}
+            # Escenario base del juego: una fila por fecha y franja, sin pisar nada
+            with ciclo.span("prediccion"):
+                claves, filas = zip(*filas_juego(juego, bundle, lookup, {**spec, "ejes": None}, fechas, climas, tz))
+                base = {(fecha, etiqueta): p for (_, fecha, etiqueta), p in zip(claves, predecir(bundle, filas, memo))}
+            pendientes = filas_juego(juego, bundle, lookup, spec, fechas, climas, tz)
+            while True:
+                with ciclo.span("filas"):
+                    bloque = list(itertools.islice(pendientes, lote))
+                if not bloque:
+                    break
+                with ciclo.span("prediccion"):
+                    preds = predecir(bundle, [fila for _, fila in bloque], memo)
+                with ciclo.span("escritura"):
+                    renglones = []
+                    for ((nombre, fecha, etiqueta), _), p in zip(bloque, preds):
+                        b = base[(fecha, etiqueta)]
+                        dif = round(p - b, 2)
+                        renglones.append((nombre, juego, fecha.isoformat(), etiqueta, p, b, dif))
+                        n, suma = por_escenario.get(nombre, (0, 0.0))
+                        por_escenario[nombre] = (n + 1, suma + dif)
+                    escritor.writerows(renglones)
+                n_filas += len(bloque)
+            ciclo.contar("filas_predichas", len(memo))
+    ciclo.contar("filas", n_filas)
+    return {"filas": n_filas, "escenarios": contar_escenarios(spec), "juegos": len(juegos),
+            "segundos": round(time.perf_counter() - t0, 2), "por_escenario": por_escenario}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Evalúa escenarios qué-pasa-si en lote con los modelos por juego.")
+    ap.add_argument("spec", nargs="?", help="JSON con juegos, fechas, horas y ejes de escenarios")
+    ap.add_argument("--salida", default=SALIDA, help="CSV de resultados (.csv.gz para comprimir)")
+    ap.add_argument("--juegos", nargs="+", help="Pisa los juegos del JSON")
+    ap.add_argument("--lote", type=int, default=LOTE, help="Filas por predict")
+    ap.add_argument("--resumen", type=int, default=10, help="Escenarios a listar con su diferencia media")
+    ap.add_argument("--ejemplo", action="store_true", help="Imprime un JSON de ejemplo y termina")
+    args = ap.parse_args()
+
+    if args.ejemplo:
+        print(json.dumps(EJEMPLO, ensure_ascii=False, indent=2))
+        return
+    if not args.spec:
+        ap.error("falta el JSON de escenarios (o --ejemplo)")
+    with open(args.spec, encoding="utf-8") as f:
+        spec = json.load(f)
+    desconocidos = [j for j in args.juegos or spec.get("juegos") or [] if j not in fast_predict.JUEGOS]
+    if desconocidos:
+        raise SystemExit(f"❌ Juegos desconocidos: {desconocidos}")
+
+    ciclo = Ciclo("escenarios")
+    try:
+        r = evaluar(spec, args.salida, args.juegos, args.lote, fast_predict.leer_api_key(), ciclo)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    print(f"✅ {r['filas']:,} filas ({r['escenarios']} escenarios, {r['juegos']} juegos) en {r['segundos']} s "
+          f"-> {args.salida}")
+    medias = sorted(((s / n, nombre) for nombre, (n, s) in r["por_escenario"].items()), key=lambda x: -abs(x[0]))
+    for media, nombre in medias[:args.resumen]:
+        print(f"   {nombre:<40}{media:>+8.2f} min vs base")
+    ciclo.emitir()
+
+
+if __name__ == "__main__":
+    main()
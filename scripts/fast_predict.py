@@ -0,0 +1,451 @@
+"""Entrada rápida para la predicción en vivo de un juego.
+
+Hace lo mismo que `scripts/<juego>.py` (fila actual -> predicción -> PocketBase),
+pero difiere los imports pesados hasta que se necesitan y arma la fila con un
+lookup precalculado en `.npz` (sin pandas). Los tiempos por fase salen en la
+línea JSON de `metricas.Ciclo`.
+
+Uso:
+    python scripts/fast_predict.py dragon                   # predice y actualiza PocketBase
+    python scripts/fast_predict.py dragon --no-push         # solo imprime la predicción
+    python scripts/fast_predict.py --construir-lookup       # precalcula los lookups de todos los juegos
+    python scripts/fast_predict.py dragon --no-push --importtime   # compara `python -X importtime`
+    python scripts/fast_predict.py --global                 # los 25 juegos con el modelo global, un solo predict
+"""
+import argparse
+import os
+import subprocess
+import sys
+import weakref
+from datetime import datetime
+
+import cielo
+import clima as clima_wwo
+import franjas
+import vocabulario
+from juegos import JUEGOS
+from metricas import Ciclo
+
+# =========================
+# 0) CONFIG
+# =========================
+TZ_NAME = "America/Guatemala"
+MODELS_DIR = "data_analysis/models"
+BY_GAME_DIR = "data/by_game"
+LOOKUP_DIR = "data/by_game/lookup"
+LOOKBACK_YEARS = 3
+
+# Feriados Guatemala (MM-DD -> nombre)
+FERIADOS_GT = {
+    "01-01": "Año Nuevo",
+    "01-15": "Día del Cristo Negro",
+    "05-01": "Día del Trabajo",
+    "06-30": "Día del Ejército",
+    "09-15": "Día de la Independencia",
+    "10-20": "Revolución de 1944",
+    "11-01": "Día de Todos los Santos",
+    "12-25": "Navidad",
+}
+
+# Imports + carga del modelo del script clásico, línea base de `-X importtime`
+IMPORTS_CLASICOS = (
+    "import os, joblib, pandas as pd, numpy as np, requests; "
+    "from datetime import datetime, date; "
+    "from zoneinfo import ZoneInfo; "
+    "from dotenv import load_dotenv; "
+    "joblib.load({ruta!r})"
+)
+
+CLIMA_VACIO = dict(clima_wwo.CLIMA_VACIO)
+
+
+# =========================
+# 1) LOOKUP PRECALCULADO
+# =========================
+def ruta_lookup(juego):
+    return os.path.join(LOOKUP_DIR, f"{juego}.npz")
+
+
+def construir_lookup_npz(juego, lookback_years=LOOKBACK_YEARS):
+    """Precalcula el lookup histórico de un juego como arreglos densos.
+
+    Reproduce el orden de respaldo de `rellenar_expecteds` en los scripts por juego
+    (dow+mes+hora -> dow+hora -> hora -> global) y lo resuelve de antemano, así en
+    vivo basta con indexar `[dow, mes - 1, franja]`. Las franjas se guardan como
+    minuto del día (`franjas.minuto`) junto con su ancho, por hora o más finas.
+
+    Args:
+        juego (str): Nombre del archivo en data/by_game sin extensión.
+        lookback_years (int): Años hacia atrás usados para los promedios.
+
+    Returns:
+        str: Ruta del `.npz` generado.
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = pd.read_csv(os.path.join(BY_GAME_DIR, f"{juego}.csv"))
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["date"])
+    df = df[df["date"].dt.year >= int(df["date"].dt.year.max()) - lookback_years]
+
+    bins = franjas.detectar(df.columns)
+    minutos = np.array([m for m, *_ in bins], dtype=np.int16)
+    registros = []
+    for i, (_, _, col_c, col_a) in enumerate(bins):
+        registros.append(pd.DataFrame({
+            "dow": df["date"].dt.dayofweek,
+            "month": df["date"].dt.month,
+            "hora": i,
+            "asistencia_h": df[col_a],
+            "ciclos_h": df[col_c],
+        }))
+    largo = pd.concat(registros, ignore_index=True)
+    valores = ["asistencia_h", "ciclos_h"]
+
+    glob = largo[valores].mean().to_numpy()
+    tabla = np.empty((7, 12, len(bins), 2))
+    tabla[:] = glob
+
+    # Del nivel más general al más específico: cada nivel pisa al anterior
+    # salvo cuando sus dos valores son NaN (igual que el respaldo por juego).
+    for claves in (["hora"], ["dow", "hora"], ["dow", "month", "hora"]):
+        grp = largo.groupby(claves)[valores].mean()
+        grp = grp[~grp.isna().all(axis=1)]
+        idx = grp.index.to_frame(index=False)
+        dows = idx["dow"].to_numpy() if "dow" in idx else slice(None)
+        meses = idx["month"].to_numpy() - 1 if "month" in idx else slice(None)
+        hs = idx["hora"].to_numpy()
+        if claves == ["hora"]:
+            tabla[:, :, hs, :] = grp.to_numpy()[None, None, :, :]
+        elif claves == ["dow", "hora"]:
+            tabla[dows, :, hs, :] = grp.to_numpy()[:, None, :]
+        else:
+            tabla[dows, meses, hs, :] = grp.to_numpy()
+
+    os.makedirs(LOOKUP_DIR, exist_ok=True)
+    salida = ruta_lookup(juego)
+    np.savez(salida, minutos=minutos, ancho=franjas.ancho_de(minutos.tolist(), 60),
+             tabla=np.round(tabla, 0), glob=np.round(glob, 0))
+    return salida
+
+
+def cargar_lookup(juego):
+    """Carga el `.npz` del juego; lo (re)construye si no existe o si el CSV es más nuevo."""
+    import numpy as np
+
+    ruta = ruta_lookup(juego)
+    csv = os.path.join(BY_GAME_DIR, f"{juego}.csv")
+    try:
+        vigente = os.path.exists(ruta) and not (os.path.exists(csv) and os.path.getmtime(csv) > os.path.getmtime(ruta))
+        if vigente:
+            with np.load(ruta) as npz:
+                vigente = "minutos" in npz.files  # los .npz anteriores indexaban por etiqueta
+        if not vigente:
+            print(f"⚠️ Lookup de {juego} ausente o desactualizado, reconstruyendo (usa pandas).")
+            construir_lookup_npz(juego)
+        with np.load(ruta) as npz:
+            return {"minutos": {int(m): i for i, m in enumerate(npz["minutos"])}, "ancho": int(npz["ancho"]),
+                    "tabla": npz["tabla"], "glob": npz["glob"]}
+    except Exception as e:
+        print(f"⚠️ No se pudo preparar el lookup histórico ({e}). Se usarán NaNs para asistencia/ciclos.")
+        return None
+
+
+def valores_lookup(lookup, dow, month, minuto):
+    """Devuelve (asistencia_h, ciclos_h) esperados para dow (0=lunes), mes y minuto del día."""
+    if lookup is None:
+        return float("nan"), float("nan")
+    i = lookup["minutos"].get(minuto - minuto % lookup["ancho"])
+    a, c = lookup["glob"] if i is None else lookup["tabla"][dow, month - 1, i]
+    return float(a), float(c)
+
+
+# =========================
+# 2) CLIMA (WWO)
+# =========================
+def obtener_clima_wwo(api_key, fecha_dt, lugar="Petapa,Guatemala"):
+    """Clima del día con bloques por hora desde la tabla local (`scripts/clima.py`).
+
+    Si el día no está, se descarga (tp=24 + tp=3) y queda guardado para los
+    ciclos siguientes; el de hoy se vuelve a pedir pasados `CLIMA_TTL_HOY_SEG`
+    segundos. `lugar` se conserva por compatibilidad.
+    """
+    return clima_wwo.del_dia(api_key, fecha_dt)
+
+
+def leer_api_key():
+    """Lee CLIMATE_API_KEY del entorno y solo recurre a dotenv si no está definida."""
+    if "CLIMATE_API_KEY" not in os.environ:
+        from dotenv import load_dotenv
+        load_dotenv()
+    return os.getenv("CLIMATE_API_KEY")
+
+
+# =========================
+# 3) FILA Y PREDICCIÓN
+# =========================
+def construir_fila(now, clima, lookup, ancho_min=60):
+    """Fila de features del momento como dict plano (la usan también los scripts por juego).
+
+    `ancho_min` es el ancho de franja con el que se entrenó el modelo (`hora`).
+    Las features por hora del clima salen del bloque que contiene la franja y
+    `cielo` / `intensidad_lluvia` del texto de WWO (`scripts/cielo.py`);
+    `condiciones_cielo` se conserva para los bundles de los notebooks.
+    """
+    festivo = FERIADOS_GT.get(now.strftime("%m-%d"))
+    hora_hh = franjas.etiqueta_actual(now, ancho_min)
+    minuto = now.hour * 60 + now.minute
+    asistencia_h, ciclos_h = valores_lookup(lookup, now.weekday(), now.month, minuto)
+    return {
+        "day_of_week": now.strftime("%A"),
+        "hora": hora_hh,
+        "es_festivo": festivo is not None,
+        "condiciones_cielo": clima.get("condiciones_cielo"),
+        "nombre_festivo": festivo if festivo else "",
+        "month": now.month,
+        "day": now.day,
+        "temperatura_max": clima.get("temperatura_max"),
+        "temporada_alta": 0,
+        "prob_precipitacion": clima.get("prob_precipitacion"),
+        "asistencia_h": asistencia_h,
+        "ciclos_h": ciclos_h,
+        **cielo.de_clima(clima),
+        **clima_wwo.valores_hora(clima, minuto - minuto % ancho_min),
+    }
+
+
+def cargar_modelo(juego):
+    import joblib
+    return joblib.load(os.path.join(MODELS_DIR, f"{juego}.joblib"))
+
+
+# Cachés por bundle con clave débil en su pipeline: la entrada se va con el bundle
+# (un `id()` liberado se reutiliza y devolvería lo de otro modelo) y el bundle no
+# se modifica, así se puede volver a guardar con joblib tal cual.
+_VOCABULARIOS = weakref.WeakKeyDictionary()
+
+
+def _vocabularios(bundle):
+    """Vocabularios del bundle (None si es de strings), reconstruidos una sola vez por bundle."""
+    pipe = bundle["pipeline"]
+    if pipe not in _VOCABULARIOS:
+        _VOCABULARIOS[pipe] = vocabulario.desde_bundle(bundle)
+    return _VOCABULARIOS[pipe]
+
+
+def predecir_fila(bundle, fila):
+    """Predice una fila (dict) pasando arreglos de NumPy a cada transformador ya ajustado.
+
+    Evita armar un DataFrame: se recorre el ColumnTransformer del pipeline y se
+    alimenta cada transformador con sus columnas en el orden de entrenamiento.
+    """
+    return predecir_lote(bundle, [fila])[0]
+
+
+_COMPILADOS = weakref.WeakKeyDictionary()
+
+
+def _compilado(bundle):
+    """`compilado.ModeloCompilado` del bundle (None si no aplica), compilado una sola vez por bundle."""
+    pipe = bundle["pipeline"]
+    if pipe not in _COMPILADOS:
+        import compilado
+        _COMPILADOS[pipe] = compilado.compilar(bundle)
+    return _COMPILADOS[pipe]
+
+
+def predecir_lote(bundle, filas, compilado=True):
+    """Como `predecir_fila` pero para varias filas con un solo `predict` (p. ej. el modelo global).
+
+    Si el bundle es RandomForest con OneHot + imputer se usa la ruta compilada
+    (`scripts/compilado.py`, solo NumPy); `compilado=False` fuerza el pipeline.
+    """
+    import warnings
+    import numpy as np
+
+    modelo_c = _compilado(bundle) if compilado else None
+    if modelo_c is not None:
+        return [round(float(p), 2) for p in modelo_c.predecir(filas)]
+
+    pipe = bundle["pipeline"]
+    pre, modelo = pipe.steps[0][1], pipe.steps[-1][1]
+    vocabularios = _vocabularios(bundle)
+    if vocabularios is not None:
+        filas = [vocabulario.codificar_fila(f, vocabularios) for f in filas]
+    partes = []
+    with warnings.catch_warnings():
+        # Los transformadores se ajustaron con DataFrame; aquí reciben ndarray a propósito.
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        for _, trans, cols in pre.transformers_:
+            if trans == "drop":
+                continue
+            valores = [[f.get(c) for c in cols] for f in filas]
+            if trans == "passthrough":
+                partes.append(np.array(valores, dtype=float))
+                continue
+            cats = getattr(trans, "categories_", None)
+            if cats is not None and vocabularios is not None:
+                partes.append(vocabulario.one_hot(valores, vocabularios, cols))
+                continue
+            dtype = object if cats is not None else float
+            arr = np.array([[np.nan if v is None and dtype is float else v for v in fila] for fila in valores],
+                           dtype=dtype)
+            partes.append(np.asarray(trans.transform(arr), dtype=float))
+        X = np.hstack(partes)
+        return [round(float(p), 2) for p in modelo.predict(X)]
+
+
+def empujar(preds, ciclo=None):
+    """Manda {juego: pred} a PocketBase en una pasada, solo los que cambiaron (`scripts/empuje.py`)."""
+    from pb_helpers import set_time_by_name
+    from empuje import Empuje
+
+    empuje = Empuje(enviar=set_time_by_name)
+    for juego, pred in preds.items():
+        empuje.encolar(JUEGOS[juego].nombre_pb if juego in JUEGOS else juego, pred)
+    return empuje.enviar(ciclo)
+
+
+# =========================
+# 4) IMPORTTIME
+# =========================
+def resumir_importtime(stderr, top=10):
+    """Parsea la salida de `python -X importtime` -> (total_us, [(modulo, acumulado_us)])."""
+    filas = []
+    for linea in stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, modulo = linea.split("|")
+        filas.append((modulo[1:], int(acumulado)))
+    # Los módulos de primer nivel no llevan sangría: su suma es el costo total
+    raiz = [(m, us) for m, us in filas if not m.startswith(" ")]
+    total = sum(us for _, us in raiz)
+    return total, sorted(raiz, key=lambda x: -x[1])[:top]
+
+
+def medir_importtime(juego, argv):
+    """Compara el costo de imports del script clásico contra esta entrada rápida."""
+    clasico = IMPORTS_CLASICOS.format(ruta=os.path.join(MODELS_DIR, f"{juego}.joblib"))
+    casos = {
+        "clasico (imports + modelo de scripts/<juego>.py)": [sys.executable, "-X", "importtime", "-c", clasico],
+        "fast_predict (corrida completa)": [sys.executable, "-X", "importtime", os.path.abspath(__file__), *argv],
+    }
+    for nombre, cmd in casos.items():
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        total, top = resumir_importtime(proc.stderr)
+        print(f"\n== {nombre}: {total / 1000:.1f} ms en imports")
+        for modulo, us in top:
+            print(f"   {us / 1000:8.1f} ms  {modulo}")
+
+
+# =========================
+# 5) MAIN
+# =========================
+def main_global(no_push=False):
+    """Un ciclo para todos los juegos con `models/global.joblib` (data_analysis/entrenar.py --global)."""
+    ciclo = Ciclo("global")
+    with ciclo.span("imports"):
+        from zoneinfo import ZoneInfo
+        import numpy  # noqa: F401
+        from cache_predicciones import CachePredicciones, version_modelo
+    with ciclo.span("modelo"):
+        bundle = cargar_modelo("global")
+    juegos = bundle["juegos"]
+    with ciclo.span("lookup"):
+        lookups = {juego: cargar_lookup(juego) for juego in juegos}
+    now = datetime.now(ZoneInfo(TZ_NAME))
+    with ciclo.span("clima"):
+        clima = obtener_clima_wwo(leer_api_key(), now.date())
+
+    cache = CachePredicciones()
+    version = version_modelo(os.path.join(MODELS_DIR, "global.joblib"))
+    ancho = bundle.get("ancho_franja", 60)
+    filas = {j: {**construir_fila(now, clima, lookups[j], ancho), "juego": j, **atributos}
+             for j, atributos in juegos.items()}
+    with ciclo.span("cache"):
+        preds = {j: cache.obtener("global", version, fila) for j, fila in filas.items()}
+    faltan = [j for j, p in preds.items() if p is None]
+    if len(faltan) < len(preds):
+        ciclo.contar("cache_hit", len(preds) - len(faltan))
+    if faltan:
+        ciclo.contar("cache_miss", len(faltan))
+        with ciclo.span("prediccion"):
+            # Un solo predict de 25 filas: compilar el bosque global (millones de nodos) no se paga en una corrida
+            for j, pred in zip(faltan, predecir_lote(bundle, [filas[j] for j in faltan], compilado=False)):
+                preds[j] = pred
+                cache.guardar("global", version, filas[j], pred)
+
+    print({"timestamp": now.isoformat(), "predicciones": preds})
+
+    if not no_push:
+        with ciclo.span("push"):
+            empujar(preds, ciclo)
+
+    ciclo.emitir(predicciones=preds)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Predicción en vivo de un juego con arranque rápido.")
+    ap.add_argument("juego", nargs="?", help="Nombre del juego (como scripts/<juego>.py)")
+    ap.add_argument("--no-push", action="store_true", help="No actualizar PocketBase")
+    ap.add_argument("--construir-lookup", action="store_true",
+                    help="Precalcula data/by_game/lookup/<juego>.npz (todos los juegos si no se indica uno)")
+    ap.add_argument("--importtime", action="store_true", help="Compara `python -X importtime` contra el script clásico")
+    ap.add_argument("--global", dest="modelo_global", action="store_true",
+                    help="Predice todos los juegos con data_analysis/models/global.joblib")
+    args = ap.parse_args()
+
+    if args.modelo_global:
+        main_global(args.no_push)
+        return
+    if args.construir_lookup:
+        for juego in [args.juego] if args.juego else sorted(JUEGOS):
+            print("Lookup guardado en", construir_lookup_npz(juego))
+        return
+    if not args.juego:
+        ap.error("falta el juego")
+    if args.importtime:
+        medir_importtime(args.juego, [a for a in sys.argv[1:] if a != "--importtime"])
+        return
+
+    ciclo = Ciclo(args.juego)
+    with ciclo.span("imports"):
+        from zoneinfo import ZoneInfo
+        import numpy  # noqa: F401  (se cuenta aquí y no dentro de la carga del modelo)
+        from cache_predicciones import CachePredicciones, version_modelo
+    with ciclo.span("lookup"):
+        lookup = cargar_lookup(args.juego)
+    now = datetime.now(ZoneInfo(TZ_NAME))
+    with ciclo.span("clima"):
+        clima = obtener_clima_wwo(leer_api_key(), now.date())
+
+    # Con la misma fila y el mismo .joblib no hace falta ni cargar el modelo
+    cache = CachePredicciones()
+    version = version_modelo(os.path.join(MODELS_DIR, f"{args.juego}.joblib"))
+    fila = construir_fila(now, clima, lookup, lookup["ancho"] if lookup else 60)
+    with ciclo.span("cache"):
+        pred = cache.obtener(args.juego, version, fila)
+    if pred is not None:
+        ciclo.contar("cache_hit")
+    else:
+        ciclo.contar("cache_miss")
+        with ciclo.span("modelo"):
+            bundle = cargar_modelo(args.juego)
+        with ciclo.span("prediccion"):
+            ancho = bundle.get("ancho_franja", 60)
+            entrada = fila if lookup and ancho == lookup["ancho"] else construir_fila(now, clima, lookup, ancho)
+            pred = predecir_fila(bundle, entrada)
+        cache.guardar(args.juego, version, fila, pred)
+
+    print({"timestamp": now.isoformat(), "input_row": fila, "prediccion": pred})
+
+    if not args.no_push:
+        with ciclo.span("push"):
+            empujar({args.juego: pred}, ciclo)
+
+    ciclo.emitir(prediccion=pred)
+
+
+if __name__ == "__main__":
+    main()
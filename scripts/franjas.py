@@ -0,0 +1,72 @@
+"""Franjas de tiempo del reporte (por hora o más finas, p. ej. 15 minutos).
+
+Cada franja se identifica con un entero: el minuto del día en que empieza
+(9:00 -> 540, 9:15 -> 555). Las columnas de los CSV y la feature `hora` siguen
+usando la etiqueta "H:MM" ("9:00", "9:15", ...), así que los datos por hora que
+ya existen no cambian; el código entero es lo que se usa para ordenar, indexar
+arreglos y guardar formatos largos sin cargar strings.
+
+El ancho por defecto sale de la variable de entorno FRANJA_MIN (60 si no está).
+"""
+import os
+import re
+
+ANCHO_MIN = int(os.getenv("FRANJA_MIN", "60"))
+APERTURA_MIN = 9 * 60  # los reportes empiezan a las 9:00
+
+_ETIQUETA_RE = re.compile(r"^(\d{1,2}):(\d{2})(?:\s|$)")
+_COLUMNA_RE = re.compile(r"^(\d{1,2}:\d{2})\s+(ciclos|asistencia)$")
+
+
+def minuto(etiqueta):
+    """'9:15', '09:15' o '9:15 ciclos' -> 555. Devuelve None si no es una franja."""
+    m = _ETIQUETA_RE.match(str(etiqueta))
+    return int(m.group(1)) * 60 + int(m.group(2)) if m else None
+
+
+def etiqueta(minuto_dia):
+    """555 -> '9:15' (sin cero a la izquierda, como las columnas de los CSV)."""
+    return f"{minuto_dia // 60}:{minuto_dia % 60:02d}"
+
+
+def etiquetas(n, ancho=ANCHO_MIN, inicio=APERTURA_MIN):
+    """Las `n` etiquetas consecutivas desde `inicio` (9:00, 9:15, ... con ancho=15)."""
+    return [etiqueta(inicio + i * ancho) for i in range(n)]
+
+
+def franja_de(momento, ancho=ANCHO_MIN):
+    """Minuto del día en que empieza la franja que contiene `momento` (datetime)."""
+    m = momento.hour * 60 + momento.minute
+    return m - m % ancho
+
+
+def etiqueta_actual(momento, ancho=ANCHO_MIN):
+    """Valor de la feature `hora` para la predicción en vivo.
+
+    Con franjas de 60 min se conserva `%H:00` ("09:00"), que es lo que los
+    scripts por juego le han pasado siempre a los modelos actuales.
+    """
+    if ancho == 60:
+        return momento.strftime("%H:00")
+    return etiqueta(franja_de(momento, ancho))
+
+
+def detectar(columnas):
+    """Franjas con columnas `<H:MM> ciclos` y `<H:MM> asistencia`, ordenadas por minuto.
+
+    Returns:
+        list: Tuplas `(minuto, etiqueta, col_ciclos, col_asistencia)`.
+    """
+    vistas = {}
+    for c in columnas:
+        m = _COLUMNA_RE.match(str(c))
+        if m:
+            vistas.setdefault(m.group(1), set()).add(m.group(2))
+    return sorted((minuto(h), h, f"{h} ciclos", f"{h} asistencia")
+                  for h, tipos in vistas.items() if tipos == {"ciclos", "asistencia"})
+
+
+def ancho_de(minutos, defecto=ANCHO_MIN):
+    """Ancho de franja (min) inferido como el menor salto entre franjas consecutivas."""
+    saltos = [b - a for a, b in zip(minutos, minutos[1:]) if b > a]
+    return min(saltos) if saltos else defecto
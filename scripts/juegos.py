@@ -0,0 +1,182 @@
+"""Registro único de los 25 juegos.
+
+Antes cada etapa tenía su tabla con sus propios nombres: capacidades en
+`betas.py` ("Dragon", "Samba Balloon") y en `by_game.py` ("Dragón",
+"Samba Ballon", "Brinkanguro"), betas y esperas máximas solo en `by_game.py`
+(con "Brincanguro", "Bici Magica", "Samba Balloon", que no coincidían con sus
+claves y caían al beta por defecto), nombres de PocketBase en `fast_predict.py`
+y en cada `scripts/<juego>.py`. Un nombre distinto sacaba al juego en silencio
+(`isin(caps)` en betas dejaba fuera "Sol De Mi Barrio").
+
+Aquí hay un registro por juego con su id (el nombre de archivo:
+`data/by_game/<id>.csv`, `scripts/<id>.py`, `models/<id>.joblib`), el nombre
+en los reportes / `all_data.csv`, el nombre en PocketBase (`games.json`),
+capacidad por ciclo, beta y espera máxima. `buscar(nombre)` resuelve
+cualquiera de esos nombres (o un alias) en O(1) sobre una clave normalizada
+(sin tildes, minúsculas, espacios simples).
+
+Para los reportes crudos, `IndiceNombres` agrega tolerancia a errores de
+escritura y mojibake ("Mec·nico", "Rat·n Loroco") con RapidFuzz sobre las
+mismas claves normalizadas, y memoriza cada nombre ya resuelto.
+
+Uso:
+    python scripts/juegos.py            # tabla y verificación contra games.json y data/by_game
+    python scripts/juegos.py "Rat·n Loroco" "Brinkanguro"   # cómo se resuelve cada nombre
+"""
+import re
+import unicodedata
+from typing import NamedTuple
+
+BETA_DEFECTO = 0.80
+
+
+class Juego(NamedTuple):
+    id: str              # nombre de archivo (data/by_game, scripts, models)
+    nombre_datos: str    # como aparece en los reportes y en all_data.csv
+    nombre_pb: str       # registro en PocketBase / games.json
+    capacidad: int       # personas por ciclo
+    beta: float          # fracción de la capacidad que se llena en la práctica
+    max_espera: int      # tope de Wq (min) para saturado / fuera de servicio
+    alias: tuple = ()    # otras grafías vistas en reportes, notebooks o tablas viejas
+
+
+# Sol de Mi Barrio y Revoloteo no tienen beta estimado: usan BETA_DEFECTO
+JUEGOS = {j.id: j for j in [
+    Juego("ballon_wheel", "Balloon Wheel", "Ballon Wheel", 24, 0.73, 60),
+    Juego("samba_ballon", "Samba Balloon", "Samba Ballon", 32, 0.511, 60),
+    Juego("loco_bus", "Loco Bus", "Loco Bus", 24, 0.716, 60),
+    Juego("dragon", "Dragon", "Dragón", 20, 0.995, 60),
+    Juego("comanche", "Comanche", "Comanche", 24, 0.98, 90),
+    Juego("raton_loroco", "Ratón Loroco", "Ratón Loroco", 4, 0.937, 90),
+    Juego("remolino", "Remolino", "Remolino", 6, 0.944, 90),
+    Juego("rascacielos", "Rascacielos", "Rascacielos", 18, 1.00, 90),
+    Juego("tronco_splash", "Tronco Splash", "Tronco Splash", 4, 0.764, 90),
+    Juego("bumperazo", "Bumperazo", "Bumperazo", 60, 0.44, 60),
+    Juego("brincanguro", "Brincanguro", "Brinkanguro", 24, 0.98, 60),
+    Juego("moto_bala", "Moto Bala", "Moto Bala", 12, 1.00, 90),
+    Juego("convoy", "Convoy", "Convoy", 20, 0.51, 60),
+    Juego("bumpercitos", "Bumpercitos", "Bumpercitos", 28, 0.49, 60),
+    Juego("bici_magica", "Bici Magica", "Bici Mágica", 12, 0.94, 60),
+    Juego("polo_norte", "Polo Norte", "Polo Norte", 12, 0.6, 60),
+    Juego("sol_de_mi_barrio", "Sol De Mi Barrio", "Sol de Mi Barrio", 108, BETA_DEFECTO, 90),
+    Juego("tifon", "Tifón", "Tifón", 16, 0.95, 90),
+    Juego("carrusel", "Carrusel", "Carrusel", 52, 0.53, 60),
+    Juego("trencito", "Trencito", "Trencito", 74, 0.536, 90),
+    Juego("el_revoloteo", "El Revoloteo", "Revoloteo", 24, BETA_DEFECTO, 60),
+    Juego("guerra_pirata", "Guerra Pirata", "Guerra Pirata", 24, 0.901, 60),
+    Juego("faro_saltarin", "Faro Saltarín", "Faro Saltarín", 16, 0.806, 60),
+    Juego("el_relampago", "El Relámpago", "Relámpago", 9, 0.992, 90, ("relampago",)),
+    Juego("casichoco", "Casichoco", "Casichoco", 40, 0.61, 60),
+]}
+
+
+def normalizar(nombre):
+    """Clave de búsqueda: sin tildes, minúsculas, `_`/puntuación como espacio, espacios simples."""
+    s = unicodedata.normalize("NFKD", str(nombre)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", s.lower()).split())
+
+
+def _indice():
+    indice = {}
+    for j in JUEGOS.values():
+        for nombre in (j.id, j.nombre_datos, j.nombre_pb, *j.alias):
+            previo = indice.setdefault(normalizar(nombre), j)
+            if previo is not j:
+                raise ValueError(f"'{nombre}' apunta a {previo.id} y a {j.id}")
+    return indice
+
+
+POR_NOMBRE = _indice()
+
+
+def buscar(nombre):
+    """`Juego` para cualquier nombre conocido (id, reporte, PocketBase, alias) o None."""
+    return POR_NOMBRE.get(normalizar(nombre))
+
+
+def juego(nombre):
+    """Como `buscar`, pero un nombre desconocido es un error."""
+    j = buscar(nombre)
+    if j is None:
+        raise KeyError(f"Juego desconocido: {nombre!r}")
+    return j
+
+
+def beta(nombre):
+    """Beta del juego (BETA_DEFECTO si el nombre no está en el registro)."""
+    j = buscar(nombre)
+    return j.beta if j is not None else BETA_DEFECTO
+
+
+# =========================
+# ÍNDICE PARA REPORTES CRUDOS
+# =========================
+EXCLUIDO = "excluido"
+UMBRAL_FUZZY = 87  # "Aros Saltarines" vs "Faro Saltarín" da 85.7
+
+
+class IndiceNombres:
+    """Nombre crudo de un reporte -> id del registro, `EXCLUIDO` o None (sin resolver).
+
+    Primero la clave normalizada exacta; si no está, el candidato más parecido
+    con `rapidfuzz.fuzz.ratio` si supera `umbral`. `excluir` son nombres que se
+    reconocen pero no se procesan (juegos retirados, encabezados, totales).
+    Cada nombre distinto se resuelve una sola vez; los que no se resolvieron
+    quedan en `sin_resolver` (nombre -> filas) para reportarlos.
+    """
+
+    def __init__(self, excluir=(), umbral=UMBRAL_FUZZY):
+        self.claves = {clave: j.id for clave, j in POR_NOMBRE.items()}
+        for nombre in excluir:
+            self.claves.setdefault(normalizar(nombre), EXCLUIDO)
+        self.umbral = umbral
+        self._memo = {}
+        self.sin_resolver = {}
+
+    def resolver(self, nombre):
+        if nombre in self._memo:
+            return self._memo[nombre]
+        clave = normalizar(nombre)
+        resultado = self.claves.get(clave)
+        if resultado is None and clave:
+            from rapidfuzz import fuzz, process
+
+            mejor = process.extractOne(clave, self.claves.keys(), scorer=fuzz.ratio, score_cutoff=self.umbral)
+            resultado = self.claves[mejor[0]] if mejor else None
+        self._memo[nombre] = resultado
+        return resultado
+
+    def resolver_serie(self, serie):
+        """Serie de ids (o `EXCLUIDO` / None) alineada con `serie`; un `resolver` por valor distinto."""
+        texto = serie.astype(str).str.strip()
+        ids = texto.map({n: self.resolver(n) for n in texto.unique()})
+        for nombre, n in texto[ids.isna() & serie.notna()].value_counts().items():
+            self.sin_resolver[nombre] = self.sin_resolver.get(nombre, 0) + int(n)
+        return ids
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    from pathlib import Path
+
+    raiz = Path(__file__).resolve().parents[1]
+    if sys.argv[1:]:
+        indice = IndiceNombres()
+        for nombre in sys.argv[1:]:
+            print(f"{nombre!r} -> {indice.resolver(nombre)}")
+        sys.exit(0)
+    print(f"{'id':<18}{'reportes':<18}{'PocketBase':<18}{'cap':>5}{'beta':>7}{'max':>5}")
+    for j in JUEGOS.values():
+        print(f"{j.id:<18}{j.nombre_datos:<18}{j.nombre_pb:<18}{j.capacidad:>5}{j.beta:>7}{j.max_espera:>5}")
+
+    problemas = []
+    pb = {g["name"] for g in json.loads((raiz / "games.json").read_text(encoding="utf-8"))}
+    problemas += [f"{j.id}: '{j.nombre_pb}' no está en games.json" for j in JUEGOS.values() if j.nombre_pb not in pb]
+    problemas += [f"games.json: '{n}' no está en el registro" for n in sorted(pb) if buscar(n) is None]
+    problemas += [f"{j.id}: falta data/by_game/{j.id}.csv" for j in JUEGOS.values()
+                  if not (raiz / "data" / "by_game" / f"{j.id}.csv").exists()]
+    for p in problemas:
+        print("❌", p)
+    if not problemas:
+        print(f"✅ {len(JUEGOS)} juegos consistentes con games.json y data/by_game")
@@ -0,0 +1,131 @@
+"""Tiempos y contadores para el ciclo de predicción en vivo.
+
+Cada corrida de `scripts/<juego>.py` crea un `Ciclo`, envuelve sus etapas con
+`ciclo.span("etapa")` y al final llama `ciclo.emitir()`, que escribe una línea
+JSON por ciclo:
+
+    {"ts": "...", "juego": "dragon", "spans_ms": {"modelo": 812.4, ...},
+     "contadores": {"push_ok": 1}, "prediccion": 7.67}
+
+Destino de las líneas: `METRICAS_JSONL=<ruta>` las agrega a un archivo; sin la
+variable se imprimen en stdout. Para Prometheus (`prometheus_client`, opcional):
+`METRICAS_PROM_TEXTFILE=<ruta_{juego}.prom>` deja el formato texto para el
+textfile collector (sirve con cron; `{juego}` da un archivo por juego) y
+`exponer_prometheus(puerto)` levanta el endpoint `/metrics` en procesos de
+larga vida.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+_PROM = {}
+
+
+class Ciclo:
+    """Acumula spans (ms) y contadores de un ciclo de predicción."""
+
+    def __init__(self, juego):
+        self.juego = juego
+        self.spans = {}
+        self.contadores = {}
+        self.t0 = time.perf_counter()
+
+    @contextmanager
+    def span(self, etapa):
+        """Mide el bloque; si lanza excepción cuenta `<etapa>_error` y la re-lanza."""
+        t = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.contar(f"{etapa}_error")
+            raise
+        finally:
+            ms = (time.perf_counter() - t) * 1000
+            self.spans[etapa] = self.spans.get(etapa, 0.0) + ms
+            _observar_prometheus(self.juego, etapa, ms / 1000)
+
+    def contar(self, evento, n=1):
+        self.contadores[evento] = self.contadores.get(evento, 0) + n
+        if _PROM:
+            _PROM["eventos"].labels(self.juego, evento).inc(n)
+
+    def registro(self, **extra):
+        """Dict del ciclo listo para serializar."""
+        return {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "juego": self.juego,
+            "total_ms": round((time.perf_counter() - self.t0) * 1000, 2),
+            "spans_ms": {k: round(v, 2) for k, v in self.spans.items()},
+            "contadores": dict(self.contadores),
+            **extra,
+        }
+
+    def emitir(self, **extra):
+        """Escribe la línea JSON del ciclo (y el textfile de Prometheus si está configurado)."""
+        linea = json.dumps(self.registro(**extra), ensure_ascii=False, default=str)
+        ruta = os.getenv("METRICAS_JSONL")
+        if ruta:
+            os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+            with open(ruta, "a", encoding="utf-8") as f:
+                f.write(linea + "\n")
+        else:
+            print(linea)
+
+        textfile = os.getenv("METRICAS_PROM_TEXTFILE")
+        if textfile:
+            _escribir_textfile(textfile.format(juego=self.juego))
+        return linea
+
+
+# =========================
+# PROMETHEUS (opcional)
+# =========================
+def _registrar_prometheus():
+    """Crea las métricas una sola vez; devuelve False si prometheus_client no está instalado."""
+    if _PROM:
+        return True
+    try:
+        from prometheus_client import CollectorRegistry, Counter, Histogram
+    except ImportError:
+        return False
+    registry = CollectorRegistry()
+    _PROM["registry"] = registry
+    _PROM["etapas"] = Histogram(
+        "petapa_etapa_segundos", "Duración de cada etapa del ciclo de predicción",
+        ["juego", "etapa"], registry=registry,
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 15),
+    )
+    _PROM["eventos"] = Counter(
+        "petapa_eventos", "Eventos del ciclo de predicción (push_ok, clima_error, ...)",
+        ["juego", "evento"], registry=registry,
+    )
+    return True
+
+
+def _observar_prometheus(juego, etapa, segundos):
+    if _PROM:
+        _PROM["etapas"].labels(juego, etapa).observe(segundos)
+
+
+def _escribir_textfile(ruta):
+    if not _registrar_prometheus():
+        print("⚠️ prometheus_client no está instalado; no se escribe", ruta)
+        return
+    from prometheus_client import write_to_textfile
+    write_to_textfile(ruta, _PROM["registry"])
+
+
+def exponer_prometheus(puerto=9108):
+    """Levanta `/metrics` en segundo plano (para procesos que no terminan tras un ciclo)."""
+    if not _registrar_prometheus():
+        print("⚠️ prometheus_client no está instalado; endpoint deshabilitado.")
+        return False
+    from prometheus_client import start_http_server
+    start_http_server(puerto, registry=_PROM["registry"])
+    return True
+
+
+if os.getenv("METRICAS_PROM_TEXTFILE"):
+    _registrar_prometheus()
@@ -0,0 +1,181 @@
+"""Precálculo diario de las esperas de todos los juegos.
+
+Todas las features de la fila en vivo (día, hora, feriado, clima del día, mes,
+promedios del lookup) se conocen desde la mañana, así que las predicciones del
+día completo se pueden calcular de una vez: una corrida por la mañana consulta
+el clima, arma las filas de las 10 franjas de cada juego y predice cada juego
+con un solo `predict`. La tabla queda en `data/cache/precalculo/<fecha>.json`.
+
+Durante el día `--push` solo lee la fila de la franja actual y la manda a
+PocketBase (solo los juegos que cambiaron, ver `scripts/empuje.py`): el
+costo por ciclo es leer un JSON más la llamada de red. Si la
+tabla del día no existe se calcula en ese momento; con `--verificar-clima` se
+vuelve a consultar el clima y, si cambió, se recalcula antes de empujar.
+
+Uso (cron):
+    python scripts/precalcular.py                         # 8:30, antes de abrir
+    python scripts/precalcular.py --push                  # cada 15 min, de 9:00 a 19:00
+    python scripts/precalcular.py --push --verificar-clima
+    python scripts/precalcular.py --global                # con models/global.joblib
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+
+import fast_predict
+import franjas
+from metricas import Ciclo
+
+SALIDA_DIR = "data/cache/precalculo"
+HORAS = 10
+
+
+def ruta_tabla(fecha, salida_dir=SALIDA_DIR):
+    return os.path.join(salida_dir, f"{fecha.isoformat()}.json")
+
+
+def momentos_del_dia(fecha, tz, ancho=60, horas=HORAS):
+    """Inicio de cada franja desde la apertura (9:00) durante `horas` horas."""
+    apertura = datetime(fecha.year, fecha.month, fecha.day, tzinfo=tz) + timedelta(minutes=franjas.APERTURA_MIN)
+    return [apertura + timedelta(minutes=m) for m in range(0, horas * 60, ancho)]
+
+
+# =========================
+# 1) PRECÁLCULO
+# =========================
+def precalcular(fecha, tz, clima, juegos=None, horas=HORAS, ciclo=None, modelo_global=False):
+    """{juego: {"9:00": pred, ...}} para todas las franjas del día.
+
+    Por juego: carga el bundle, arma una fila por franja y hace un solo
+    `predict`. Con `modelo_global` son todas las filas en un solo `predict`.
+    """
+    juegos = juegos or sorted(fast_predict.JUEGOS)
+    ciclo = ciclo or Ciclo("precalculo")
+    tabla = {}
+    if modelo_global:
+        with ciclo.span("modelo"):
+            bundle = fast_predict.cargar_modelo("global")
+        ancho = bundle.get("ancho_franja", 60)
+        momentos = momentos_del_dia(fecha, tz, ancho, horas)
+        filas, claves = [], []
+        for juego, atributos in bundle["juegos"].items():
+            lookup = fast_predict.cargar_lookup(juego)
+            for m in momentos:
+                filas.append({**fast_predict.construir_fila(m, clima, lookup, ancho), "juego": juego, **atributos})
+                claves.append((juego, franjas.etiqueta(franjas.franja_de(m, ancho))))
+        with ciclo.span("prediccion"):
+            for (juego, etiqueta), pred in zip(claves, fast_predict.predecir_lote(bundle, filas)):
+                tabla.setdefault(juego, {})[etiqueta] = pred
+        return tabla
+
+    for juego in juegos:
+        try:
+            with ciclo.span("modelo"):
+                bundle = fast_predict.cargar_modelo(juego)
+            ancho = bundle.get("ancho_franja", 60)
+            with ciclo.span("lookup"):
+                lookup = fast_predict.cargar_lookup(juego)
+            momentos = momentos_del_dia(fecha, tz, ancho, horas)
+            with ciclo.span("prediccion"):
+                filas = [fast_predict.construir_fila(m, clima, lookup, ancho) for m in momentos]
+                preds = fast_predict.predecir_lote(bundle, filas)
+            tabla[juego] = {franjas.etiqueta(franjas.franja_de(m, ancho)): p for m, p in zip(momentos, preds)}
+        except Exception as e:
+            ciclo.contar("juego_error")
+            print(f"❌ [{juego}] No se pudo precalcular: {e}")
+    return tabla
+
+
+def guardar_tabla(fecha, clima, tabla, salida_dir=SALIDA_DIR, modelo_global=False):
+    os.makedirs(salida_dir, exist_ok=True)
+    ruta = ruta_tabla(fecha, salida_dir)
+    datos = {
+        "fecha": fecha.isoformat(),
+        "generado": datetime.now().isoformat(timespec="seconds"),
+        "modelo": "global" if modelo_global else "por_juego",
+        "clima": clima,
+        "predicciones": tabla,
+    }
+    tmp = ruta + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, ruta)  # el push nunca lee una tabla a medias
+    return ruta
+
+
+def leer_tabla(fecha, salida_dir=SALIDA_DIR):
+    try:
+        with open(ruta_tabla(fecha, salida_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+# =========================
+# 2) PUSH INTRADÍA
+# =========================
+def valores_actuales(datos, now):
+    """{juego: pred} de la franja que contiene `now` (None por juego si está fuera del horario)."""
+    actuales = {}
+    for juego, por_franja in datos["predicciones"].items():
+        minutos = sorted(franjas.minuto(e) for e in por_franja)
+        ancho = franjas.ancho_de(minutos, 60)
+        actuales[juego] = por_franja.get(franjas.etiqueta(franjas.franja_de(now, ancho)))
+    return actuales
+
+
+def empujar_actuales(actuales, ciclo):
+    fuera = sum(pred is None for pred in actuales.values())
+    if fuera:
+        ciclo.contar("fuera_de_horario", fuera)
+    with ciclo.span("push"):
+        fast_predict.empujar({j: p for j, p in actuales.items() if p is not None}, ciclo)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Precalcula las esperas del día y las empuja por franja.")
+    ap.add_argument("juegos", nargs="*", help="Solo estos juegos (por defecto, los 25)")
+    ap.add_argument("--push", action="store_true", help="Empuja la franja actual desde la tabla del día")
+    ap.add_argument("--no-push", action="store_true", help="Con --push: solo imprime los valores")
+    ap.add_argument("--verificar-clima", action="store_true", help="Con --push: recalcula si cambió el clima")
+    ap.add_argument("--global", dest="modelo_global", action="store_true", help="Usa data_analysis/models/global.joblib")
+    ap.add_argument("--horas", type=int, default=HORAS, help="Horas desde la apertura (9:00)")
+    ap.add_argument("--salida", default=SALIDA_DIR)
+    args = ap.parse_args()
+
+    from zoneinfo import ZoneInfo
+
+    tz = ZoneInfo(fast_predict.TZ_NAME)
+    now = datetime.now(tz)
+    ciclo = Ciclo("precalculo")
+
+    datos = leer_tabla(now.date(), args.salida) if args.push else None
+    clima = None
+    if datos is None or args.verificar_clima:
+        with ciclo.span("clima"):
+            clima = fast_predict.obtener_clima_wwo(fast_predict.leer_api_key(), now.date())
+    if datos is not None and clima is not None and clima != datos["clima"]:
+        print("⚠️ El clima cambió desde el precálculo; recalculando.")
+        ciclo.contar("clima_cambio")
+        datos = None
+    if datos is None:
+        tabla = precalcular(now.date(), tz, clima, args.juegos, args.horas, ciclo, args.modelo_global)
+        ruta = guardar_tabla(now.date(), clima, tabla, args.salida, args.modelo_global)
+        ciclo.contar("precalculo")
+        print(f"✅ {len(tabla)} juegos × {args.horas} h precalculados -> {ruta}")
+        datos = leer_tabla(now.date(), args.salida)
+
+    if args.push:
+        with ciclo.span("lectura"):
+            actuales = valores_actuales(datos, now)
+            if args.juegos:
+                actuales = {j: actuales.get(j) for j in args.juegos}
+        print({"timestamp": now.isoformat(), "predicciones": actuales})
+        if not args.no_push:
+            empujar_actuales(actuales, ciclo)
+    ciclo.emitir()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Servicio HTTP local de predicciones (FastAPI + uvicorn), sin push a PocketBase.
+
+Al arrancar carga en memoria los bundles de los 25 juegos (compilados con
+`scripts/compilado.py` cuando son RandomForest, y juntos en un
+`compilado.BosqueConjunto` para los requests de varios juegos), sus lookups
+y un cache de clima por fecha; cada request solo arma filas y predice.
+Endpoints:
+
+    GET  /salud                                   juegos cargados
+    GET  /ahora                                   todos los juegos en la franja actual
+    GET  /juegos/{juego}?fecha=2025-03-08&desde=9&hasta=18
+                                                  un juego, una fecha, franjas H1..H2
+    POST /que-pasa-si                             mismo cálculo con clima a elección
+         {"clima": {"condiciones_cielo": "Heavy rain", "temperatura_max": 19},
+          "fecha": "2025-03-08", "hora": 15, "juegos": ["dragon"]}
+
+`/ahora` guarda el resultado de la franja (y clima) vigente, así que las
+siguientes llamadas en la misma franja no vuelven a predecir.
+
+Uso:
+    python scripts/servicio.py --puerto 8000
+    python benchmarks/carga.py --url http://127.0.0.1:8000     # p50/p99 y req/s
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from fastapi import Body, FastAPI, HTTPException, Query
+
+import compilado
+import fast_predict
+import franjas
+
+TZ = ZoneInfo(fast_predict.TZ_NAME)
+CLIMA_TTL_SEG = 3600
+
+
+class Estado:
+    """Modelos, lookups y clima en memoria para todo el proceso."""
+
+    def __init__(self, juegos=None):
+        self.bundles, self.lookups = {}, {}
+        for juego in juegos or sorted(fast_predict.JUEGOS):
+            ruta = os.path.join(fast_predict.MODELS_DIR, f"{juego}.joblib")
+            if not os.path.exists(ruta):
+                print(f"⚠️ [{juego}] Sin modelo en {ruta}; no se sirve.")
+                continue
+            bundle = fast_predict.cargar_modelo(juego)
+            fast_predict.predecir_lote(bundle, [])  # compila una vez (si aplica) fuera de los requests
+            self.bundles[juego] = bundle
+            self.lookups[juego] = fast_predict.cargar_lookup(juego)
+        # Los juegos compilables se recorren juntos cuando un request pide varios
+        compilados = {j: c for j, b in self.bundles.items() if (c := fast_predict._compilado(b)) is not None}
+        self.conjunto = compilado.BosqueConjunto(compilados) if len(compilados) > 1 else None
+        self.api_key = fast_predict.leer_api_key()
+        self._clima = {}
+        self._ahora = {}
+
+    def clima(self, fecha):
+        """Clima del día desde WWO, guardado `CLIMA_TTL_SEG` segundos por fecha."""
+        guardado = self._clima.get(fecha)
+        if guardado is None or time.monotonic() - guardado[0] > CLIMA_TTL_SEG:
+            guardado = (time.monotonic(), fast_predict.obtener_clima_wwo(self.api_key, fecha))
+            self._clima[fecha] = guardado
+        return guardado[1]
+
+    def filas(self, juego, momentos, clima):
+        ancho = self.bundles[juego].get("ancho_franja", 60)
+        return [fast_predict.construir_fila(m, clima, self.lookups[juego], ancho) for m in momentos]
+
+    def predecir(self, juegos, momentos, clima):
+        """{juego: {etiqueta_franja: pred}} con todas las franjas de cada juego en un solo `predict`.
+
+        Con más de un juego, los compilados van en una sola pasada de
+        `BosqueConjunto` (se calculan todos y se devuelven los pedidos).
+        """
+        preds = {}
+        if self.conjunto is not None and len(juegos) > 1:
+            todos = self.conjunto.predecir({j: self.filas(j, momentos, clima) for j in self.conjunto.compilados})
+            preds = {j: [round(float(p), 2) for p in todos[j]] for j in juegos if j in todos}
+        for juego in juegos:
+            if juego not in preds:
+                preds[juego] = fast_predict.predecir_lote(self.bundles[juego], self.filas(juego, momentos, clima))
+        salida = {}
+        for juego in juegos:
+            ancho = self.bundles[juego].get("ancho_franja", 60)
+            salida[juego] = {franjas.etiqueta(franjas.franja_de(m, ancho)): p for m, p in zip(momentos, preds[juego])}
+        return salida
+
+    def juegos_validos(self, juegos):
+        if not juegos:
+            return list(self.bundles)
+        faltan = [j for j in juegos if j not in self.bundles]
+        if faltan:
+            raise HTTPException(404, f"Juegos sin modelo: {', '.join(faltan)}")
+        return juegos
+
+
+def momentos(fecha, desde, hasta, ancho=60):
+    """Inicio de cada franja entre las horas `desde` y `hasta` (incluida) de `fecha`."""
+    if not 0 <= desde <= hasta <= 23:
+        raise HTTPException(422, "Se espera 0 <= desde <= hasta <= 23")
+    inicio = datetime(fecha.year, fecha.month, fecha.day, desde, tzinfo=TZ)
+    return [inicio + timedelta(minutes=m) for m in range(0, (hasta - desde + 1) * 60, ancho)]
+
+
+def crear_app(juegos=None):
+    app = FastAPI(title="Petapa On Track - predicciones")
+    estado = Estado(juegos)
+    app.state.estado = estado
+
+    @app.get("/salud")
+    def salud():
+        return {"juegos": list(estado.bundles), "climas_en_cache": len(estado._clima)}
+
+    @app.get("/ahora")
+    def ahora():
+        now = datetime.now(TZ)
+        clima = estado.clima(now.date())
+        clave = (now.date(), franjas.franja_de(now, 15), json.dumps(clima, sort_keys=True))
+        if clave not in estado._ahora:
+            estado._ahora = {clave: {j: next(iter(p.values()))
+                                     for j, p in estado.predecir(estado.bundles, [now], clima).items()}}
+        return {"timestamp": now.isoformat(), "predicciones": estado._ahora[clave]}
+
+    @app.get("/juegos/{juego}")
+    def por_juego(juego: str, fecha: date = Query(None), desde: int = 9, hasta: int = 18):
+        estado.juegos_validos([juego])
+        fecha = fecha or datetime.now(TZ).date()
+        ancho = estado.bundles[juego].get("ancho_franja", 60)
+        preds = estado.predecir([juego], momentos(fecha, desde, hasta, ancho), estado.clima(fecha))
+        return {"juego": juego, "fecha": fecha.isoformat(), "predicciones": preds[juego]}
+
+    @app.post("/que-pasa-si")
+    def que_pasa_si(clima: dict = Body(..., embed=True), fecha: date = Body(None, embed=True),
+                    hora: int = Body(None, embed=True), juegos: list[str] = Body(None, embed=True)):
+        juegos = estado.juegos_validos(juegos)
+        now = datetime.now(TZ)
+        fecha = fecha or now.date()
+        desde, hasta = (hora, hora) if hora is not None else (9, 18)
+        base = estado.clima(fecha) if fecha <= now.date() else dict(fast_predict.CLIMA_VACIO)
+        escenario = {**base, **clima}
+        preds = estado.predecir(juegos, momentos(fecha, desde, hasta), escenario)
+        return {"fecha": fecha.isoformat(), "clima": escenario, "predicciones": preds}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    ap = argparse.ArgumentParser(description="Servicio HTTP local de predicciones.")
+    ap.add_argument("juegos", nargs="*", help="Solo estos juegos (por defecto, los que tengan modelo)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--puerto", type=int, default=8000)
+    args = ap.parse_args()
+    uvicorn.run(crear_app(args.juegos), host=args.host, port=args.puerto, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Validación de los CSV limpios y de all_data.csv.
+
+`reader.py` renombra las columnas por posición: si un reporte trae una hora
+de más o de menos, las franjas quedan corridas sin ningún error. Aquí cada
+tabla pasa por chequeos vectorizados (NumPy sobre la matriz juego x franja):
+
+- negativos:   ciclos o asistencia < 0
+- capacidad:   asistencia > ciclos x capacidad x TOLERANCIA_CAPACIDAD
+               (capacidad del registro, scripts/juegos.py)
+- totales:     `ciclos total` / `asistencia total` distintos de la suma de franjas
+- fecha:       `fecha` (o `date`) distinta de la fecha del nombre de archivo
+               (`ddmmyyyy_limpio.csv`, o `source_file` en all_data)
+- franjas:     cantidad o etiquetas de franjas distintas de las del reporte
+               (HORAS_REPORTE horas desde las 9:00)
+- juego:       nombres que no están en el registro
+
+El resultado es `{chequeo: filas con problema}` (solo los que fallan). Un
+archivo con cualquier problema se puede mover a `cuarentena/` (junto a
+`limpio/`) con un `.json` del reporte; `reader.py` lo hace al escribir y
+`prep_data.py` solo consolida lo que quedó en `limpio/`.
+
+Uso:
+    python scripts/validar.py                       # todos los limpios + all_data.csv
+    python scripts/validar.py data/2024/limpio/*.csv --cuarentena
+    python scripts/validar.py --json reporte.json
+"""
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import franjas
+import juegos
+
+TOLERANCIA_CAPACIDAD = 1.5  # asistencia por ciclo algo sobre la nominal es normal (niños)
+HORAS_REPORTE = 10          # 9:00 a 18:00
+_FECHA_ARCHIVO = re.compile(r"(\d{2})(\d{2})(\d{4})")
+
+
+def fecha_de_archivo(nombre):
+    """'01082022_limpio.csv' -> Timestamp(2022-08-01); None si el nombre no trae fecha."""
+    m = _FECHA_ARCHIVO.search(os.path.basename(str(nombre)))
+    if not m:
+        return None
+    try:
+        return pd.Timestamp(int(m.group(3)), int(m.group(2)), int(m.group(1)))
+    except ValueError:
+        return None
+
+
+def validar(df, fecha_esperada=None, ancho=None, tolerancia=TOLERANCIA_CAPACIDAD):
+    """{chequeo: filas con problema} de una tabla limpia o de all_data (vacío si todo está bien).
+
+    Args:
+        df (DataFrame): Columnas `juego`, `<H:MM> ciclos/asistencia`, totales y `fecha`/`date`.
+        fecha_esperada (Timestamp | None): Fecha del archivo; si es None y hay
+            `source_file`, se toma por fila de ahí.
+        ancho (int | None): Minutos por franja; por defecto, el que se infiere de las columnas.
+        tolerancia (float): Factor sobre ciclos x capacidad antes de marcar asistencia.
+    """
+    problemas = {}
+    n = len(df)
+
+    def marcar(chequeo, malas):
+        k = int(np.count_nonzero(malas)) if np.ndim(malas) else (n if malas else 0)
+        if k:
+            problemas[chequeo] = k
+
+    detectadas = franjas.detectar(df.columns)
+    minutos = [m for m, *_ in detectadas]
+    ancho = ancho or franjas.ancho_de(minutos, franjas.ANCHO_MIN)
+    esperadas = franjas.etiquetas(HORAS_REPORTE * 60 // ancho, ancho)
+    marcar("franjas", [e for _, e, *_ in detectadas] != esperadas)
+    if not detectadas:
+        return problemas
+
+    ciclos = df[[c for *_, c, _ in detectadas]].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    asistencia = df[[a for *_, a in detectadas]].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+
+    with np.errstate(invalid="ignore"):
+        marcar("negativos", ((ciclos < 0) | (asistencia < 0)).any(axis=1))
+
+        nombres = df["juego"].astype(str)
+        capacidad = nombres.map({v: getattr(juegos.buscar(v), "capacidad", np.nan) for v in nombres.unique()})
+        marcar("juego", capacidad.isna().to_numpy())
+        tope = ciclos * capacidad.to_numpy(dtype=float)[:, None] * tolerancia
+        marcar("capacidad", (asistencia > tope).any(axis=1))
+
+        distintos = np.zeros(n, dtype=bool)
+        for total, matriz in (("ciclos total", ciclos), ("asistencia total", asistencia)):
+            if total in df.columns:
+                declarado = pd.to_numeric(df[total], errors="coerce").to_numpy(dtype=float)
+                distintos |= ~np.isclose(np.nansum(matriz, axis=1), declarado) & ~np.isnan(declarado)
+        marcar("totales", distintos)
+
+    col_fecha = "fecha" if "fecha" in df.columns else "date" if "date" in df.columns else None
+    if fecha_esperada is None and "source_file" in df.columns:
+        archivos = df["source_file"]
+        fecha_esperada = archivos.map({a: fecha_de_archivo(a) for a in archivos.unique()})
+    if col_fecha is None:
+        marcar("fecha", True)
+    elif fecha_esperada is not None:
+        fechas = pd.to_datetime(df[col_fecha], errors="coerce")
+        esperada = pd.to_datetime(fecha_esperada)
+        marcar("fecha", (fechas != esperada).to_numpy())
+    return problemas
+
+
+def validar_archivo(ruta, ancho=None):
+    """Reporte compacto de un CSV limpio: {"archivo", "filas", "problemas"}."""
+    df = pd.read_csv(ruta)
+    return {"archivo": str(ruta), "filas": len(df), "problemas": validar(df, fecha_de_archivo(ruta), ancho)}
+
+
+def carpeta_cuarentena(carpeta_limpio):
+    """data/2022/limpio -> data/2022/cuarentena."""
+    return os.path.join(os.path.dirname(os.path.normpath(carpeta_limpio)), "cuarentena")
+
+
+def _destino_cuarentena(carpeta_limpio, nombre, reporte):
+    destino_dir = carpeta_cuarentena(carpeta_limpio)
+    os.makedirs(destino_dir, exist_ok=True)
+    destino = os.path.join(destino_dir, nombre)
+    with open(destino + ".json", "w", encoding="utf-8") as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=1)
+    return destino
+
+
+def poner_en_cuarentena(ruta, reporte):
+    """Mueve el CSV a `cuarentena/` (junto a su carpeta) y deja el reporte en `<archivo>.json`."""
+    destino = _destino_cuarentena(os.path.dirname(ruta) or ".", os.path.basename(ruta), reporte)
+    shutil.move(ruta, destino)
+    return destino
+
+
+def escribir_en_cuarentena(df, carpeta_limpio, nombre, reporte):
+    """Como `poner_en_cuarentena`, para una tabla que todavía no se escribió en `limpio/`."""
+    destino = _destino_cuarentena(carpeta_limpio, nombre, reporte)
+    df.to_csv(destino, index=False)
+    return destino
+
+
+def resumen(reportes):
+    """{chequeo: (archivos, filas)} sobre una lista de reportes."""
+    total = {}
+    for r in reportes:
+        for chequeo, filas in r["problemas"].items():
+            archivos, suma = total.get(chequeo, (0, 0))
+            total[chequeo] = (archivos + 1, suma + filas)
+    return total
+
+
+def main():
+    import argparse
+    import glob
+    import time
+
+    ap = argparse.ArgumentParser(description="Valida los CSV limpios y all_data.csv.")
+    ap.add_argument("archivos", nargs="*", help="CSV limpios (por defecto data/20*/limpio/*.csv)")
+    ap.add_argument("--all-data", default="all_data.csv", help="Tabla consolidada ('' para omitirla)")
+    ap.add_argument("--cuarentena", action="store_true", help="Mueve los archivos con problemas a cuarentena/")
+    ap.add_argument("--json", dest="salida_json", help="Guarda los reportes de archivos con problemas")
+    ap.add_argument("--mostrar", type=int, default=10, help="Archivos con problemas a listar")
+    args = ap.parse_args()
+
+    archivos = args.archivos or sorted(glob.glob("data/20*/limpio/*.csv"))
+    t0 = time.perf_counter()
+    reportes = [validar_archivo(a) for a in archivos]
+    ms = (time.perf_counter() - t0) * 1000
+    malos = [r for r in reportes if r["problemas"]]
+    print(f"{'✅' if not malos else '⚠️'} {len(archivos) - len(malos)}/{len(archivos)} archivos sin problemas "
+          f"({ms:,.0f} ms, {ms / max(len(archivos), 1):.1f} ms por archivo)")
+    for chequeo, (n_arch, n_filas) in sorted(resumen(reportes).items()):
+        print(f"   {chequeo:<12}{n_arch:>5} archivos {n_filas:>7} filas")
+    for r in malos[:args.mostrar]:
+        print(f"   {os.path.basename(r['archivo'])}: {r['problemas']}")
+
+    if args.all_data and os.path.exists(args.all_data):
+        t0 = time.perf_counter()
+        ad = pd.read_csv(args.all_data)
+        problemas = validar(ad)
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"{'✅' if not problemas else '⚠️'} {args.all_data}: {len(ad):,} filas, {problemas or 'sin problemas'} "
+              f"({ms:,.0f} ms con la lectura)")
+
+    if args.salida_json:
+        with open(args.salida_json, "w", encoding="utf-8") as f:
+            json.dump(malos, f, ensure_ascii=False, indent=1)
+    if args.cuarentena:
+        for r in malos:
+            print(f"🚧 Cuarentena: {poner_en_cuarentena(r['archivo'], r)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Vocabularios enteros para las columnas categóricas del modelo.
+
+En lugar de pasarle strings al OneHotEncoder ("9:00", "Saturday", "Overcast",
+"Ninguno", ...) en cada predicción, cada valor se traduce una sola vez a un
+código entero pequeño. Los vocabularios se guardan dentro del bundle
+(`bundle["vocabularios"]`, listas simples, sin clases pickleadas) y en vivo se
+codifica con un dict: así lookups, groupbys y el encoder trabajan con enteros.
+
+Código -1 = valor desconocido; el OneHotEncoder (`handle_unknown="ignore"`) lo
+deja en ceros, igual que hacía con un string que no vio al entrenar.
+
+numpy se importa dentro de las funciones que lo usan: `fast_predict` importa
+este módulo al arrancar y codificar una fila (`codificar_fila`) no lo necesita.
+"""
+from cielo import CATEGORIAS
+from franjas import minuto
+
+DESCONOCIDO = -1
+
+DIAS_SEMANA = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Sinónimos que llegan en vivo con otro texto que el de entrenamiento
+ALIAS = {
+    # Los scripts en vivo mandan "" cuando no hay feriado; reader.py escribe "Ninguno"
+    "nombre_festivo": {"": "Ninguno", None: "Ninguno"},
+}
+
+
+def _normalizar(columna, valor):
+    """Lleva el valor a la forma con la que se guarda en el vocabulario.
+
+    None, NaN y `pd.NA` son el mismo nulo: pasan igual por `ALIAS` (un DataFrame
+    trae NaN donde la fila en vivo trae None).
+    """
+    try:
+        nulo = valor is None or bool(valor != valor)  # None / NaN
+    except TypeError:
+        nulo = True  # pd.NA
+    valor = ALIAS.get(columna, {}).get(None if nulo else valor, None if nulo else valor)
+    if valor is None:
+        return None
+    if columna == "hora":
+        return minuto(valor)  # "9:00" y "09:00" -> 540
+    if columna == "es_festivo":
+        return int(bool(valor))
+    return valor
+
+
+class Vocabulario:
+    """Valores de una columna categórica en orden fijo; el índice es el código.
+
+    Args:
+        columna (str): Nombre de la columna (define la normalización).
+        valores (list): Valores ya normalizados, en el orden de los códigos.
+    """
+
+    def __init__(self, columna, valores):
+        self.columna = columna
+        self.valores = list(valores)
+        self._indice = {v: i for i, v in enumerate(self.valores)}
+
+    def __len__(self):
+        return len(self.valores)
+
+    def codigo(self, valor):
+        return self._indice.get(_normalizar(self.columna, valor), DESCONOCIDO)
+
+    def codificar(self, valores):
+        """Codifica un iterable/Serie a `int16` (un dict lookup por valor único)."""
+        import numpy as np
+
+        valores = list(valores)
+        unicos = {}
+        for v in valores:
+            if v not in unicos:
+                unicos[v] = self.codigo(v)
+        return np.fromiter((unicos[v] for v in valores), dtype=np.int16, count=len(valores))
+
+    def decodificar(self, codigos):
+        return [self.valores[c] if c >= 0 else None for c in codigos]
+
+    @classmethod
+    def ajustar(cls, columna, valores):
+        """Vocabulario con los valores observados (ordenados) de una columna de entrenamiento."""
+        if columna == "day_of_week":
+            return cls(columna, DIAS_SEMANA)
+        if columna == "es_festivo":
+            return cls(columna, [0, 1])
+        if columna == "cielo":
+            return cls(columna, CATEGORIAS)
+        vistos = {_normalizar(columna, v) for v in valores}
+        vistos.discard(None)
+        return cls(columna, sorted(vistos, key=lambda v: (isinstance(v, str), v)))
+
+
+def ajustar_vocabularios(df, columnas):
+    """{columna: Vocabulario} para las columnas categóricas de un DataFrame de entrenamiento."""
+    return {c: Vocabulario.ajustar(c, df[c].dropna().unique()) for c in columnas}
+
+
+def a_bundle(vocabularios):
+    """Forma serializable para guardar en el bundle: {columna: [valores]}."""
+    return {c: list(v.valores) for c, v in vocabularios.items()}
+
+
+def desde_bundle(bundle):
+    """Reconstruye los vocabularios guardados en un bundle, o None si es un bundle de strings."""
+    guardados = bundle.get("vocabularios")
+    if not guardados:
+        return None
+    return {c: Vocabulario(c, valores) for c, valores in guardados.items()}
+
+
+def codificar_df(df, vocabularios):
+    """Copia de `df` con las columnas de `vocabularios` reemplazadas por sus códigos enteros."""
+    df = df.copy()
+    for c, voc in vocabularios.items():
+        if c in df.columns:
+            df[c] = voc.codificar(df[c])
+    return df
+
+
+def codificar_fila(fila, vocabularios):
+    """Igual que `codificar_df` pero para una fila como dict."""
+    fila = dict(fila)
+    for c, voc in vocabularios.items():
+        if c in fila:
+            fila[c] = voc.codigo(fila[c])
+    return fila
+
+
+def traduccion(origen, destino):
+    """Tabla que lleva códigos de `origen` a los de `destino` (-1 si el valor no está).
+
+    Tiene un elemento extra al final para que `tabla[-1]` siga siendo -1.
+    """
+    import numpy as np
+
+    tabla = [destino._indice.get(v, DESCONOCIDO) for v in origen.valores] + [DESCONOCIDO]
+    return np.array(tabla, dtype=np.int16)
+
+
+def one_hot(codigos, vocabularios, columnas):
+    """One-hot directo desde códigos `(n, k)`, igual al OneHotEncoder con categorías `0..n-1`.
+
+    Con códigos ya enteros no hace falta buscar cada valor en `categories_`:
+    la columna de salida es `offset de la columna + código` (-1 queda en ceros).
+    """
+    import numpy as np
+
+    codigos = np.asarray(codigos, dtype=np.int64).reshape(-1, len(columnas))
+    tamanos = np.array([len(vocabularios[c]) for c in columnas])
+    offsets = np.concatenate([[0], np.cumsum(tamanos)[:-1]])
+    salida = np.zeros((len(codigos), int(tamanos.sum())))
+    filas, cols = np.nonzero(codigos >= 0)
+    salida[filas, offsets[cols] + codigos[filas, cols]] = 1.0
+    return salida
+
+
+def preparar_entrada(bundle, X):
+    """Deja `X` listo para `bundle["pipeline"]`: sin cambios si el bundle es de strings."""
+    vocabularios = desde_bundle(bundle)
+    return X if vocabularios is None else codificar_df(X, vocabularios)